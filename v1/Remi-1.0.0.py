@@ -9,10 +9,13 @@ from dotenv import load_dotenv
 from ReminderLib.Paginator import Paginator
 from ReminderLib.Parser import *
 from ReminderLib.DBController import *
+from ReminderLib.Log import setup_logging
 
 ### GLOBALS
 print("[INFO] REMI v1.0.0 - Reminder Bot")
 load_dotenv()
+# ReminderLib logs its [LOAD]/[SAVE] lines; show them on the console only
+setup_logging(path=None)
 
 reminders = []
 
@@ -1,11 +1,13 @@
 # Remi-refactor.py
 import os
-import json
+import io
 import uuid
-import requests
 import asyncio
 import typing
+import time as pytime
 
+import yarl
+import aiohttp
 import discord as dc
 
 from datetime import datetime, timedelta
@@ -13,31 +15,374 @@ from discord.ext import tasks, commands
 from dotenv import load_dotenv
 
 # Local libraries (keep your existing ReminderLib)
-from ReminderLib.Paginator import Paginator
+from ReminderLib.Paginator import Paginator, CursorPaginator
 from ReminderLib.Parser import *
+from ReminderLib.Scheduler import ShardedDueQueue, FireSkew, TickStats, reminder_fire_ts, next_fire_after
+from ReminderLib.Storage import JSONStorage, SQLiteStorage, BatchResult, page_key
+from ReminderLib.Journal import JournaledDB
+from ReminderLib.Dispatcher import Dispatcher
+from ReminderLib.Migrate import migrate_rows
+from ReminderLib.Health import HealthServer, LoopLagMonitor
+from ReminderLib.Payloads import PayloadCache, render_payload
+from ReminderLib.CatchUp import CatchUpQueue, missed_occurrences
+from ReminderLib.Lease import LeaseTable, LeaseManager
+from ReminderLib.Log import setup_logging, get_logger, SAMPLED
+from ReminderLib.Metrics import Registry
+from ReminderLib.Profiler import TickProfiler
 # DB: use PyStoreJSON implementation directly
 from PyStoreJSONLib import PyStoreJSONDB
 
 ### GLOBALS
-print("[INFO] REMI v1.2.0 - Reminder Bot (Refactor using PyStoreJSONDB)")
 load_dotenv()
 
+# Logging: records are written by a background thread to a rotated JSON-lines file (LOG_FILE)
+# and the console. Per-reminder lines are DEBUG; LOG_SAMPLE_EVERY thins the hottest ones
+log_listener = setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    path=os.getenv("LOG_FILE", "logs/remi.log") or None,
+    max_bytes=int(os.getenv("LOG_MAX_MB", "10")) * 1024 * 1024,
+    backups=int(os.getenv("LOG_BACKUPS", "5")),
+    sample_every=int(os.getenv("LOG_SAMPLE_EVERY", "1")),
+    console=os.getenv("LOG_CONSOLE", "TRUE").upper() == "TRUE",
+)
+log_info = get_logger("info")
+log_init = get_logger("init")
+log_remi = get_logger("remi")
+log_make = get_logger("make")
+log_list = get_logger("list")
+log_dlet = get_logger("dlet")
+log_save = get_logger("save")
+log_beat = get_logger("beat")
+log_lease = get_logger("lease")
+log_info.info("REMI v1.2.0 - Reminder Bot (Refactor using PyStoreJSONDB)")
+
 intents = dc.Intents.default()
 intents.message_content = True
 intents.guilds = True
 intents.guild_messages = True
 
-bot = commands.Bot(command_prefix="rm.", intents=intents)
+# Metrics, served in the Prometheus text format on the health port at /metrics
+metrics = Registry()
+tick_seconds = metrics.histogram("remi_tick_seconds", "Duration of a scheduler tick", ["shard"])
+reminders_scanned = metrics.counter("remi_reminders_scanned_total", "Due index entries popped by scheduler ticks", ["shard"])
+reminders_fired = metrics.counter("remi_reminders_fired_total", "Reminders sent on schedule", ["shard"])
+reminders_late = metrics.counter("remi_reminders_late_total", "Due reminders handed to the catch-up queue", ["shard"])
+send_failures = metrics.counter("remi_send_failures_total", "Reminder sends that failed")
+fire_skew_seconds = metrics.histogram(
+    "remi_fire_skew_seconds", "Actual minus scheduled fire time of sent reminders",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0),
+)
+discord_send_seconds = metrics.histogram("remi_discord_send_seconds", "Time to post a reminder message to Discord")
+discord_responses = metrics.counter("remi_discord_responses_total", "Discord REST responses by method and status", ["method", "status"])
+discord_rate_limited = metrics.counter("remi_discord_rate_limited_total", "Discord REST responses with status 429 by scope", ["scope"])
+storage_seconds = metrics.histogram("remi_storage_op_seconds", "Storage operations by kind; the count is the number of reads/writes", ["op"])
+storage_rows_written = metrics.counter("remi_storage_rows_written_total", "Rows changed by scheduler commits")
+storage_bytes_written = metrics.counter("remi_storage_bytes_written_total", "Bytes written by scheduler commits and write-throughs")
+command_seconds = metrics.histogram("remi_command_seconds", "Command latency by command and outcome", ["command", "status"])
+
+async def on_discord_response(session, context, params: aiohttp.TraceRequestEndParams):
+    status = params.response.status
+    discord_responses.inc(method=params.method, status=status)
+    if status == 429:
+        discord_rate_limited.inc(scope=params.response.headers.get("X-RateLimit-Scope", "unknown"))
+
+# Every REST call of the client goes through this trace, including the ones discord.py retries
+discord_trace = aiohttp.TraceConfig()
+discord_trace.on_request_end.append(on_discord_response)
+
+def parse_shard_ids(value: str) -> list[int]:
+    """
+    Parses "0,1,2" or "0-3" (or a mix, e.g. "0-3,8") into shard IDs
+    """
+    shard_ids = []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        start, _, end = part.partition("-")
+        shard_ids.extend(range(int(start), int(end or start) + 1))
+    return shard_ids
+
+# Sharding: SHARD_COUNT runs the bot as an AutoShardedBot. SHARD_IDS limits this process to
+# some of those shards, so several processes can split the guilds between them
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+if SHARD_COUNT > 0:
+    SHARD_IDS = parse_shard_ids(os.getenv("SHARD_IDS", "")) or list(range(SHARD_COUNT))
+    bot = commands.AutoShardedBot(
+        command_prefix="rm.", intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS, http_trace=discord_trace,
+    )
+    log_info.info("Sharded: running shards %s of %s", SHARD_IDS, SHARD_COUNT)
+else:
+    SHARD_COUNT, SHARD_IDS = 1, [0]
+    bot = commands.Bot(command_prefix="rm.", intents=intents, http_trace=discord_trace)
+
+# Point REST and the gateway somewhere else, e.g. the local stand-in in benchmarks/fake_discord.py
+if os.getenv("DISCORD_API_BASE"):
+    dc.http.Route.BASE = os.getenv("DISCORD_API_BASE").rstrip("/")
+if os.getenv("DISCORD_GATEWAY_URL"):
+    dc.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(os.getenv("DISCORD_GATEWAY_URL"))
 
 # Database directory
 REMINDER_DB = "data/reminders"
 os.makedirs(REMINDER_DB, exist_ok=True)
 
+# Scheduler mode: "poll" checks once a minute, "event" sleeps until the next due reminder
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "poll").lower()
+# Poll mode fires a minute's reminders on the tick of that minute, or the next one for reminders
+# created after it ran (e.g. /remind with no time, which is due at the start of this minute)
+POLL_SLACK_SECONDS = 60 if SCHEDULER_MODE == "poll" else 0
+# A reminder fired this many seconds after its scheduled time is treated as late: a minute of
+# grace on top of the scheduler's own slack
+LATE_AFTER_SECONDS = 60 + POLL_SLACK_SECONDS
+
+# In-memory index of pending reminders by next fire time, one per owned shard, built in on_ready
+scheduler_wakeups = {shard_id: asyncio.Event() for shard_id in SHARD_IDS}
+due_queue = ShardedDueQueue(SHARD_IDS, SHARD_COUNT, on_earlier=lambda shard_id: scheduler_wakeups[shard_id].set())
+fire_skew = FireSkew()
+tick_stats = {shard_id: TickStats() for shard_id in SHARD_IDS}
+scheduler_handles: dict[int, asyncio.Task] = {}
+# Armed by the owner's profile command; the scheduler only checks its active flag otherwise
+tick_profiler = TickProfiler()
+
+# Reminder sends run on a bounded worker pool, ordered per channel
+dispatcher = Dispatcher(
+    workers=int(os.getenv("DISPATCH_WORKERS", "8")),
+    queue_depth=int(os.getenv("DISPATCH_QUEUE_DEPTH", "1000")),
+)
+# A failed send is retried this many times before the reminder is advanced anyway
+SEND_MAX_ATTEMPTS = 3
+SEND_RETRY_SECONDS = 60
+send_attempts: dict[tuple[int, str], int] = {}
+# Rendered content + embed per reminder, compiled on create/edit and reused on every fire
+payload_cache = PayloadCache(max_entries=int(os.getenv("PAYLOAD_CACHE_SIZE", "10000")))
+
+async def deliver_missed(guild_id: int, reminder: dict, missed: int) -> bool:
+    guild = bot.get_guild(guild_id)
+    if guild is None:
+        return False
+    note = "Delivered late" if missed == 1 else f"Missed {missed} times; delivered late"
+    future = await dispatcher.submit(reminder["channel_id"], send_reminder, reminder, guild, note)
+    return await future
+
+def settle_missed(guild_id: int, reminder: dict, sent: bool):
+    """
+    A missed reminder's catch-up finished: delete or advance it like a fire, or hand a failed
+    send back to the scheduler's retries. Its row is only changed here, so a restart before
+    the catch-up is sent queues it again instead of losing it
+    """
+    if not owns_shard(due_queue.shard_of(guild_id)):
+        # The new holder reloads the row as it is and catches it up itself
+        return
+    reminder_id = reminder["reminder_id"]
+    reminder_time = reminder_fire_ts(reminder)
+    with storage_seconds.time(op="get"):
+        stored = storage.get(guild_id, reminder_id)
+    if stored is None or reminder_fire_ts(stored) != reminder_time:
+        # Deleted or rescheduled while it was queued
+        return
+
+    if not sent:
+        send_attempts[(guild_id, reminder_id)] = send_attempts.get((guild_id, reminder_id), 0) + 1
+        due_queue.schedule_at(guild_id, reminder_id, pytime.time() + SEND_RETRY_SECONDS)
+        return
+    guild = bot.get_guild(guild_id)
+    if guild is None:
+        return
+    batch = storage.batch(guild_id)
+    finish_fire(batch, guild, stored, reminder_time, pytime.time())
+    commit_fires(batch, guild)
+
+# Fires missed by LATE_AFTER_SECONDS or more (e.g. during downtime) drain from a rate-limited
+# queue instead of bursting out on the first tick, following each reminder's catch_up policy
+catch_up = CatchUpQueue(
+    deliver_missed,
+    rate=float(os.getenv("CATCH_UP_RATE", "2")),
+    burst=int(os.getenv("CATCH_UP_BURST", "5")),
+    max_fires=int(os.getenv("CATCH_UP_MAX_FIRES", "10")),
+    default_policy=os.getenv("CATCH_UP_POLICY", "once").lower(),
+    on_done=settle_missed,
+)
+
+# Health: last scheduler tick, event loop lag and the local /healthz + /readyz endpoint
+last_tick_ts: typing.Optional[float] = None
+loop_lag = LoopLagMonitor()
+heartbeat_session: typing.Optional[aiohttp.ClientSession] = None
+
+def health_status() -> dict:
+    now = pytime.time()
+    latency = bot.latency
+    return {
+        "ready": bot.is_ready() and scheduler_running(),
+        "loop_lag": loop_lag.lag,
+        "loop_lag_max": loop_lag.max_lag,
+        "last_tick": last_tick_ts,
+        "last_tick_age": now - last_tick_ts if last_tick_ts else None,
+        "scheduler_mode": SCHEDULER_MODE,
+        "pending": len(due_queue),
+        "overdue": due_queue.overdue(now),
+        "dispatch_queued": dispatcher.depth,
+        "dispatch_in_flight": dispatcher.in_flight,
+        "gateway_latency": latency if latency != float("inf") else None,
+        "guilds": len(bot.guilds),
+        "shards": shard_status(),
+        "mention_cache": mention_cache.stats(),
+        "payload_cache": payload_cache.stats(),
+        "catch_up": catch_up.stats(),
+        "leases": lease_manager.stats() if lease_manager is not None else None,
+    }
+
+def shard_status() -> dict:
+    """
+    Guilds, pending reminders and tick metrics of each owned shard
+    """
+    guilds = {shard_id: 0 for shard_id in SHARD_IDS}
+    for guild in bot.guilds:
+        shard_id = due_queue.shard_of(guild.id)
+        if shard_id in guilds:
+            guilds[shard_id] += 1
+    return {
+        shard_id: {"guilds": guilds[shard_id], "pending": len(due_queue.shards[shard_id]), **tick_stats[shard_id].as_dict()}
+        for shard_id in SHARD_IDS
+    }
+
+# Gauges read at scrape time from the structures that already track them
+metrics.gauge("remi_pending_reminders", "Reminders in the due index", ["shard"], function=lambda: {
+    (shard_id,): len(due_queue.shards[shard_id]) for shard_id in SHARD_IDS
+})
+metrics.gauge("remi_overdue_reminders", "Indexed reminders past their fire time", function=lambda: due_queue.overdue(pytime.time()))
+metrics.gauge("remi_dispatch_queued", "Sends waiting for a dispatcher worker", function=lambda: dispatcher.depth)
+metrics.gauge("remi_dispatch_in_flight", "Sends in progress", function=lambda: dispatcher.in_flight)
+metrics.gauge("remi_catch_up_pending", "Catch-up deliveries waiting to drain", function=lambda: len(catch_up))
+metrics.gauge("remi_event_loop_lag_seconds", "Event loop lag measured by the lag monitor", function=lambda: loop_lag.lag)
+metrics.gauge("remi_guilds", "Guilds this process serves", function=lambda: len(bot.guilds))
+
+health_server = HealthServer(
+    health_status,
+    host=os.getenv("HEALTH_HOST", "127.0.0.1"),
+    port=int(os.getenv("HEALTH_PORT", "0")),
+    max_loop_lag=float(os.getenv("HEALTH_MAX_LOOP_LAG", "5")),
+    metrics=metrics.render,
+)
+
 # Helper: create or return DB instance for a guild
 def get_db_for_guild(guild_id: int) -> PyStoreJSONDB:
     path = os.path.join(REMINDER_DB, f"guild_{guild_id}.json")
     return PyStoreJSONDB(path)
 
+# Journaled JSON mode: append changes to a per-guild log, compacted in the background
+STORE_JOURNAL = os.getenv("STORE_JOURNAL", "FALSE").upper() == "TRUE"
+COMPACT_SECONDS = float(os.getenv("STORE_COMPACT_SECONDS", "30"))
+
+def open_journaled_db(guild_id: int) -> JournaledDB:
+    base = os.path.join(REMINDER_DB, f"guild_{guild_id}")
+    return JournaledDB(
+        base,
+        seed=lambda: get_db_for_guild(guild_id).get_all() if os.path.exists(base + ".json") else [],
+        max_journal_bytes=int(os.getenv("STORE_JOURNAL_MAX_KB", "1024")) * 1024,
+        max_journal_ratio=float(os.getenv("STORE_JOURNAL_RATIO", "1.0")),
+    )
+
+# Storage backend: "json" (one file per guild, cached in memory) or "sqlite"
+REMINDER_STORAGE = os.getenv("REMINDER_STORAGE", "json").lower()
+if REMINDER_STORAGE == "sqlite":
+    storage = SQLiteStorage(os.getenv("REMINDER_SQLITE_PATH", "data/reminders.db"))
+else:
+    # Process-wide cache of parsed guild stores; dirty stores are written back by flush_task
+    storage = JSONStorage(
+        open_journaled_db if STORE_JOURNAL else get_db_for_guild,
+        max_guilds=int(os.getenv("STORE_CACHE_MAX_GUILDS", "1000")),
+        max_bytes=int(os.getenv("STORE_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    )
+# Seconds between write-backs of dirty guild stores (0 writes through on every change)
+STORE_FLUSH_SECONDS = float(os.getenv("STORE_FLUSH_SECONDS", "5"))
+
+# Reminders listed per page; Discord allows at most 25 fields and 6000 characters per embed
+REMINDERS_PAGE_SIZE = max(1, min(25, int(os.getenv("REMINDERS_PAGE_SIZE", "10"))))
+EMBED_CHAR_LIMIT = 6000
+
+# Hot standby: with INSTANCE_LEASES=TRUE, processes sharing the storage each try to hold a lease
+# per shard and only the holder fires that shard's reminders. A standby takes a shard over once
+# the holder stops renewing its lease for LEASE_TTL_SECONDS
+INSTANCE_LEASES = os.getenv("INSTANCE_LEASES", "FALSE").upper() == "TRUE"
+if INSTANCE_LEASES and REMINDER_STORAGE != "sqlite":
+    # JSON guild files are rewritten whole from each process's cache, so a holder and a standby
+    # writing the same guild overwrite each other's reminders. SQLite writes rows through
+    log_lease.critical("INSTANCE_LEASES=TRUE requires REMINDER_STORAGE=sqlite, not %r", REMINDER_STORAGE)
+    log_listener.stop()
+    raise SystemExit(1)
+
+def shard_guild_ids(shard_id: int) -> list[int]:
+    return [guild.id for guild in bot.guilds if due_queue.shard_of(guild.id) == shard_id]
+
+def owns_shard(shard_id: int) -> bool:
+    return lease_manager is None or lease_manager.owns(shard_id)
+
+def reload_guilds(guild_ids: list[int]):
+    """
+    Re-read guilds from storage and rebuild their part of the due index
+    """
+    for guild_id in guild_ids:
+        storage.drop(guild_id)
+        payload_cache.invalidate(guild_id)
+        due_queue.clear_guild(guild_id)
+    for guild_id, reminder_id, fire_ts in storage.due(guild_ids=guild_ids):
+        due_queue.schedule_at(guild_id, reminder_id, fire_ts)
+
+def take_shard(shard_id: int):
+    """
+    Lease gained: load the shard's reminders as the previous holder left them
+    """
+    reload_guilds(shard_guild_ids(shard_id))
+    scheduler_wakeups[shard_id].set()
+    log_lease.info("Firing shard %s: %s pending reminders", shard_id, len(due_queue.shards[shard_id]))
+
+def release_shard(shard_id: int):
+    """
+    Lease lost: write back and forget the shard's reminders; the new holder reloads them
+    """
+    for guild_id in shard_guild_ids(shard_id):
+        storage.drop(guild_id)
+        due_queue.clear_guild(guild_id)
+
+def hand_off_guilds(shard_id: int, guild_ids: list[int]):
+    """
+    A standby changed these guilds; pick the changes up
+    """
+    reload_guilds(guild_ids)
+    log_lease.info("Reloaded %s guilds of shard %s changed by a standby", len(guild_ids), shard_id)
+
+lease_manager: typing.Optional[LeaseManager] = None
+if INSTANCE_LEASES:
+    lease_manager = LeaseManager(
+        LeaseTable(os.getenv("LEASE_PATH", "data/leases.db")),
+        SHARD_IDS,
+        ttl=float(os.getenv("LEASE_TTL_SECONDS", "15")),
+        on_gained=take_shard,
+        on_lost=release_shard,
+        on_handoff=hand_off_guilds,
+    )
+
+def flush_store(guild_id: int):
+    shard_id = due_queue.shard_of(guild_id)
+    if not owns_shard(shard_id):
+        # Another process fires this guild: write through and have it reload the guild
+        storage.drop(guild_id)
+        lease_manager.table.mark(shard_id, guild_id)
+        return
+    if STORE_FLUSH_SECONDS <= 0:
+        with storage_seconds.time(op="flush"):
+            storage_bytes_written.inc(storage.flush(guild_id))
+
+def import_json_guild(guild_id: int):
+    """
+    Move a guild's legacy JSON reminders into SQLite the first time the guild is seen
+    """
+    path = os.path.join(REMINDER_DB, f"guild_{guild_id}.json")
+    if not os.path.exists(path) or storage.count(guild_id):
+        return
+    reminders = get_db_for_guild(guild_id).get_all()
+    migrate_rows(reminders)
+    storage.replace(guild_id, reminders)
+    os.replace(path, path + ".imported")
+    log_init.info("Imported %s JSON reminders into SQLite for guild %s", len(reminders), guild_id)
+
 # UUID base62 generator
 def uuid_base62():
     alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
@@ -51,61 +396,72 @@ def uuid_base62():
 
 # Database read/write helpers (async signatures kept for compatibility)
 async def load_reminders(guild_id: int) -> list:
-    db = get_db_for_guild(guild_id)
-    return db.get_all()
+    with storage_seconds.time(op="get_all"):
+        return storage.get_all(guild_id)
 
 async def save_reminders_full(guild_id: int, reminders: list):
     """
     Overwrite the entire reminders DB for the guild with the provided list.
-    Uses the DB's internal _save to preserve schema behaviour.
     """
-    db = get_db_for_guild(guild_id)
-    # Use db._save (internal) to replace entire file atomically
-    db._save(reminders)
+    with storage_seconds.time(op="replace"):
+        storage.replace(guild_id, reminders)
+    payload_cache.invalidate(guild_id)
+    flush_store(guild_id)
 
 async def upsert_reminder(guild_id: int, reminder: dict):
     """
     Insert a new reminder row. If a reminder with same reminder_id exists, update it.
     """
-    db = get_db_for_guild(guild_id)
-    # If reminder_id exists, update_by; otherwise insert
-    if reminder.get("reminder_id") and db.find_by("reminder_id", reminder["reminder_id"]):
-        db.update_by("reminder_id", reminder["reminder_id"], reminder)
-    else:
-        db.insert(reminder)
+    with storage_seconds.time(op="upsert"):
+        storage.upsert(guild_id, reminder)
+    payload_cache.compile(guild_id, reminder)
+    flush_store(guild_id)
+
+async def get_reminder(guild_id: int, reminder_id: str) -> typing.Optional[dict]:
+    with storage_seconds.time(op="get"):
+        return storage.get(guild_id, reminder_id)
 
 async def delete_reminder_by_id(guild_id: int, reminder_id: str) -> int:
-    db = get_db_for_guild(guild_id)
-    return db.delete_by("reminder_id", reminder_id)
+    with storage_seconds.time(op="delete"):
+        deleted = storage.delete(guild_id, reminder_id)
+    payload_cache.invalidate(guild_id, reminder_id)
+    flush_store(guild_id)
+    return deleted
 
 # Sending reminder embed
-async def send_reminder(reminder, guild):
+async def send_reminder(reminder, guild, note: typing.Optional[str] = None) -> bool:
     """
-    Sends the reminder message with embed formatting.
+    Sends the reminder message with embed formatting, with note as the embed footer if given.
+    Returns True if it was sent.
     """
     try:
-        print(f"\t[REMI] Sending reminder {reminder['reminder_id']} in {guild.name}")
+        log_remi.debug("Sending reminder %s in %s", reminder["reminder_id"], guild.name, extra=SAMPLED)
         channel = bot.get_channel(reminder["channel_id"])
         if channel is None:
-            print(f"\t[WARN] Channel {reminder['channel_id']} not found for guild {guild.name}")
-            return
-
-        # mentions stored as list
-        payload = " ".join(reminder.get("mentions", [])) if reminder.get("mentions") else ""
-
-        embed = dc.Embed(title=reminder.get("title", ""), color=0x00ff00)
-        subtitles = str(reminder.get("subtitles", "")).split("\\n")
-        messages = str(reminder.get("message", "")).split("\\n")
-
-        # Pair up subtitles and messages safely
-        for i, subtitle in enumerate(subtitles):
-            message_text = messages[i] if i < len(messages) else ""
-            embed.add_field(name=subtitle, value=message_text, inline=False)
+            log_remi.warning(
+                "Channel %s not found for guild %s", reminder["channel_id"], guild.name,
+                extra={"guild_id": guild.id, "reminder_id": reminder["reminder_id"]},
+            )
+            send_failures.inc()
+            return False
 
-        await channel.send(content=payload if payload else None, embed=embed)
-        print(f"\t[REMI] Sent reminder to {channel.name} - {channel.id} in {guild.name} - {guild.id}")
+        if note is None:
+            content, embed = payload_cache.get(guild.id, reminder)
+        else:
+            # Catch-up deliveries are rare and may outlive the reminder; render them uncached
+            content, embed = render_payload(reminder)
+            embed.set_footer(text=note)
+        with discord_send_seconds.time():
+            await channel.send(content=content, embed=embed)
+        log_remi.debug("Sent reminder to %s - %s in %s - %s", channel.name, channel.id, guild.name, guild.id, extra=SAMPLED)
+        return True
     except Exception as e:
-        print(f"\t[ERROR] Failed to send reminder {reminder.get('reminder_id')}: {e}")
+        log_remi.error(
+            "Failed to send reminder %s: %s", reminder.get("reminder_id"), e,
+            extra={"guild_id": guild.id, "reminder_id": reminder.get("reminder_id")},
+        )
+        send_failures.inc()
+        return False
 
 # EVENTS
 @bot.event
@@ -113,36 +469,66 @@ async def on_ready():
     """
     Called when the bot is ready
     """
-    print(f"[INIT] Logged in as {bot.user.name}")
-    print("[INIT] Ensuring DB directory and per-guild DBs exist...")
+    log_init.info("Logged in as %s", bot.user.name)
+    log_init.info("Ensuring DB directory and per-guild DBs exist...")
 
     # Ensure data folders and DB files exist for each guild
     for guild in bot.guilds:
         # Ensure classic per-guild data directory exists (some other resources may use it)
         os.makedirs(f"data/{guild.id}", exist_ok=True)
-        db = get_db_for_guild(guild.id)
-        # db initialization is handled by PyStoreJSONDB constructor
+        if REMINDER_STORAGE == "sqlite":
+            import_json_guild(guild.id)
+
+    # Build the due index in one pass over the storage (a single next_fire range query for SQLite)
+    if lease_manager is None:
+        for guild in bot.guilds:
+            due_queue.clear_guild(guild.id)
+        for guild_id, reminder_id, fire_ts in storage.due(guild_ids=[g.id for g in bot.guilds]):
+            due_queue.schedule_at(guild_id, reminder_id, fire_ts)
+    elif not lease_manager.running:
+        # Only shards whose lease this process wins are indexed (by take_shard)
+        await lease_manager.renew()
+        lease_manager.start()
+        log_init.info("Holding leases for shards %s; standby for the rest", lease_manager.owned)
+    else:
+        reload_guilds([g.id for g in bot.guilds if owns_shard(due_queue.shard_of(g.id))])
 
-    print(f"[INIT] Found {len(bot.guilds)} Guilds!")
+    log_init.info("Found %s Guilds!", len(bot.guilds))
+    log_init.info("Indexed %s pending reminders", len(due_queue))
+    if SHARD_COUNT > 1:
+        for shard_id, status in shard_status().items():
+            log_init.info("Shard %s: %s guilds, %s pending reminders", shard_id, status["guilds"], status["pending"])
 
     # Start tasks
-    print("[INIT] Starting task loops...")
-    if not reminder_task.is_running():
-        print("\t[INIT] Waiting for minute time...")
-        # Wait until the next minute boundary to align checks to minute resolution
-        await dc.utils.sleep_until(datetime.now() + timedelta(seconds=60 - datetime.now().second))
-        reminder_task.start()
-        print("\t[INIT] Started reminder loop!")
+    log_init.info("Starting task loops...")
+    if not scheduler_running():
+        await start_scheduler()
+        log_init.info("Started reminder scheduler (%s mode)!", SCHEDULER_MODE)
     else:
-        print("\t[INIT] Reminder loop already running!")
+        log_init.info("Reminder scheduler already running!")
 
     if not heartbeat_task.is_running():
         heartbeat_task.start()
-        print("\t[INIT] Started heartbeat loop!")
+        log_init.info("Started heartbeat loop!")
     else:
-        print("\t[INIT] Heartbeat loop already running!")
+        log_init.info("Heartbeat loop already running!")
+
+    if (STORE_FLUSH_SECONDS > 0 or lease_manager is not None) and not flush_task.is_running():
+        flush_task.change_interval(seconds=STORE_FLUSH_SECONDS or 5)
+        flush_task.start()
+        log_init.info("Started store flush loop!")
+
+    if STORE_JOURNAL and not compact_task.is_running():
+        compact_task.change_interval(seconds=COMPACT_SECONDS)
+        compact_task.start()
+        log_init.info("Started journal compaction loop!")
+
+    loop_lag.start()
+    if health_server.port and not health_server.running:
+        await health_server.start()
+        log_init.info("Health endpoint listening on %s:%s", health_server.host, health_server.port)
 
-    print("[INIT] Loops Started!")
+    log_init.info("Loops Started!")
 
 @bot.event
 async def on_message(message: dc.Message):
@@ -156,13 +542,38 @@ async def on_guild_join(guild: dc.Guild):
     """
     Called when the bot joins a new guild
     """
-    print(f"[REMI] Joined guild: {guild.name} - {guild.id}")
+    log_remi.info("Joined guild: %s - %s", guild.name, guild.id)
 
     # Create folder for the guild if it doesn't exist
     os.makedirs(f"data/{guild.id}", exist_ok=True)
-    # Ensure DB file exists (constructor will make file if not present)
-    get_db_for_guild(guild.id)
-    print(f"[REMI] Prepared DB and folders for guild: {guild.name} - {guild.id}")
+    if REMINDER_STORAGE == "sqlite":
+        import_json_guild(guild.id)
+    due_queue.load_guild(guild.id, await load_reminders(guild.id))
+    log_remi.info("Prepared DB and folders for guild: %s - %s", guild.name, guild.id)
+
+@bot.before_invoke
+async def start_command_timer(ctx: commands.Context):
+    ctx.started_at = pytime.perf_counter()
+
+@bot.after_invoke
+async def record_command(ctx: commands.Context):
+    """
+    Runs after every command callback that completed, slash or prefix
+    """
+    status = "failed" if ctx.command_failed else "ok"
+    command_seconds.observe(pytime.perf_counter() - ctx.started_at, command=ctx.command.qualified_name, status=status)
+
+@bot.event
+async def on_command_error(ctx: commands.Context, error: commands.CommandError):
+    """
+    Called when a command raises or fails a check (replaces discord.py's default printout)
+    """
+    if ctx.command is None:
+        return # Unknown prefix command
+    started_at = getattr(ctx, "started_at", None)
+    if started_at is not None:
+        command_seconds.observe(pytime.perf_counter() - started_at, command=ctx.command.qualified_name, status="error")
+    log_remi.error("Command %s failed: %s", ctx.command.qualified_name, error, exc_info=error)
 
 # COMMANDS
 @bot.hybrid_command(
@@ -174,6 +585,7 @@ async def on_guild_join(guild: dc.Guild):
     messages="Messages to send, separated by \\n",
     mentions="Mention a user or a role",
     repeat="Interval to repeat the reminder in the format of '1w 2d 3h 4m 5s'",
+    catch_up="If fires are missed (e.g. bot downtime): deliver once, deliver each one, or skip them",
 )
 async def create_reminder(
     ctx: commands.Context,
@@ -183,12 +595,13 @@ async def create_reminder(
     messages: typing.Optional[str] = "",   # Messages to send
     mentions: typing.Optional[str] = "",   # Mentions to send the reminder to
     repeat: typing.Optional[str] = None,   # Interval to repeat the reminder
+    catch_up: typing.Optional[typing.Literal["once", "all", "skip"]] = None,  # Policy for missed fires
 ):
     """
     Create a reminder.
     """
-    print(f"[REMI] {ctx.author.name} creating reminder in {ctx.guild.name}")
-    print(f"\t[MAKE] Parsing info...")
+    log_make.info("%s creating reminder in %s", ctx.author.name, ctx.guild.name)
+    log_make.debug("Parsing info...")
 
     if time is None:
         # Default to the current bot time
@@ -215,6 +628,9 @@ async def create_reminder(
     except ValueError as e:
         await ctx.send(str(e), ephemeral=True)
         return
+    if SCHEDULER_MODE != "event":
+        # Polling only has minute resolution
+        t = t.replace(second=0)
 
     # Parse repeat into seconds (use existing helper)
     repeat_seconds = await time2seconds(ctx, repeat) if repeat else None
@@ -225,69 +641,118 @@ async def create_reminder(
         "guild_id": ctx.guild.id,
         "channel_id": ctx.channel.id,
         "reminder_id": uuid_base62(),
-        "time": t.strftime("%Y-%m-%d-%H:%M"),
+        "time": int(t.timestamp()),
         "title": title,
         "subtitles": subs,
         "message": msgs,
         "mentions": mention_str,
-        "repeat": int(repeat_seconds / 60) if repeat_seconds else None,  # store repeat in minutes
+        "repeat": repeat_seconds if repeat_seconds else None,  # store repeat in seconds
     }
+    if catch_up is not None:
+        reminder_obj["catch_up"] = catch_up  # Unset uses CATCH_UP_POLICY
 
     # Persist using DB
     await upsert_reminder(ctx.guild.id, reminder_obj)
+    due_queue.schedule(ctx.guild.id, reminder_obj)
 
-    print(f"\t[MAKE] Reminder ID: {reminder_obj['reminder_id']} Created!")
+    log_make.info("Reminder ID: %s Created!", reminder_obj["reminder_id"])
     await ctx.send(f"Reminder {title} set for {mentions} at {time}", ephemeral=True)
 
-@bot.hybrid_command(
-    name="reminders",
-    description="List all reminders for the server",
-)
-async def list_reminders(ctx: commands.Context):
+def clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+async def reminder_field(reminder: dict) -> tuple[str, str]:
+    """
+    Renders one reminder as an embed field (name, value), clipped to Discord's field limits
+    """
+    next_unix = reminder_fire_ts(reminder)
+    repeat_text = await seconds2time(reminder["repeat"]) if reminder.get("repeat") else "No Repeat Set"
+    if next_unix is None:
+        when = f"> `Next Reminder`: Not scheduled ({reminder.get('time')})\n"
+    else:
+        when = (
+            f"> `Next Reminder`: {datetime.fromtimestamp(next_unix).strftime('%Y-%m-%d-%H:%M:%S')}\n"
+            f"> `Local Time`: <t:{next_unix}:F>\n"
+        )
+
+    value_str = (
+        when +
+        f"> `Title`: {reminder.get('title','')}\n"
+        f"> `ID`: {reminder['reminder_id']}\n"
+        f"> `Repeat every`: {repeat_text}\n"
+        f"> `Issuer`: <@{reminder['issuer_id']}>"
+    )
+    mentions_str = " ".join(reminder.get("mentions", []))
+    return clip(f"Reminder for {mentions_str}", 256), clip(value_str, 1024)
+
+async def reminders_page(guild_id: int, cursor, page: int, total: int, description: str = "List of reminders", **filters) -> tuple[dc.Embed, typing.Any]:
     """
-    List all reminders for the server
+    Builds one page of the reminders listing, starting after cursor. Returns the embed and the
+    cursor of the next page (None on the last page)
     """
-    print(f"[LIST] {ctx.author.name} checking reminders in {ctx.guild.name}")
-    reminders = await load_reminders(ctx.guild.id)
+    # One extra row tells whether another page follows
+    with storage_seconds.time(op="page"):
+        rows = storage.page(guild_id, REMINDERS_PAGE_SIZE + 1, cursor, **filters)
 
     em = dc.Embed(
         title="Reminders",
-        description="List of reminders",
+        description=description,
         color=0x00ff00,
     )
+    footer = f"Page {page + 1} - {total} reminders"
+    em.set_footer(text=footer)
 
-    if not reminders:
+    if not rows:
         em.add_field(
             name="No reminders",
-            value="There are no reminders set for this server.",
+            value="There are no reminders set for this server." if page == 0 else "No more reminders.",
             inline=False,
         )
-    else:
-        print(f"[LIST] Parsing {len(reminders)} reminders in {ctx.guild.name}")
-        for reminder in reminders:
-            # next reminder time and local time rendering
-            next_unix = int(datetime.strptime(reminder["time"], "%Y-%m-%d-%H:%M").timestamp())
-            repeat_text = await seconds2time(reminder["repeat"] * 60) if reminder.get("repeat") else "No Repeat Set"
-
-            value_str = (
-                f"> `Next Reminder`: {reminder['time']}\n"
-                f"> `Local Time`: <t:{next_unix}:F>\n"
-                f"> `Title`: {reminder.get('title','')}\n"
-                f"> `ID`: {reminder['reminder_id']}\n"
-                f"> `Repeat every`: {repeat_text}\n"
-                f"> `Issuer`: <@{reminder['issuer_id']}>"
-            )
+        return em, None
+
+    size = len(em.title) + len(em.description) + len(footer)
+    shown = 0
+    for reminder in rows[:REMINDERS_PAGE_SIZE]:
+        name, value = await reminder_field(reminder)
+        # Stop early rather than go over the embed's total character limit
+        if shown and size + len(name) + len(value) > EMBED_CHAR_LIMIT:
+            break
+        em.add_field(name=name, value=value, inline=False)
+        size += len(name) + len(value)
+        shown += 1
 
-            mentions_str = " ".join(reminder.get("mentions", []))
+    return em, (page_key(rows[shown - 1]) if shown < len(rows) else None)
 
-            em.add_field(
-                name=f"Reminder for {mentions_str}",
-                value=value_str,
-                inline=False,
-            )
+@bot.hybrid_command(
+    name="reminders",
+    description="List all reminders for the server",
+    show="'mine' for reminders you set, 'channel' for reminders in this channel",
+)
+async def list_reminders(ctx: commands.Context, show: typing.Optional[typing.Literal["mine", "channel"]] = None):
+    """
+    List all reminders for the server, or only yours or this channel's, one page at a time
+    """
+    log_list.info("%s checking reminders (%s) in %s", ctx.author.name, show or "all", ctx.guild.name)
+    guild_id = ctx.guild.id
+    if show == "mine":
+        filters, description = {"issuer_id": ctx.author.id}, f"Reminders set by {ctx.author.mention}"
+    elif show == "channel":
+        filters, description = {"channel_id": ctx.channel.id}, f"Reminders in {ctx.channel.mention}"
+    else:
+        filters, description = {}, "List of reminders"
+    with storage_seconds.time(op="count"):
+        total = storage.count(guild_id, **filters)
+
+    async def fetch(cursor, page: int):
+        return await reminders_page(guild_id, cursor, page, total, description, **filters)
 
-    await ctx.send(embed=em, ephemeral=True)
-    print(f"[LIST] Sent reminders list of {len(reminders)} reminders in {ctx.guild.name} -> {ctx.channel.name}")
+    pages = CursorPaginator(fetch)
+    em = await pages.load()
+    if pages.has_more:
+        pages.message = await ctx.send(embed=em, view=pages, ephemeral=True)
+    else:
+        await ctx.send(embed=em, ephemeral=True)
+    log_list.debug("Sent first page of %s reminders in %s -> %s", total, ctx.guild.name, ctx.channel.name)
 
 @bot.hybrid_command(
     name="delete_reminder",
@@ -298,15 +763,10 @@ async def delete_reminder(ctx: commands.Context, reminder_id: str):
     """
     Delete a reminder by ID
     """
-    print(f"[DLET] {ctx.author.name} deleting reminder {reminder_id} in {ctx.guild.name}")
+    log_dlet.info("%s deleting reminder %s in %s", ctx.author.name, reminder_id, ctx.guild.name)
 
     # Ensure permission: only issuer, server owner, admin, or bot owner
-    reminders = await load_reminders(ctx.guild.id)
-    found = None
-    for r in reminders:
-        if r["reminder_id"] == reminder_id:
-            found = r
-            break
+    found = await get_reminder(ctx.guild.id, reminder_id)
 
     if not found:
         await ctx.send("Reminder not found... Please ensure you have the correct Reminder ID", ephemeral=True)
@@ -318,9 +778,11 @@ async def delete_reminder(ctx: commands.Context, reminder_id: str):
         return
 
     deleted = await delete_reminder_by_id(ctx.guild.id, reminder_id)
+    due_queue.remove(ctx.guild.id, reminder_id)
+    catch_up.discard(ctx.guild.id, reminder_id)
     if deleted > 0:
         await ctx.send("Reminder deleted!", ephemeral=True)
-        print(f"[DLET] Deleted reminder {reminder_id} in {ctx.guild.name}")
+        log_dlet.info("Deleted reminder %s in %s", reminder_id, ctx.guild.name)
     else:
         await ctx.send("Reminder not found... Please ensure you have the correct Reminder ID", ephemeral=True)
 
@@ -334,36 +796,21 @@ async def test_reminder(ctx: commands.Context, id: str):
     Test a reminder: sends the reminder embed to the stored channel (non-ephemeral).
     """
     try:
-        print(f"[REMI] {ctx.author.name} testing reminder {id} in {ctx.guild.name}")
-        reminders = await load_reminders(ctx.guild.id)
-
-        for reminder in reminders:
-            if reminder["reminder_id"] == id:
-                channel = bot.get_channel(reminder["channel_id"])
-                if channel is None:
-                    await ctx.send("Channel for this reminder cannot be found.", ephemeral=True)
-                    return
-
-                em = dc.Embed(
-                    title=reminder.get("title", ""),
-                    color=0x00ff00,
-                )
-
-                subtitles = str(reminder.get("subtitles", "")).split("\\n")
-                messages = str(reminder.get("message", "")).split("\\n")
+        log_remi.info("%s testing reminder %s in %s", ctx.author.name, id, ctx.guild.name)
+        reminder = await get_reminder(ctx.guild.id, id)
 
-                for i, subtitle in enumerate(subtitles):
-                    em.add_field(
-                        name=subtitle,
-                        value=messages[i] if i < len(messages) else "",
-                        inline=False,
-                    )
+        if reminder is None:
+            await ctx.send("Reminder not found... Please ensure you have the correct Reminder ID", ephemeral=True)
+            return
 
-                await ctx.send(ephemeral=True, embed=em, content=" ".join(reminder.get("mentions", [])) if reminder.get("mentions") else None)
-                print(f"[REMI] Tested reminder {reminder['reminder_id']} to {channel.name} in {ctx.guild.name}")
-                return
+        channel = bot.get_channel(reminder["channel_id"])
+        if channel is None:
+            await ctx.send("Channel for this reminder cannot be found.", ephemeral=True)
+            return
 
-        await ctx.send("Reminder not found... Please ensure you have the correct Reminder ID", ephemeral=True)
+        content, em = payload_cache.get(ctx.guild.id, reminder)
+        await ctx.send(ephemeral=True, embed=em, content=content)
+        log_remi.debug("Tested reminder %s to %s in %s", reminder["reminder_id"], channel.name, ctx.guild.name)
     except Exception as e:
         await ctx.send(f"Error testing reminder: {str(e)}", ephemeral=True)
 
@@ -411,7 +858,7 @@ async def local_to_bot(ctx: commands.Context, time: typing.Optional[str] = None,
 
         await time_convert(
             ctx,
-            time=time if time is not None else (datetime.now() + timedelta(minutes=parse_UTC(utc))).strftime("%Y-%m-%d-%H:%M"),
+            time=time if time is not None else (datetime.now() + timedelta(minutes=get_timezone_offset_minutes(timezone))).strftime("%Y-%m-%d-%H:%M"),
             timezone=timezone if timezone is not None else "UTC",
             to=None
         )
@@ -439,6 +886,7 @@ async def time_convert(ctx: commands.Context, time: typing.Optional[str] = None,
     if timezone is not None:
         try:
             origin_utc = get_timezone_offset_str(timezone)
+            origin_offset = get_timezone_offset_minutes(timezone)
         except FileNotFoundError:
             await ctx.send(f"timezones_info.json file not found. Please Contact Bot Owner", ephemeral=True)
             return
@@ -448,10 +896,12 @@ async def time_convert(ctx: commands.Context, time: typing.Optional[str] = None,
     else:
         timezone = "UTC"
         origin_utc = "+0:00"
+        origin_offset = 0
 
     if to is not None:
         try:
             target_utc = get_timezone_offset_str(to)
+            target_offset = get_timezone_offset_minutes(to)
         except FileNotFoundError:
             await ctx.send(f"timezones_info.json file not found. Please Contact Bot Owner", ephemeral=True)
             return
@@ -461,10 +911,9 @@ async def time_convert(ctx: commands.Context, time: typing.Optional[str] = None,
     else:
         to = "UTC"
         target_utc = "+0:00"
+        target_offset = 0
 
     try:
-        origin_offset = parse_UTC(origin_utc)
-        target_offset = parse_UTC(target_utc)
         if time is None:
             time = (datetime.now() + timedelta(minutes=origin_offset)).strftime("%Y-%m-%d-%H:%M")
 
@@ -483,23 +932,19 @@ async def time_convert(ctx: commands.Context, time: typing.Optional[str] = None,
         await ctx.send(f"Error: {str(e)}", ephemeral=True)
         return
 
-@bot.hybrid_command(
-    name="timezones",
-    description="List all accepted timezones",
-)
-async def list_timezones(ctx: commands.Context):
+# Timezone list pages, rebuilt only when the timezone table changes
+timezone_pages = {"version": None, "embeds": []}
+
+def get_timezone_pages() -> list[dc.Embed]:
     """
-    List all accepted timezones
+    Returns the paginated timezone embeds, building them once per version of the timezone table
     """
-    ems = []
-
-    try:
-        with open("data/timezones_info.json", "r") as f:
-            timezones_info: dict[str, str] = json.load(f)
-    except FileNotFoundError:
-        await ctx.send("timezones_info.json file not found. Please Contact Bot Owner", ephemeral=True)
-        return
+    version = timezones_version()
+    if timezone_pages["version"] == version:
+        return timezone_pages["embeds"]
 
+    timezones_info = load_timezones()
+    ems = []
     em = dc.Embed(
         title="Available Timezones",
         description="List of available timezones with their UTC offsets",
@@ -524,94 +969,308 @@ async def list_timezones(ctx: commands.Context):
     em.set_footer(text=f"Page {len(ems) + 1} of {len(ems) + 1}")
     ems.append(em)
 
+    timezone_pages["version"] = version
+    timezone_pages["embeds"] = ems
+    return ems
+
+@bot.hybrid_command(
+    name="timezones",
+    description="List all accepted timezones",
+)
+async def list_timezones(ctx: commands.Context):
+    """
+    List all accepted timezones
+    """
+    try:
+        ems = get_timezone_pages()
+    except FileNotFoundError:
+        await ctx.send("timezones_info.json file not found. Please Contact Bot Owner", ephemeral=True)
+        return
+
     pages = Paginator(ems)
     msg = await ctx.send(embed=ems[0], view=pages, ephemeral=True)
     pages.message = msg
 
 # TASKS
-@tasks.loop(seconds=60)
-async def reminder_task():
+def finish_fire(batch, guild, reminder: dict, reminder_time: int, now_ts: float):
     """
-    Check reminders every minute and handle sending/updating/deleting via DB
+    Queue a fired reminder's deletion, or its advance to the next repeat, on batch
     """
-    print("[REMI] Checking reminders...")
-    now_str = datetime.now().strftime("%Y-%m-%d-%H:%M")
-    now_dt = datetime.strptime(now_str, "%Y-%m-%d-%H:%M")
-    print(f"\t[REMI] Current time: {now_str}")
+    if reminder.get("repeat") is None:
+        # Not repeating, delete from DB
+        batch.delete(reminder["reminder_id"])
+        payload_cache.invalidate(guild.id, reminder["reminder_id"])
+        log_remi.debug("No repeat set. Removing reminder %s from %s", reminder["reminder_id"], guild.name, extra=SAMPLED)
+        return
 
-    for guild in bot.guilds:
-        db = get_db_for_guild(guild.id)
-        reminders = db.get_all()
-        updated_any = False
-
-        # Iterate over a copy to safely modify DB
-        for reminder in list(reminders):
-            try:
-                reminder_time = datetime.strptime(reminder["time"], "%Y-%m-%d-%H:%M")
-            except Exception:
+    # Advance by as many repeats as needed to land in the future (one for an on-time fire)
+    next_time = next_fire_after(reminder_time, reminder["repeat"], now_ts)
+    batch.update(reminder["reminder_id"], {"time": next_time})
+    due_queue.schedule_at(guild.id, reminder["reminder_id"], next_time)
+
+def commit_fires(batch, guild) -> BatchResult:
+    """
+    Commit a guild's reschedules and deletions in one write
+    """
+    if not batch:
+        return BatchResult()
+    with storage_seconds.time(op="commit"):
+        result = batch.commit()
+    storage_rows_written.inc(result.rows_changed)
+    storage_bytes_written.inc(result.bytes_written)
+    log_save.debug(
+        "Updated reminders stored for guild %s (%s): %s rows, %s bytes",
+        guild.name, guild.id, result.rows_changed, result.bytes_written, extra=SAMPLED,
+    )
+    return result
+
+async def fire_due_reminders(now_ts: float, shard_id: typing.Optional[int] = None):
+    """
+    Pop the reminders due at now_ts from the index (of one shard, or all owned shards), send
+    them through the dispatcher (or the catch-up queue if they are late) and commit the
+    resulting reschedules/deletions via DB. Returns the tick's write totals.
+    """
+    global last_tick_ts
+    last_tick_ts = pytime.time()
+    tick_start = pytime.perf_counter()
+    written = BatchResult()
+
+    if shard_id is not None and not owns_shard(shard_id):
+        # Standby: the lease holder fires these (reminders created here were handed off to it)
+        due_queue.pop_due(now_ts, shard_id)
+        return written
+
+    # Group due reminders by guild so each guild store is read at most once per tick
+    shard_label = "all" if shard_id is None else shard_id
+    due_by_guild: dict[int, list[tuple[str, int]]] = {}
+    popped = due_queue.pop_due(now_ts, shard_id)
+    reminders_scanned.inc(len(popped), shard=shard_label)
+    for guild_id, reminder_id, fire_ts in popped:
+        due_by_guild.setdefault(guild_id, []).append((reminder_id, fire_ts))
+
+    # Fan the sends out first; storage is only updated once each send has resolved
+    sends: dict[int, list[tuple[dict, int, asyncio.Future]]] = {}
+    missed: dict[int, list[tuple[dict, int]]] = {}
+    for guild_id, due in due_by_guild.items():
+        guild = bot.get_guild(guild_id)
+        if guild is None:
+            continue
+
+        for reminder_id, fire_ts in due:
+            with storage_seconds.time(op="get"):
+                reminder = storage.get(guild_id, reminder_id)
+            if reminder is None:
+                # Deleted since it was indexed
+                continue
+
+            reminder_time = reminder_fire_ts(reminder)
+            if reminder_time is None:
                 # Skip malformed entries
                 continue
 
-            late = reminder_time < now_dt
-            do_reminder = late or (reminder_time == now_dt)
-
-            if late:
-                print(f"\t[REMI] Reminder {reminder['reminder_id']} is in the past!")
-                if reminder.get("repeat") is not None:
-                    # Calculate how many repeats have passed and update time accordingly
-                    delta_min = (now_dt - reminder_time).total_seconds() // 60
-                    repeats_passed = int(delta_min // reminder["repeat"]) + 1
-                    new_time = reminder_time + timedelta(minutes=repeats_passed * reminder["repeat"])
-                    reminder["time"] = new_time.strftime("%Y-%m-%d-%H:%M")
-                    db.update_by("reminder_id", reminder["reminder_id"], {"time": reminder["time"]})
-                    updated_any = True
-
-            if do_reminder:
-                await send_reminder(reminder, guild)
-
-                if reminder.get("repeat") is None:
-                    # Not repeating, delete from DB
-                    db.delete_by("reminder_id", reminder["reminder_id"])
-                    updated_any = True
-                    print(f"\t[REMI] No repeat set. Removing reminder {reminder['reminder_id']} from {guild.name}")
-                elif not late:
-                    # Regular non-late repeating reminder; update next time by adding repeat minutes
-                    next_time = datetime.strptime(reminder["time"], "%Y-%m-%d-%H:%M") + timedelta(minutes=reminder["repeat"])
-                    reminder["time"] = next_time.strftime("%Y-%m-%d-%H:%M")
-                    db.update_by("reminder_id", reminder["reminder_id"], {"time": reminder["time"]})
-                    updated_any = True
-                # if late and has repeat handled above
-
-        if updated_any:
-            print(f"\t[REMI] Updated reminders stored for guild {guild.name} ({guild.id})")
-
-    print("[REMI] Finished checking reminders!")
+            if now_ts - reminder_time >= LATE_AFTER_SECONDS and (guild_id, reminder_id) not in send_attempts:
+                # Missed (not a retry of a failed send): hand it to the catch-up queue, unless it
+                # is already there after a reload; settle_missed updates it once sent
+                if (guild_id, reminder_id) not in catch_up:
+                    missed.setdefault(guild_id, []).append((reminder, reminder_time))
+                continue
+
+            future = await dispatcher.submit(reminder["channel_id"], send_reminder, reminder, guild)
+            sends.setdefault(guild_id, []).append((reminder, reminder_time, future))
+
+    for guild_id, late in missed.items():
+        guild = bot.get_guild(guild_id)
+        skipped = storage.batch(guild_id)
+        for reminder, reminder_time in late:
+            count = missed_occurrences(reminder_time, reminder.get("repeat"), now_ts)
+            queued = catch_up.add(guild_id, reminder, count)
+            log_remi.info("Reminder %s missed %s time(s); %s catch-up deliveries queued", reminder["reminder_id"], count, queued)
+            if catch_up.policy(reminder) == "skip":
+                # Nothing to deliver: move on as if it had fired
+                finish_fire(skipped, guild, reminder, reminder_time, now_ts)
+            # Otherwise the row stays as it is until settle_missed, once the catch-up was sent
+        written += commit_fires(skipped, guild)
+
+    for guild_id in sends:
+        guild = bot.get_guild(guild_id)
+        # Every reschedule and deletion of this guild is committed in one write
+        batch = storage.batch(guild_id)
+        done: list[tuple[dict, int]] = []
+
+        for reminder, reminder_time, future in sends[guild_id]:
+            key = (guild_id, reminder["reminder_id"])
+            if await future:
+                skew = pytime.time() - reminder_time
+                fire_skew.record(skew)
+                fire_skew_seconds.observe(skew)
+                reminders_fired.inc(shard=shard_label)
+                send_attempts.pop(key, None)
+            else:
+                send_attempts[key] = send_attempts.get(key, 0) + 1
+                if send_attempts[key] < SEND_MAX_ATTEMPTS:
+                    # Leave storage untouched and retry shortly
+                    due_queue.schedule_at(guild_id, reminder["reminder_id"], pytime.time() + SEND_RETRY_SECONDS)
+                    continue
+                log_remi.warning(
+                    "Giving up on reminder %s after %s attempts", reminder["reminder_id"], send_attempts.pop(key),
+                    extra={"guild_id": guild_id, "reminder_id": reminder["reminder_id"]},
+                )
+            done.append((reminder, reminder_time))
+
+        for reminder, reminder_time in done:
+            finish_fire(batch, guild, reminder, reminder_time, now_ts)
+        written += commit_fires(batch, guild)
+
+    fired = sum(len(guild_sends) for guild_sends in sends.values())
+    tick_duration = pytime.perf_counter() - tick_start
+    tick_seconds.observe(tick_duration, shard=shard_label)
+    if shard_id is not None:
+        tick_stats[shard_id].record(fired, tick_duration)
+    if missed:
+        reminders_late.inc(sum(len(late) for late in missed.values()), shard=shard_label)
+        log_remi.info("Catch-up queue: %s", catch_up.stats())
+    if sends:
+        shard_text = f" on shard {shard_id}" if shard_id is not None and SHARD_COUNT > 1 else ""
+        log_remi.info("Fire skew%s: %s", shard_text, fire_skew.summary())
+        log_save.debug("Tick wrote %s rows, %s bytes", written.rows_changed, written.bytes_written)
+
+    return written
+
+def poll_tick_ts(now: datetime) -> float:
+    """
+    Epoch a poll tick at now fires up to: the end of the current minute
+    """
+    now_str = now.strftime("%Y-%m-%d-%H:%M")
+    log_remi.debug("Current time: %s", now_str)
+    return datetime.strptime(now_str, "%Y-%m-%d-%H:%M").timestamp() + 59
+
+@tasks.loop(seconds=60)
+async def reminder_task():
+    """
+    Check reminders every minute (poll mode)
+    """
+    log_remi.debug("Checking reminders...")
+    now_ts = poll_tick_ts(datetime.now())
+    profiling = tick_profiler.active
+    if profiling:
+        tick_profiler.tick_started()
+    try:
+        await asyncio.gather(*(fire_due_reminders(now_ts, shard_id) for shard_id in due_queue.shard_ids))
+    finally:
+        if profiling:
+            tick_profiler.tick_finished()
+    log_remi.debug("Finished checking reminders!")
+
+async def event_scheduler(shard_id: int):
+    """
+    Sleep until the shard's earliest pending reminder (event mode), re-arming when a sooner one is scheduled
+    """
+    wakeup = scheduler_wakeups[shard_id]
+    while True:
+        wakeup.clear()
+        next_ts = due_queue.next_fire(shard_id)
+        timeout = None if next_ts is None else max(0.0, next_ts - pytime.time())
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout)
+            continue # Index changed; recompute the next wakeup
+        except asyncio.TimeoutError:
+            pass
+
+        profiling = tick_profiler.active
+        if profiling:
+            tick_profiler.tick_started()
+        try:
+            await fire_due_reminders(pytime.time(), shard_id)
+        except Exception as e:
+            log_remi.exception("Scheduler tick failed on shard %s: %s", shard_id, e)
+        finally:
+            if profiling:
+                tick_profiler.tick_finished()
+
+def scheduler_running() -> bool:
+    if SCHEDULER_MODE == "event":
+        return all(
+            shard_id in scheduler_handles and not scheduler_handles[shard_id].done()
+            for shard_id in due_queue.shard_ids
+        )
+    return reminder_task.is_running()
+
+async def start_scheduler():
+    if SCHEDULER_MODE == "event":
+        for shard_id in due_queue.shard_ids:
+            if shard_id not in scheduler_handles or scheduler_handles[shard_id].done():
+                scheduler_handles[shard_id] = asyncio.create_task(event_scheduler(shard_id))
+        return
+
+    log_init.info("Waiting for minute time...")
+    # Wait until the next minute boundary to align checks to minute resolution
+    await dc.utils.sleep_until(datetime.now() + timedelta(seconds=60 - datetime.now().second))
+    reminder_task.start()
+
+def stop_scheduler():
+    if SCHEDULER_MODE == "event":
+        for handle in scheduler_handles.values():
+            handle.cancel()
+        return
+    reminder_task.cancel()
 
 @tasks.loop(minutes=15)
 async def heartbeat_task():
     """
     Send a heartbeat to the healthcheck service every 15 minutes
     """
-    print("[BEAT] Sending heartbeat to healthchecks.io...")
+    global heartbeat_session
+    # A failing ping says nothing about the scheduler; only restart it if it has died
+    if not scheduler_running():
+        await start_scheduler()
+        log_beat.info("Restarted reminder task successfully.")
+
+    log_beat.debug("Sending heartbeat to healthchecks.io...")
     heartbeat_uuid = os.getenv("HEARTBEAT_UUID")
     if not heartbeat_uuid:
-        print("[BEAT] No HEARTBEAT_UUID set; skipping heartbeat.")
+        log_beat.debug("No HEARTBEAT_UUID set; skipping heartbeat.")
         return
 
+    if heartbeat_session is None or heartbeat_session.closed:
+        heartbeat_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10, connect=5),
+            connector=aiohttp.TCPConnector(limit=2, ttl_dns_cache=3600),
+        )
+
     try:
-        response = requests.get(f"https://hc-ping.com/{heartbeat_uuid}")
-        if response.status_code == 200:
-            print("[BEAT] Heartbeat sent successfully!")
-            if not reminder_task.is_running():
-                reminder_task.start()
-                print("\t[BEAT] Restarted reminder task successfully.")
-        else:
-            print(f"[BEAT] Failed to send heartbeat: {response.status_code} - {response.text}")
-            if reminder_task.is_running():
-                reminder_task.cancel()
-                print("\t[BEAT] Stopped reminder task successfully.")
-    except Exception as e:
-        print(f"[BEAT] Failed to send ping: {e}")
+        async with heartbeat_session.get(f"https://hc-ping.com/{heartbeat_uuid}") as response:
+            if response.status == 200:
+                log_beat.info("Heartbeat sent successfully!")
+            else:
+                log_beat.warning("Failed to send heartbeat: %s - %s", response.status, await response.text())
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        log_beat.warning("Failed to send ping: %r", e)
+
+@tasks.loop(seconds=5)
+async def flush_task():
+    """
+    Write back guild stores changed since the last flush
+    """
+    with storage_seconds.time(op="flush"):
+        written = storage.flush()
+    if written:
+        storage_bytes_written.inc(written)
+        log_save.info("Flushed %s bytes of changed guild stores (%s)", written, storage.stats())
+    if lease_manager is not None:
+        # A standby must not serve cached copies of guilds the lease holder keeps changing
+        for shard_id in SHARD_IDS:
+            if not owns_shard(shard_id):
+                for guild_id in shard_guild_ids(shard_id):
+                    storage.drop(guild_id)
+
+@tasks.loop(seconds=30)
+async def compact_task():
+    """
+    Fold grown journals into fresh snapshots
+    """
+    compacted = await storage.compact()
+    if compacted:
+        log_save.info("Compacted %s guild journals", compacted)
 
 # OWNER COMMANDS
 @bot.command(
@@ -630,7 +1289,54 @@ async def sync(ctx: commands.Context):
     except Exception:
         pass
     await msg.edit(content="Synced the tree!", delete_after=2)
-    print(f"[REMI] Synced the tree!")
+    log_remi.info("Synced the tree!")
+
+# Upper bound on a profiling session, however few ticks arrive
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "900"))
+
+@bot.command(
+    name="profile",
+    description="Profile the next scheduler ticks",
+)
+@commands.is_owner()
+async def profile(ctx: commands.Context, *options: str):
+    """
+    Profile the scheduler: "profile ticks=5" (the default) or "profile seconds=30", plus
+    "top=N" for the report length. Replies with the report as a file
+    """
+    usage = "Usage: profile [ticks=N | seconds=S] [top=N]"
+    settings: dict[str, typing.Optional[float]] = {"ticks": None, "seconds": None, "top": 25}
+    for option in options:
+        key, _, value = option.partition("=")
+        if key not in settings:
+            await ctx.send(usage, ephemeral=True)
+            return
+        try:
+            settings[key] = float(value)
+        except ValueError:
+            await ctx.send(usage, ephemeral=True)
+            return
+    ticks = None if settings["ticks"] is None else int(settings["ticks"])
+    if ticks is None and settings["seconds"] is None:
+        ticks = 5
+    top = max(1, int(settings["top"]))
+
+    if tick_profiler.active:
+        await ctx.send("A profiling session is already running.", ephemeral=True)
+        return
+    done = tick_profiler.start(ticks=ticks, seconds=settings["seconds"], top=top, max_seconds=PROFILE_MAX_SECONDS)
+    window = f"the next {ticks} ticks" if ticks is not None else f"{settings['seconds']:g}s"
+    await ctx.send(f"Profiling {window}...", ephemeral=True)
+    log_remi.info("%s started profiling %s", ctx.author.name, window)
+
+    report = await done
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
+    await ctx.send(
+        f"Profiled {tick_profiler.ticks} ticks.",
+        file=dc.File(io.BytesIO(report.encode("utf-8")), filename=filename),
+        ephemeral=True,
+    )
+    log_remi.info("Profile finished after %s ticks", tick_profiler.ticks)
 
 # Runner
 async def run_bot(token: str):
@@ -638,34 +1344,46 @@ async def run_bot(token: str):
         try:
             await bot.start(token)
         except (dc.ConnectionClosed, dc.GatewayNotFound, dc.HTTPException) as e:
-            print(f"[WARN] Lost connection: {e}. Retrying in 10s...")
+            log_info.warning("Lost connection: %s. Retrying in 10s...", e)
             await asyncio.sleep(10)
         except asyncio.CancelledError:
-            print("[INFO] Bot shutdown requested!")
+            log_info.info("Bot shutdown requested!")
+            dispatcher.stop()
+            catch_up.stop()
+            tick_profiler.stop()
+            loop_lag.stop()
+            await health_server.stop()
+            if heartbeat_session is not None:
+                await heartbeat_session.close()
+            storage.close()
+            if lease_manager is not None:
+                lease_manager.stop()
             break
         except Exception as e:
-            with open(f"error_{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}.log", "a") as f:
-                f.write(f"{str(e)}\n")
+            log_info.exception("Bot crashed: %s", e)
 
 async def sleep_forever():
     while True:
         await asyncio.sleep(3600)
 
-if os.getenv("TEST_ENV") == "TRUE":
-    print("[INFO] Running in test environment!")
-    token = os.getenv("TEST_TOKEN")
-elif os.getenv("TEST_ENV") == "FALSE":
-    token = os.getenv("TOKEN")
-else:
-    print("[ERROR] TEST_ENV not set!")
+# Only start the bot when run as a script, so benchmarks and tools can import this module
+if __name__ == "__main__":
+    if os.getenv("TEST_ENV") == "TRUE":
+        log_info.info("Running in test environment!")
+        token = os.getenv("TEST_TOKEN")
+    elif os.getenv("TEST_ENV") == "FALSE":
+        token = os.getenv("TOKEN")
+    else:
+        log_info.error("TEST_ENV not set!")
+        try:
+            asyncio.run(sleep_forever())
+        except asyncio.CancelledError:
+            log_info.info("Sleep Cancelled!")
+
     try:
-        asyncio.run(sleep_forever())
-    except asyncio.CancelledError:
-        print("[INFO] Sleep Cancelled!")
-
-try:
-    asyncio.run(run_bot(token))
-except Exception as e:
-    # Append to error logs
-    with open(f"fatal_error_{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}.log", "a") as f:
-        f.write(f"{str(e)}\n")
+        asyncio.run(run_bot(token))
+    except Exception as e:
+        log_info.critical("Fatal error: %s", e, exc_info=True)
+    finally:
+        # Write out whatever is still queued
+        log_listener.stop()
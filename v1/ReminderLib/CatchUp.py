@@ -0,0 +1,180 @@
+"""
+Catch-up module for the Reminder Bot
+===
+This module delivers reminders whose fire time passed while the bot was down (or otherwise
+could not fire them) at a bounded rate instead of in one burst on the first tick.
+Each reminder's catch_up policy chooses what happens to its missed occurrences:
+- "once": one delivery noting how many times it was missed (the default)
+- "all": one delivery per missed occurrence, up to max_fires
+- "skip": nothing is delivered
+
+Missed fires of a reminder that is already waiting in the queue are merged into its entry,
+so a repeating reminder never has more than one entry however many ticks find it late.
+
+Deliveries are awaited one at a time. Once a reminder's last delivery is sent, or any of its
+deliveries fails, on_done(guild_id, reminder, sent) is called so the owner can settle the
+stored reminder; until then it is left as it was, and a restart queues it again.
+"""
+import time
+import asyncio
+import typing
+
+from collections import OrderedDict
+
+from ReminderLib.Log import get_logger
+
+log = get_logger("remi")
+
+POLICIES = ("once", "all", "skip")
+
+def missed_occurrences(fire_ts: int, repeat: typing.Optional[int], now_ts: float) -> int:
+    """
+    Number of times a reminder was due between fire_ts and now_ts (1 if it does not repeat)
+    """
+    if not repeat:
+        return 1
+    return int(now_ts - fire_ts) // repeat + 1
+
+class CatchUpQueue:
+    """
+    Drains missed deliveries through deliver(guild_id, reminder, missed), which returns whether
+    the reminder was sent, at rate per second, allowing bursts of up to burst deliveries after
+    an idle period
+    """
+    def __init__(
+        self,
+        deliver: typing.Callable[[int, typing.Dict, int], typing.Awaitable[bool]],
+        rate: float = 2.0,
+        burst: int = 5,
+        max_fires: int = 10,
+        default_policy: str = "once",
+        on_done: typing.Optional[typing.Callable[[int, typing.Dict, bool], typing.Any]] = None,
+    ):
+        self.deliver = deliver
+        self.on_done = on_done
+        self.rate = max(rate, 0.01)
+        self.burst = max(1, burst)
+        self.max_fires = max(1, max_fires)
+        self.default_policy = default_policy if default_policy in POLICIES else "once"
+        # (guild_id, reminder_id) -> [reminder snapshot, times missed, deliveries left]
+        self._entries: "OrderedDict[typing.Tuple[int, str], list]" = OrderedDict()
+        # Key of the reminder whose last delivery is being sent
+        self._delivering: typing.Optional[typing.Tuple[int, str]] = None
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self._task: typing.Optional[asyncio.Task] = None
+        self.queued = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.delivered = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return sum(entry[2] for entry in self._entries.values())
+
+    def __contains__(self, key: typing.Tuple[int, str]) -> bool:
+        """
+        Whether (guild_id, reminder_id) has deliveries queued or being sent
+        """
+        return key in self._entries or key == self._delivering
+
+    def policy(self, reminder: typing.Dict) -> str:
+        policy = reminder.get("catch_up")
+        return policy if policy in POLICIES else self.default_policy
+
+    def add(self, guild_id: int, reminder: typing.Dict, missed: int) -> int:
+        """
+        Queues the missed fires of a reminder by its policy. Returns the deliveries added
+        """
+        policy = self.policy(reminder)
+        if policy == "skip":
+            self.skipped += missed
+            return 0
+
+        deliveries = 1 if policy == "once" else min(missed, self.max_fires)
+        key = (guild_id, reminder["reminder_id"])
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [dict(reminder), missed, deliveries]
+        else:
+            # Keep the latest contents; "once" stays a single delivery
+            self.coalesced += 1
+            entry[0] = dict(reminder)
+            entry[1] += missed
+            deliveries = 0 if policy == "once" else min(deliveries, self.max_fires - entry[2])
+            entry[2] += deliveries
+        self.queued += deliveries
+        self.start()
+        self._wakeup.set()
+        return deliveries
+
+    def discard(self, guild_id: int, reminder_id: str):
+        """
+        Drops the pending deliveries of a reminder, e.g. once it is deleted
+        """
+        self._entries.pop((guild_id, reminder_id), None)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._drain())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _drain(self):
+        tokens = float(self.burst)
+        last = time.monotonic()
+        while True:
+            while not self._entries:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            now = time.monotonic()
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            last = now
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.rate)
+                continue
+            tokens -= 1
+
+            key, entry = next(iter(self._entries.items()))
+            reminder, missed, deliveries = entry
+            if deliveries > 1:
+                # Rotate so one reminder's backlog does not hold up the others
+                entry[2] -= 1
+                self._entries.move_to_end(key)
+                missed = 1
+            else:
+                del self._entries[key]
+                self._delivering = key
+                if self.policy(reminder) == "all":
+                    missed = 1
+            try:
+                sent = bool(await self.deliver(key[0], reminder, missed))
+            except Exception as e:
+                log.exception("Catch-up delivery of reminder %s failed: %s", key[1], e)
+                sent = False
+            finally:
+                self._delivering = None
+
+            if sent:
+                self.delivered += 1
+                if deliveries > 1:
+                    continue
+            else:
+                self.failed += 1
+                # The rest of its backlog is dropped; on_done decides how to retry
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            if self.on_done is not None:
+                try:
+                    self.on_done(key[0], reminder, sent)
+                except Exception as e:
+                    log.exception("Settling catch-up of reminder %s failed: %s", key[1], e)
+
+    def stats(self) -> str:
+        return (
+            f"pending={len(self)} queued={self.queued} delivered={self.delivered} "
+            f"failed={self.failed} coalesced={self.coalesced} skipped={self.skipped}"
+        )
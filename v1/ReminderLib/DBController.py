@@ -1,30 +1,149 @@
-import os, json, typing
+"""
+DBController module for the Reminder Bot
+===
+This module loads and saves the per-guild reminders file (data/<guild>/reminders.json) used by
+the 1.0.x and 1.1.x bots without blocking the event loop:
+- file I/O and JSON parsing run on a small bounded thread pool; a save is serialized on the
+  event loop when it is made, so the writer thread never touches the caller's reminders
+- a save writes a temporary file, fsyncs it and atomically renames it over the old one, so a
+  crash mid-write leaves the previous file intact
+- saves of one guild are written one at a time, and saves made while a write is in flight are
+  coalesced: only the latest state is written next, and every caller waits for that write
+- loads see the latest saved state even while it is still being written
+- reads and renames of one guild's file never overlap, as Windows refuses to replace a file
+  that is open
+
+Files are written compactly unless DB_JSON_INDENT is set (e.g. 4 for the old pretty-printed form).
+"""
+import os, json, typing, asyncio, tempfile, threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ReminderLib.Log import get_logger
+
+__all__ = ["load_reminders", "save_reminders"]
+
+log_load = get_logger("load")
+log_save = get_logger("save")
+
+# Indentation of written files; unset writes compact JSON, roughly half the size and time
+_indent = os.getenv("DB_JSON_INDENT", "")
+JSON_INDENT: typing.Optional[int] = int(_indent) if _indent else None
+
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("DB_IO_WORKERS", "4")), thread_name_prefix="remi-db")
+
+# guild_id -> latest saved state (serialized), until it is on disk
+_latest: typing.Dict[int, bytes] = {}
+# guild_id -> (serialized state waiting for the next write, its reminder count, future the savers wait on)
+_pending: typing.Dict[int, typing.Tuple[bytes, int, asyncio.Future]] = {}
+# guild_id -> task writing the guild's pending states in order
+_writers: typing.Dict[int, asyncio.Task] = {}
+
+# guild_id -> lock held while the guild's file is open for reading or being replaced
+_file_locks: typing.Dict[int, threading.Lock] = {}
+_file_locks_guard = threading.Lock()
+
+def _path(guild_id: int) -> str:
+    return f"data/{guild_id}/reminders.json"
+
+def _file_lock(guild_id: int) -> threading.Lock:
+    with _file_locks_guard:
+        return _file_locks.setdefault(guild_id, threading.Lock())
+
+def _read(guild_id: int) -> typing.Optional[typing.List[typing.Dict]]:
+    try:
+        with _file_lock(guild_id):
+            with open(_path(guild_id), "rb") as f:
+                data = f.read()
+    except FileNotFoundError:
+        return None
+    return json.loads(data)
+
+def _write(guild_id: int, data: bytes):
+    """
+    Writes the serialized reminders crash-safely. Runs on the I/O pool
+    """
+    folder = os.path.dirname(_path(guild_id))
+    if not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+        log_save.info("Created folder for guild: %s", guild_id)
+
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".reminders-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        with _file_lock(guild_id):
+            os.replace(tmp_path, _path(guild_id))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    # Persist the rename itself
+    if os.name == "posix":
+        dir_fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 async def load_reminders(guild_id : int) -> typing.List[typing.Dict]:
     """
     Load reminders from file
     """
-    if not os.path.exists(f"data/{guild_id}/reminders.json"):
-        print(f"\t[LOAD] No reminder folder found for {guild_id}. Creating file...")
-        return []
+    loop = asyncio.get_running_loop()
+    if guild_id in _latest:
+        # A save is still being written; serve its state
+        return await loop.run_in_executor(_pool, json.loads, _latest[guild_id])
 
-    with open(f"data/{guild_id}/reminders.json", "r") as f:
-        reminders = json.load(f)
+    reminders = await loop.run_in_executor(_pool, _read, guild_id)
+    if reminders is None:
+        log_load.info("No reminder folder found for %s. Creating file...", guild_id)
+        return []
 
     if not len(reminders) == 0:
-        print(f"\t[LOAD] Loaded {len(reminders)} reminders for {guild_id}!")
-    
+        log_load.info("Loaded %s reminders for %s!", len(reminders), guild_id)
+
     return reminders
 
-async def save_reminders(guild_id : int, reminders : typing.List[typing.Dict]):
+async def save_reminders(guild_id : int, reminders : typing.List[typing.Dict], indent : typing.Optional[int] = JSON_INDENT):
     """
-    Save reminders to file
+    Save reminders to file. Returns once a write including this state is on disk
     """
-    print(f"\t[SAVE] Saving {len(reminders)} reminders for {guild_id}...")
-    if not os.path.exists(f"data/{guild_id}"):
-        os.makedirs(f"data/{guild_id}")
-        print(f"\t[SAVE] Created folder for guild: {guild_id}")
-
-    with open(f"data/{guild_id}/reminders.json", "w") as f:
-        json.dump(reminders, f, indent=4)
-    print(f"\t[SAVE] Saved {len(reminders)} reminders for {guild_id}!")
\ No newline at end of file
+    log_save.info("Saving %s reminders for %s...", len(reminders), guild_id)
+    # Serialize now: the caller may keep changing its reminders while the write waits
+    separators = None if indent is not None else (",", ":")
+    state = json.dumps(reminders, indent=indent, separators=separators).encode("utf-8")
+    _latest[guild_id] = state
+
+    pending = _pending.get(guild_id)
+    if pending is not None:
+        # Not started yet: replace the older state, whose savers now wait for this one
+        future = pending[2]
+    else:
+        future = asyncio.get_running_loop().create_future()
+    _pending[guild_id] = (state, len(reminders), future)
+
+    if guild_id not in _writers:
+        _writers[guild_id] = asyncio.create_task(_write_pending(guild_id))
+    await asyncio.shield(future)
+
+async def _write_pending(guild_id: int):
+    loop = asyncio.get_running_loop()
+    try:
+        while guild_id in _pending:
+            state, count, future = _pending.pop(guild_id)
+            try:
+                await loop.run_in_executor(_pool, _write, guild_id, state)
+            except Exception as e:
+                log_save.error("Failed to save reminders for %s: %s", guild_id, e)
+                future.set_exception(e)
+            else:
+                log_save.info("Saved %s reminders for %s!", count, guild_id)
+                future.set_result(None)
+            finally:
+                if _latest.get(guild_id) is state:
+                    del _latest[guild_id]
+    finally:
+        del _writers[guild_id]
@@ -0,0 +1,92 @@
+"""
+Dispatcher module for the Reminder Bot
+===
+This module fans reminder sends out over a fixed pool of asyncio workers.
+Jobs for the same channel form a lane that a single worker drains in submission order,
+so messages in a channel keep their order while different channels are sent concurrently.
+The worker count bounds global concurrency and the queue depth bounds how many lanes may
+wait for a worker before submit() applies backpressure.
+"""
+import asyncio
+import collections
+import typing
+
+class Dispatcher:
+    def __init__(self, workers: int = 8, queue_depth: int = 1000):
+        self.workers = max(1, workers)
+        self.queue_depth = queue_depth
+        self._queue: typing.Optional[asyncio.Queue] = None
+        self._lanes: typing.Dict[typing.Any, collections.deque] = {}
+        self._tasks: typing.List[asyncio.Task] = []
+        self.in_flight = 0
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of jobs submitted but not yet started
+        """
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_depth)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        """
+        Cancels the workers. Jobs not yet finished resolve to False, as a failed send would
+        """
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queue = None
+        for lane in self._lanes.values():
+            for _, _, future in lane:
+                if not future.done():
+                    future.set_result(False)
+        self._lanes.clear()
+
+    async def submit(self, lane_key: typing.Any, func: typing.Callable[..., typing.Awaitable], *args) -> asyncio.Future:
+        """
+        Queue func(*args) behind earlier jobs of the same lane. Returns a future for its result
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        lane = self._lanes.get(lane_key)
+        if lane is not None:
+            # Lane already queued or being drained; it will pick this job up in order
+            lane.append((func, args, future))
+            return future
+
+        self._lanes[lane_key] = collections.deque([(func, args, future)])
+        await self._queue.put(lane_key)
+        return future
+
+    async def _worker(self):
+        queue = self._queue
+        while True:
+            lane_key = await queue.get()
+            lane = self._lanes[lane_key]
+            try:
+                while lane:
+                    func, args, future = lane.popleft()
+                    self.in_flight += 1
+                    try:
+                        result = await func(*args)
+                        if not future.done():
+                            future.set_result(result)
+                    except asyncio.CancelledError:
+                        if not future.done():
+                            future.set_result(False)
+                        raise
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    finally:
+                        self.in_flight -= 1
+            finally:
+                # stop() may already have cleared the lanes and dropped the queue
+                if self._lanes.get(lane_key) is lane:
+                    del self._lanes[lane_key]
+                queue.task_done()
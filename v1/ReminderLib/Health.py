@@ -0,0 +1,98 @@
+"""
+Health module for the Reminder Bot
+===
+This module provides the local health/readiness HTTP endpoint and an event loop lag monitor.
+- /healthz answers 200 while the event loop keeps up (lag under the threshold)
+- /readyz answers 200 once the bot reports ready (gateway connected, scheduler running)
+Both return a JSON body with the current status so an orchestrator can probe the bot
+without an external service.
+- /metrics serves the metrics registry in the Prometheus text format, if one is given
+"""
+import asyncio
+import json
+import time
+import typing
+
+from aiohttp import web
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes a sleeping task, which is how long other work blocked it
+    """
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: typing.Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            self.max_lag = max(self.max_lag, self.lag)
+
+class HealthServer:
+    """
+    Serves /healthz and /readyz from status(), a callable returning a dict with at least
+    "ready" (bool) and "loop_lag" (seconds), and /metrics from metrics() if given
+    """
+    def __init__(
+        self,
+        status: typing.Callable[[], typing.Dict],
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        max_loop_lag: float = 5.0,
+        metrics: typing.Optional[typing.Callable[[], str]] = None,
+    ):
+        self.status = status
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.max_loop_lag = max_loop_lag
+        self.app = web.Application()
+        self.app.router.add_get("/healthz", self.healthz)
+        self.app.router.add_get("/readyz", self.readyz)
+        if metrics is not None:
+            self.app.router.add_get("/metrics", self.metrics_text)
+        self._runner: typing.Optional[web.AppRunner] = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _respond(self, ok: bool, body: typing.Dict) -> web.Response:
+        body = {"ok": ok, "time": time.time(), **body}
+        return web.Response(status=200 if ok else 503, text=json.dumps(body, default=str), content_type="application/json")
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        status = self.status()
+        return self._respond(status["loop_lag"] < self.max_loop_lag, status)
+
+    async def readyz(self, request: web.Request) -> web.Response:
+        status = self.status()
+        return self._respond(bool(status["ready"]), status)
+
+    async def metrics_text(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
@@ -0,0 +1,243 @@
+"""
+Journal module for the Reminder Bot
+===
+This module provides a journaled per-guild reminder file. Mutations are appended to
+`<base>.journal` as small JSON lines, the state is rebuilt on load by replaying the
+journal over the last snapshot in `<base>.snapshot.json`, and compaction folds the
+journal into a fresh snapshot once it grows past a size or ratio threshold.
+
+Every record carries a sequence number and the snapshot stores the last sequence it
+contains, so a crash at any point of a compaction replays exactly the missing records.
+A record torn by a crash mid-append is cut off the journal when it is next loaded.
+
+Every JournaledDB open on the same files shares one set of locks, so a guild store reopened
+while an evicted copy is still compacting cannot append into a journal being swapped out.
+"""
+import os
+import json
+import asyncio
+import typing
+import weakref
+import threading
+
+def apply_record(rows: typing.Dict[str, typing.Dict], record: typing.Dict):
+    """
+    Applies one journal record to rows keyed by reminder_id
+    """
+    op = record["op"]
+    if op == "upsert":
+        rows[record["row"]["reminder_id"]] = record["row"]
+    elif op == "update":
+        if record["id"] in rows:
+            rows[record["id"]].update(record["fields"])
+    elif op == "delete":
+        rows.pop(record["id"], None)
+    elif op == "replace":
+        rows.clear()
+        for row in record["rows"]:
+            rows[row.get("reminder_id")] = row
+
+class _SharedFiles:
+    """
+    State shared by every JournaledDB open on one base path
+    """
+    def __init__(self):
+        # Held while appending and while compaction swaps in the trimmed journal
+        self.journal_lock = threading.Lock()
+        # One compaction at a time, never going back to an older snapshot
+        self.compact_lock = threading.Lock()
+        self.snapshot_seq = 0
+
+_shared: "weakref.WeakValueDictionary[str, _SharedFiles]" = weakref.WeakValueDictionary()
+_shared_guard = threading.Lock()
+
+def _shared_files(base_path: str) -> _SharedFiles:
+    with _shared_guard:
+        key = os.path.abspath(base_path)
+        shared = _shared.get(key)
+        if shared is None:
+            shared = _shared[key] = _SharedFiles()
+        return shared
+
+class JournaledDB:
+    """
+    Snapshot plus append-only journal for one guild
+    """
+    def __init__(
+        self,
+        base_path: str,
+        seed: typing.Optional[typing.Callable[[], typing.List[typing.Dict]]] = None,
+        max_journal_bytes: int = 1024 * 1024,
+        max_journal_ratio: float = 1.0,
+        fsync: bool = True,
+    ):
+        self.snapshot_path = base_path + ".snapshot.json"
+        self.journal_path = base_path + ".journal"
+        self.max_journal_bytes = max_journal_bytes
+        self.max_journal_ratio = max_journal_ratio
+        self.fsync = fsync
+        self.seed = seed
+
+        self.snapshot_seq = 0
+        self.snapshot_rows = 0
+        self.seq = 0
+        self._shared = _shared_files(base_path)
+        self.rows: typing.Optional[typing.Dict[str, typing.Dict]] = self._load(seed)
+
+    def _load(self, seed) -> typing.Dict[str, typing.Dict]:
+        rows: typing.Dict[str, typing.Dict] = {}
+        self.journal_bytes = 0
+        self.journal_records = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            self.snapshot_seq = snapshot["seq"]
+            self._shared.snapshot_seq = max(self._shared.snapshot_seq, self.snapshot_seq)
+            for row in snapshot["rows"]:
+                rows[row.get("reminder_id")] = row
+        elif seed is not None:
+            # First journaled open: start from the legacy file
+            for row in seed():
+                rows[row.get("reminder_id")] = row
+        self.snapshot_rows = len(rows)
+        self.seq = self.snapshot_seq
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb+") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break # torn tail from a crash mid-append
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self.journal_bytes += len(line)
+                    self.journal_records += 1
+                    if record["seq"] > self.snapshot_seq:
+                        apply_record(rows, record)
+                        self.seq = record["seq"]
+                if f.seek(0, os.SEEK_END) > self.journal_bytes:
+                    # Cut the torn tail off, so the next append starts on a fresh line
+                    f.truncate(self.journal_bytes)
+                    f.flush()
+                    os.fsync(f.fileno())
+        return rows
+
+    def get_all(self) -> typing.List[typing.Dict]:
+        """
+        Returns every row. The rows loaded on open are handed over rather than kept, so the
+        guild store holding them is the only copy in memory; later calls replay the files again
+        """
+        rows, self.rows = self.rows, None
+        if rows is None:
+            rows = self._load(self.seed)
+        return list(rows.values())
+
+    def append(self, records: typing.List[typing.Dict]) -> int:
+        """
+        Appends mutation records to the journal. Returns the number of bytes written
+        """
+        if not records:
+            return 0
+        lines = []
+        for record in records:
+            self.seq += 1
+            lines.append(json.dumps({"seq": self.seq, **record}, separators=(",", ":")))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with self._shared.journal_lock:
+            with open(self.journal_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.journal_bytes += len(data)
+            self.journal_records += len(records)
+        return len(data)
+
+    def _save(self, rows: typing.List[typing.Dict]):
+        # Full replacement, kept for callers written against PyStoreJSONDB
+        self.append([{"op": "replace", "rows": rows}])
+
+    def needs_compaction(self) -> bool:
+        if self.journal_records < 64:
+            return False
+        return self.journal_bytes > self.max_journal_bytes or self.journal_records > self.max_journal_ratio * max(self.snapshot_rows, 1)
+
+    def write_snapshot(self, rows: typing.List[typing.Dict], seq: int) -> int:
+        """
+        Atomically writes a snapshot containing every record up to seq. Safe to run in a thread
+        """
+        data = json.dumps({"seq": seq, "rows": rows}, separators=(",", ":")).encode("utf-8")
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        return len(data)
+
+    @staticmethod
+    def _newer_lines(f: typing.BinaryIO, seq: int) -> typing.Tuple[typing.List[bytes], int]:
+        """
+        Complete lines after seq from the file position on, and the offset just past the last one
+        """
+        kept = []
+        offset = f.tell()
+        for line in f:
+            if not line.endswith(b"\n"):
+                break # still being appended
+            offset += len(line)
+            if json.loads(line)["seq"] > seq:
+                kept.append(line)
+        return kept, offset
+
+    def trim_journal(self, seq: int):
+        """
+        Drops journal records already folded into the snapshot at seq. Safe to run in a thread
+        while records are appended: the bulk is copied unlocked, then whatever was appended
+        meanwhile is copied and the journal swapped under the journal lock
+        """
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "wb") as tmp:
+            kept, offset = [], 0
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, "rb") as f:
+                    kept, offset = self._newer_lines(f, seq)
+            tmp.writelines(kept)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+
+            with self._shared.journal_lock:
+                if os.path.exists(self.journal_path):
+                    with open(self.journal_path, "rb") as f:
+                        f.seek(offset)
+                        tail, _ = self._newer_lines(f, seq)
+                    tmp.writelines(tail)
+                    kept += tail
+                    tmp.flush()
+                    os.fsync(tmp.fileno())
+                os.replace(tmp_path, self.journal_path)
+                self.journal_bytes = sum(len(line) for line in kept)
+                self.journal_records = len(kept)
+
+    def _compact_files(self, rows: typing.List[typing.Dict], seq: int) -> bool:
+        with self._shared.compact_lock:
+            if seq <= self._shared.snapshot_seq:
+                # Another handle on these files already wrote a newer snapshot
+                return False
+            self.write_snapshot(rows, seq)
+            self._shared.snapshot_seq = seq
+            self.trim_journal(seq)
+            return True
+
+    async def compact(self, rows: typing.List[typing.Dict]):
+        """
+        Folds the journal into a new snapshot of rows, which must reflect every appended record.
+        The snapshot and journal rewrites run in a worker thread; records appended meanwhile are
+        kept in the journal.
+        """
+        seq = self.seq
+        rows = [dict(row) for row in rows]
+        if await asyncio.to_thread(self._compact_files, rows, seq):
+            self.snapshot_seq = seq
+            self.snapshot_rows = len(rows)
@@ -0,0 +1,221 @@
+"""
+Lease module for the Reminder Bot
+===
+This module lets several bot processes share one storage without firing a reminder twice.
+Each partition (a shard of the guilds) has a lease row in a small SQLite database: the
+process holding an unexpired lease is the only one that fires that partition's reminders,
+and it renews the lease every ttl / 3 seconds. When the holder stops renewing (crash, hang,
+shutdown) the lease expires and a standby process takes the partition over.
+
+Processes that change a partition they do not own (a command answered by a standby) leave a
+handoff mark for the owning process, which reloads those guilds on its next renewal.
+Expiry uses wall clock time, so all processes must share a reasonably synchronized clock.
+"""
+import os
+import time
+import socket
+import asyncio
+import sqlite3
+import typing
+import uuid
+
+from ReminderLib.Log import get_logger
+
+log = get_logger("lease")
+
+def make_holder_id() -> str:
+    """
+    Returns an identifier unique to this process: host, pid and a random suffix
+    """
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+class LeaseTable:
+    """
+    Lease and handoff rows in a SQLite database shared by every process
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            partition INTEGER PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS handoffs (
+            partition INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL,
+            PRIMARY KEY (partition, guild_id)
+        );
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 2.0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=busy_timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def acquire(self, partition: int, holder: str, ttl: float, now: typing.Optional[float] = None) -> bool:
+        """
+        Takes or renews the lease of a partition for ttl seconds. Returns True if holder owns it
+        """
+        now = time.time() if now is None else now
+        # One statement, so the check and the takeover are atomic across processes
+        cursor = self.conn.execute(
+            """
+            INSERT INTO leases (partition, holder, expires) VALUES (?, ?, ?)
+            ON CONFLICT (partition) DO UPDATE SET holder = excluded.holder, expires = excluded.expires
+            WHERE leases.holder = excluded.holder OR leases.expires <= ?
+            """,
+            (partition, holder, now + ttl, now),
+        )
+        return cursor.rowcount > 0
+
+    def release(self, partition: int, holder: str):
+        """
+        Gives a lease up early so a standby does not have to wait for it to expire
+        """
+        self.conn.execute("DELETE FROM leases WHERE partition = ? AND holder = ?", (partition, holder))
+
+    def holders(self, now: typing.Optional[float] = None) -> typing.Dict[int, str]:
+        """
+        Returns partition -> holder for every unexpired lease
+        """
+        now = time.time() if now is None else now
+        return dict(self.conn.execute("SELECT partition, holder FROM leases WHERE expires > ?", (now,)))
+
+    def mark(self, partition: int, guild_id: int):
+        """
+        Tells the owner of a partition that a guild changed behind its back
+        """
+        self.conn.execute("INSERT OR IGNORE INTO handoffs (partition, guild_id) VALUES (?, ?)", (partition, guild_id))
+
+    def take_marks(self, partition: int) -> typing.List[int]:
+        """
+        Returns and clears the guilds marked for a partition
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            guild_ids = [row[0] for row in self.conn.execute("SELECT guild_id FROM handoffs WHERE partition = ?", (partition,))]
+            self.conn.execute("DELETE FROM handoffs WHERE partition = ?", (partition,))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return guild_ids
+
+    def close(self):
+        self.conn.close()
+
+class LeaseManager:
+    """
+    Keeps the leases of the given partitions for this process, calling on_gained(partition)
+    and on_lost(partition) on ownership changes and on_handoff(partition, guild_ids) with
+    guilds other processes changed in an owned partition.
+
+    A partition counts as owned only until its last successful renewal plus ttl minus one
+    renewal interval, so this process stops firing before any other process may start.
+    """
+    def __init__(
+        self,
+        table: LeaseTable,
+        partitions: typing.Iterable[int],
+        holder: typing.Optional[str] = None,
+        ttl: float = 15.0,
+        on_gained: typing.Optional[typing.Callable[[int], typing.Any]] = None,
+        on_lost: typing.Optional[typing.Callable[[int], typing.Any]] = None,
+        on_handoff: typing.Optional[typing.Callable[[int, typing.List[int]], typing.Any]] = None,
+    ):
+        self.table = table
+        self.partitions = list(partitions)
+        self.holder = holder or make_holder_id()
+        self.ttl = ttl
+        self.interval = ttl / 3
+        self.on_gained = on_gained
+        self.on_lost = on_lost
+        self.on_handoff = on_handoff
+        self._valid_until: typing.Dict[int, float] = {}
+        self._task: typing.Optional[asyncio.Task] = None
+        self.gained = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def owns(self, partition: int, now: typing.Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return self._valid_until.get(partition, 0.0) > now
+
+    @property
+    def owned(self) -> typing.List[int]:
+        return [partition for partition in self.partitions if self.owns(partition)]
+
+    async def renew(self):
+        """
+        Tries to take or renew every partition once, firing the callbacks for what changed
+        """
+        for partition in self.partitions:
+            now = time.time()
+            owned_before = partition in self._valid_until
+            try:
+                acquired = self.table.acquire(partition, self.holder, self.ttl, now)
+            except sqlite3.Error as e:
+                # Keep a lease we still hold locally; it lapses on its own if renewals keep failing
+                log.warning("Lease renewal for partition %s failed: %s", partition, e)
+                acquired = None
+
+            if acquired:
+                self._valid_until[partition] = now + self.ttl - self.interval
+                if not owned_before:
+                    self.gained += 1
+                    log.info("%s took partition %s", self.holder, partition)
+                    # Taking over reloads the whole partition, so earlier marks are moot
+                    self.table.take_marks(partition)
+                    await self._call(self.on_gained, partition)
+                elif self.on_handoff is not None:
+                    guild_ids = self.table.take_marks(partition)
+                    if guild_ids:
+                        await self._call(self.on_handoff, partition, guild_ids)
+            elif owned_before and (acquired is False or not self.owns(partition, now)):
+                del self._valid_until[partition]
+                log.info("%s lost partition %s", self.holder, partition)
+                await self._call(self.on_lost, partition)
+
+    @staticmethod
+    async def _call(callback, *args):
+        if callback is None:
+            return
+        result = callback(*args)
+        if asyncio.iscoroutine(result):
+            await result
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.renew()
+            except Exception as e:
+                log.exception("Lease loop failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def stop(self):
+        """
+        Stops renewing and releases every owned lease
+        """
+        if self._task is not None:
+            self._task.cancel()
+        for partition in list(self._valid_until):
+            try:
+                self.table.release(partition, self.holder)
+            except sqlite3.Error as e:
+                log.warning("Could not release partition %s: %s", partition, e)
+        self._valid_until.clear()
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "holder": self.holder,
+            "owned": self.owned,
+            "standby": [partition for partition in self.partitions if not self.owns(partition)],
+            "gained": self.gained,
+        }
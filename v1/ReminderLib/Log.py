@@ -0,0 +1,131 @@
+"""
+Logging module for the Reminder Bot
+===
+This module sets up the bot's logging so that logging a line never blocks the event loop.
+Records are put on an in-memory queue by a QueueHandler and written by a background thread
+(QueueListener) to a size-rotated JSON-lines file and, optionally, the console in the bot's
+usual "[TAG] message" form.
+
+Loggers are named remi.<tag> (remi.init, remi.remi, remi.save, ...), and the tag is the last
+part of the name. Per-reminder lines are logged at DEBUG, so LOG_LEVEL=INFO turns them off;
+lines logged with extra=SAMPLED are additionally thinned to one in every sample_every.
+"""
+import os
+import sys
+import json
+import queue
+import typing
+import logging
+import logging.handlers
+
+from datetime import datetime, timezone
+
+# Pass as extra= on hot lines that may be sampled
+SAMPLED = {"sampled": True}
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sampled"}
+
+def get_logger(tag: str) -> logging.Logger:
+    return logging.getLogger(f"remi.{tag.lower()}")
+
+def _tag(record: logging.LogRecord) -> str:
+    return record.name.rsplit(".", 1)[-1].upper()
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, tag, msg, any extra fields and the traceback if any
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "tag": _tag(record),
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class ConsoleFormatter(logging.Formatter):
+    """
+    "[TAG] message", or "[WARN] ..." / "[ERROR] ..." for warnings and errors
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        if record.levelno >= logging.ERROR:
+            tag = "ERROR"
+        elif record.levelno >= logging.WARNING:
+            tag = "WARN"
+        else:
+            tag = _tag(record)
+        line = f"[{tag}] {record.getMessage()}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+class SampleFilter(logging.Filter):
+    """
+    Keeps one in every sample_every records marked sampled, counted per call site
+    """
+    def __init__(self, sample_every: int = 1):
+        super().__init__()
+        self.sample_every = max(1, sample_every)
+        self._counts: typing.Dict[typing.Tuple[str, int], int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_every == 1 or not getattr(record, "sampled", False):
+            return True
+        key = (record.pathname, record.lineno)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.sample_every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the message arguments here; formatting happens on the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def setup_logging(
+    level: str = "INFO",
+    path: typing.Optional[str] = "logs/remi.log",
+    max_bytes: int = 10 * 1024 * 1024,
+    backups: int = 5,
+    sample_every: int = 1,
+    console: bool = True,
+) -> logging.handlers.QueueListener:
+    """
+    Routes the remi.* loggers through a queue to the file and console writers.
+    Returns the started listener; stop() it on shutdown to flush what is still queued
+    """
+    handlers: typing.List[logging.Handler] = []
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(JSONLinesFormatter())
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ConsoleFormatter())
+        handlers.append(console_handler)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    queue_handler.addFilter(SampleFilter(sample_every))
+
+    logger = logging.getLogger("remi")
+    logger.setLevel(level.upper())
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,134 @@
+"""
+Mention cache module for the Reminder Bot
+===
+This module resolves user mentions to guild members without a REST call per mention.
+Lookups go to a TTL/LRU cache of earlier results first, then the gateway member cache
+(guild.get_member). Whatever is still unknown is resolved with one gateway member query per
+100 IDs, falling back to concurrent fetch_member calls only if that query fails.
+"""
+import time
+import asyncio
+import typing
+import discord as dc
+
+from collections import OrderedDict
+
+from ReminderLib.Log import get_logger
+
+log = get_logger("remi")
+
+# Discord caps a member query at 100 user IDs
+QUERY_LIMIT = 100
+
+class MentionCache:
+    """
+    Remembers whether (guild_id, user_id) is a member for ttl seconds, or negative_ttl seconds
+    if it is not, keeping at most max_entries results.
+    """
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        negative_ttl: float = 60.0,
+        max_entries: int = 50000,
+        query_timeout: float = 1.5,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.query_timeout = query_timeout
+        self._entries: "OrderedDict[typing.Tuple[int, int], typing.Tuple[float, bool]]" = OrderedDict()
+        self.hits = 0         # answered from this cache
+        self.member_hits = 0  # answered from the gateway member cache
+        self.misses = 0       # needed a member query
+        self.queries = 0
+        self.fetches = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: typing.Tuple[int, int], now: float) -> typing.Optional[bool]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, is_member = entry
+        if expires <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return is_member
+
+    def _store(self, key: typing.Tuple[int, int], is_member: bool, now: float):
+        self._entries[key] = (now + (self.ttl if is_member else self.negative_ttl), is_member)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, guild_id: int, user_id: typing.Optional[int] = None):
+        """
+        Forgets one user, or every user of the guild
+        """
+        if user_id is not None:
+            self._entries.pop((guild_id, user_id), None)
+            return
+        for key in [key for key in self._entries if key[0] == guild_id]:
+            del self._entries[key]
+
+    async def resolve(self, guild: dc.Guild, user_ids: typing.Iterable[int]) -> typing.Set[int]:
+        """
+        Returns the subset of user_ids that are members of the guild
+        """
+        now = time.monotonic()
+        members: typing.Set[int] = set()
+        unknown: typing.List[int] = []
+        for user_id in dict.fromkeys(user_ids):
+            key = (guild.id, user_id)
+            is_member = self._lookup(key, now)
+            if is_member is not None:
+                self.hits += 1
+            elif guild.get_member(user_id) is not None:
+                self.member_hits += 1
+                is_member = True
+                self._store(key, True, now)
+            else:
+                self.misses += 1
+                unknown.append(user_id)
+                continue
+            if is_member:
+                members.add(user_id)
+
+        for start in range(0, len(unknown), QUERY_LIMIT):
+            chunk = unknown[start:start + QUERY_LIMIT]
+            found, not_found = await self._query(guild, chunk)
+            for user_id in found:
+                self._store((guild.id, user_id), True, now)
+            for user_id in not_found:
+                self._store((guild.id, user_id), False, now)
+            members |= found
+        return members
+
+    async def _query(self, guild: dc.Guild, user_ids: typing.List[int]) -> typing.Tuple[typing.Set[int], typing.Set[int]]:
+        """
+        Returns (members, confirmed non-members). IDs whose lookup failed are in neither
+        """
+        self.queries += 1
+        try:
+            result = await asyncio.wait_for(
+                guild.query_members(user_ids=user_ids, limit=len(user_ids), cache=False),
+                self.query_timeout,
+            )
+            found = {member.id for member in result}
+            return found, set(user_ids) - found
+        except (asyncio.TimeoutError, RuntimeError, dc.ClientException) as e:
+            log.warning("Member query for %s users in %s failed (%r); fetching instead", len(user_ids), guild.id, e)
+
+        self.fetches += len(user_ids)
+        results = await asyncio.gather(*(guild.fetch_member(user_id) for user_id in user_ids), return_exceptions=True)
+        found = {user_id for user_id, result in zip(user_ids, results) if isinstance(result, dc.Member)}
+        not_found = {user_id for user_id, result in zip(user_ids, results) if isinstance(result, dc.NotFound)}
+        return found, not_found
+
+    def stats(self) -> str:
+        return (
+            f"entries={len(self._entries)} hits={self.hits} member_hits={self.member_hits} "
+            f"misses={self.misses} queries={self.queries} fetches={self.fetches}"
+        )
@@ -0,0 +1,182 @@
+"""
+Metrics module for the Reminder Bot
+===
+This module is a small in-process metrics registry (counters, gauges and histograms with
+labels) rendered in the Prometheus text exposition format, so the health server can serve
+/metrics to a scraper without an extra dependency.
+
+Metrics are plain objects updated in place; rendering walks the registry on each scrape.
+Gauges may instead be given a function, evaluated at scrape time, for values that already
+live elsewhere (queue depths, cache sizes).
+"""
+import time
+import bisect
+import typing
+import contextlib
+
+LabelValues = typing.Tuple[str, ...]
+
+# Seconds; fits command latency, Discord sends and scheduler ticks alike
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Metric:
+    """
+    Base of every metric: a name, help text and label names; values are kept per label set
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: typing.Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: typing.Dict[str, typing.Any]) -> LabelValues:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _labels(self, key: LabelValues, extra: typing.Optional[typing.Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> typing.Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: typing.Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: typing.Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> typing.Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: typing.Sequence[str] = (), function: typing.Optional[typing.Callable[[], typing.Any]] = None):
+        """
+        function, if given, is called at scrape time: returning a number for an unlabelled
+        gauge, or a {label values tuple: number} dict for a labelled one
+        """
+        super().__init__(name, help, labels)
+        self._values: typing.Dict[LabelValues, float] = {}
+        self.function = function
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> typing.Iterator[str]:
+        values = self._values
+        if self.function is not None:
+            result = self.function()
+            values = result if isinstance(result, dict) else {(): result}
+        for key, value in values.items():
+            if value is not None:
+                key = key if isinstance(key, tuple) else (key,)
+                yield f"{self.name}{self._labels(tuple(map(str, key)))} {_format_value(value)}"
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: typing.Sequence[str] = (), buckets: typing.Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (non-cumulative, +Inf last), sum, count]
+        self._values: typing.Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """
+        Observes the duration of the with block
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> typing.Iterator[str]:
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                yield f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(key)} {count}"
+
+class Registry:
+    """
+    Named metrics, rendered together for a scrape
+    """
+    def __init__(self):
+        self._metrics: typing.Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: typing.Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: typing.Sequence[str] = (), function=None) -> Gauge:
+        return self.register(Gauge(name, help, labels, function))
+
+    def histogram(self, name: str, help: str, labels: typing.Sequence[str] = (), buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format (version 0.0.4)
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
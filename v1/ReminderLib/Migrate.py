@@ -0,0 +1,123 @@
+"""
+Migration module for the Reminder Bot
+===
+This module upgrades stored reminders from the legacy schema to the current one:
+- time: "%Y-%m-%d-%H:%M" (or with ":%S") bot-local string -> integer Unix epoch seconds (UTC)
+- repeat: minutes -> seconds
+
+A row is legacy exactly when its time is a string, and both fields are converted together,
+so migrating is idempotent. The bot migrates rows online as guild stores are loaded; this
+module can also be run offline to upgrade files in place:
+
+    python -m ReminderLib.Migrate [data_dir] [--include-legacy]    (from the v1 directory)
+
+This rewrites data/reminders/guild_<id>.json. The 1.0.x and 1.1.x bots read the legacy schema
+from data/<guild>/reminders.json, so those files are only migrated with --include-legacy, once
+the guilds are served by 1.2.x.
+"""
+import os
+import glob
+import argparse
+import json
+import typing
+
+from datetime import datetime
+
+from ReminderLib.Log import setup_logging, get_logger
+
+log = get_logger("migr")
+
+LEGACY_TIME_FORMATS = ("%Y-%m-%d-%H:%M", "%Y-%m-%d-%H:%M:%S")
+
+def is_legacy(reminder: typing.Dict) -> bool:
+    return isinstance(reminder.get("time"), str)
+
+def migrate_reminder(reminder: typing.Dict) -> bool:
+    """
+    Upgrades a reminder in place. Returns True if it was changed
+    """
+    if not is_legacy(reminder):
+        return False
+
+    for fmt in LEGACY_TIME_FORMATS:
+        try:
+            # Legacy times are in bot-local time, the same clock the old loop compared against
+            reminder["time"] = int(datetime.strptime(reminder["time"], fmt).timestamp())
+            break
+        except ValueError:
+            continue
+    else:
+        return False # Malformed; left as is and never scheduled
+
+    if reminder.get("repeat") is not None:
+        reminder["repeat"] = int(reminder["repeat"]) * 60
+    return True
+
+def migrate_rows(reminders: typing.Iterable[typing.Dict]) -> int:
+    """
+    Upgrades rows in place. Returns the number of rows changed
+    """
+    return sum(1 for reminder in reminders if migrate_reminder(reminder))
+
+def migrate_json_file(path: str) -> int:
+    """
+    Upgrades a plain JSON list file (data/<guild>/reminders.json) in place
+    """
+    with open(path, "r") as f:
+        reminders = json.load(f)
+
+    changed = migrate_rows(reminders)
+    if changed:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(reminders, f, indent=4)
+        os.replace(tmp_path, path)
+    return changed
+
+def migrate_guild_db(path: str) -> int:
+    """
+    Upgrades a PyStoreJSONDB guild file (data/reminders/guild_<id>.json) in place
+    """
+    from PyStoreJSONLib import PyStoreJSONDB
+
+    db = PyStoreJSONDB(path)
+    reminders = db.get_all()
+    changed = migrate_rows(reminders)
+    if changed:
+        db._save(reminders)
+    return changed
+
+def main(data_dir: str = "data", include_legacy: bool = False) -> int:
+    total = 0
+    for path in sorted(glob.glob(os.path.join(data_dir, "reminders", "guild_*.json"))):
+        if path.endswith(".snapshot.json"):
+            continue # journaled snapshots are migrated online when loaded
+        changed = migrate_guild_db(path)
+        total += changed
+        log.info("%s: %s reminders upgraded", path, changed)
+
+    legacy_paths = sorted(glob.glob(os.path.join(data_dir, "*", "reminders.json")))
+    if legacy_paths and not include_legacy:
+        log.info("Skipped %s 1.0.x/1.1.x reminders.json files (pass --include-legacy to upgrade them)", len(legacy_paths))
+        legacy_paths = []
+    for path in legacy_paths:
+        changed = migrate_json_file(path)
+        total += changed
+        log.info("%s: %s reminders upgraded", path, changed)
+
+    log.info("Upgraded %s reminders", total)
+    return total
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Upgrade stored reminders to the current schema")
+    arg_parser.add_argument("data_dir", nargs="?", default="data")
+    arg_parser.add_argument(
+        "--include-legacy", action="store_true",
+        help="Also upgrade data/<guild>/reminders.json, which the 1.0.x and 1.1.x bots can no longer read afterwards",
+    )
+    args = arg_parser.parse_args()
+    listener = setup_logging(path=None)
+    try:
+        main(args.data_dir, args.include_legacy)
+    finally:
+        listener.stop()
@@ -1,10 +1,12 @@
 """
 Paginator for Discord embeds using discord.py
 ===
-This module provides a simple paginator for navigating through multiple Discord embeds.
+This module provides a simple paginator for navigating through multiple Discord embeds,
+and a cursor paginator that builds each page only when it is viewed.
 
 """
 
+import typing
 import discord as dc
 from discord.ui import View, button
 
@@ -34,3 +36,54 @@ class Paginator(View):
             item.disabled = True
 
         await self.message.edit(view=self)
+
+class CursorPaginator(View):
+    """
+    Pages fetched on demand instead of prebuilt embeds. fetch(cursor, page) returns the embed
+    for the page starting at cursor and the cursor of the page after it (None on the last page).
+    Only the start cursor of each visited page is kept, so pages are re-read when revisited.
+    """
+    def __init__(self, fetch: typing.Callable[[typing.Any, int], typing.Awaitable[typing.Tuple[dc.Embed, typing.Any]]], *, timeout: int = 60):
+        super().__init__(timeout=timeout)
+        self.fetch = fetch
+        self.cursors: list = [None]
+        self.current = 0
+        self.next_cursor = None
+        self.message = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    async def load(self) -> dc.Embed:
+        """
+        Fetches the current page and updates the buttons
+        """
+        embed, self.next_cursor = await self.fetch(self.cursors[self.current], self.current)
+        self.prev_button.disabled = self.current == 0
+        self.next_button.disabled = self.next_cursor is None
+        return embed
+
+    async def update_buttons(self, interaction: dc.Interaction):
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+
+    @button(label="Previous", style=dc.ButtonStyle.primary)
+    async def prev_button(self, interaction: dc.Interaction, button: dc.ui.Button):
+        self.current = max(0, self.current - 1)
+        await self.update_buttons(interaction)
+
+    @button(label="Next", style=dc.ButtonStyle.primary)
+    async def next_button(self, interaction: dc.Interaction, button: dc.ui.Button):
+        if self.next_cursor is not None:
+            # Reminders may have changed since this page was first seen; follow the fresh cursor
+            del self.cursors[self.current + 1:]
+            self.cursors.append(self.next_cursor)
+            self.current += 1
+        await self.update_buttons(interaction)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+
+        if self.message is not None:
+            await self.message.edit(view=self)
@@ -4,11 +4,26 @@ Parser module for the Reminder Bot
 This module provides a parser for handling command arguments and options in the Reminder Bot
 as well as conversions for various time segments
 """
-import re, json
+import os, re, json
 import discord as dc
 import typing
 
 from datetime import datetime
+from functools import lru_cache
+
+from ReminderLib.MentionCache import MentionCache
+
+TIMEZONES_PATH = "data/timezones_info.json"
+
+# Parsed timezone table, reloaded only when the file's mtime changes
+_timezones = {
+    "mtime": None,
+    "raw": {},      # abbreviation -> "+HH:MM" as written in the file
+    "offsets": {},  # abbreviation -> offset in minutes
+}
+
+# Resolved user mentions, so a remind command does not cost a REST call per mention
+mention_cache = MentionCache()
 
 async def time2seconds(ctx, duration_str : str) -> int:
     """
@@ -62,35 +77,82 @@ async def seconds2time(seconds: int) -> str:
 
     return " ".join(time_parts) if time_parts else "0s"
 
+# Up to three leading date parts, then H:M and optional :S. Optional date groups fill left to right,
+# so the number of matched groups says which layout was used
+_FLEXIBLE_TIME = re.compile(r"^(?:(\d+)-)?(?:(\d+)-)?(?:(\d+)-)?(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$")
+
+@lru_cache(maxsize=1024)
+def _parse_time_parts(time_str: str) -> typing.Optional[typing.Tuple[typing.Optional[int], typing.Optional[int], typing.Optional[int], int, int, int]]:
+    """
+    Splits a flexible time string into (year, month, day, hour, minute, second), with None for
+    date parts the layout leaves out. Returns None if the string matches no supported layout.
+    """
+    match = _FLEXIBLE_TIME.match(time_str)
+    if match is None:
+        return None
+    first, second, third, hour, minute, sec = match.groups()
+    date_parts = [part for part in (first, second, third) if part is not None]
+
+    year = month = day = None
+    if len(date_parts) == 3:
+        year_str, month_str, day_str = date_parts
+        if len(year_str) == 2:
+            # Same pivot as strptime's %y
+            year = int(year_str) + (2000 if int(year_str) < 69 else 1900)
+        elif len(year_str) == 4:
+            year = int(year_str)
+        else:
+            return None
+    elif len(date_parts) == 2:
+        month_str, day_str = date_parts
+    elif len(date_parts) == 1:
+        month_str, day_str = None, date_parts[0]
+    else:
+        month_str = day_str = None
+
+    if month_str is not None:
+        if len(month_str) > 2:
+            return None
+        month = int(month_str)
+    if day_str is not None:
+        if len(day_str) > 2:
+            return None
+        day = int(day_str)
+
+    hour, minute = int(hour), int(minute)
+    sec = int(sec) if sec is not None else 0
+    if hour > 23 or minute > 59 or sec > 59:
+        return None
+    return year, month, day, hour, minute, sec
+
 def parse_flexible_time(time_str: str) -> datetime:
     """
     Parses a flexible time string in various formats and returns a datetime object.
 
-    Supports formats:
+    Supports formats, each optionally followed by :%S for second precision:
     - %y-%m-%d-%H:%M
     - %Y-%m-%d-%H:%M
     - %m-%d-%H:%M
     - %d-%H:%M
     - %H:%M
-    """
-    now = datetime.now()
 
-    formats = [
-        ("%y-%m-%d-%H:%M", time_str),                                               # %y-%m-%d-%H:%M
-        ("%Y-%m-%d-%H:%M", time_str),                                               # %Y-%m-%d-%H:%M
-        ("%Y-%m-%d-%H:%M", f"{now.year}-{time_str}"),                               # %m-%d-%H:%M
-        ("%Y-%m-%d-%H:%M", f"{now.year}-{now.month:02d}-{time_str}"),               # %d-%H:%M
-        ("%Y-%m-%d-%H:%M", f"{now.year}-{now.month:02d}-{now.day:02d}-{time_str}")  # %H:%M
-    ]
-
-    for fmt, time_candidate in formats:
+    Missing date parts default to the current date.
+    """
+    parts = _parse_time_parts(time_str)
+    if parts is not None:
+        year, month, day, hour, minute, second = parts
+        now = datetime.now()
         try:
-            return datetime.strptime(time_candidate, fmt)
-        
+            return datetime(
+                year if year is not None else now.year,
+                month if month is not None else now.month,
+                day if day is not None else now.day,
+                hour, minute, second,
+            )
         except ValueError:
-            continue
+            pass # e.g. a day that does not exist in that month
 
-    raise ValueError(f"## Time format not recognized: '{time_str}'\n### Supported formats:\n- %y-%m-%d-%H:%M\n- %Y-%m-%d-%H:%M\n- %m-%d-%H:%M\n- %d-%H:%M\n- %H:%M")
+    raise ValueError(f"## Time format not recognized: '{time_str}'\n### Supported formats (optionally with :SS):\n- %y-%m-%d-%H:%M\n- %Y-%m-%d-%H:%M\n- %m-%d-%H:%M\n- %d-%H:%M\n- %H:%M")
 
 def parse_UTC(utc_str: str) -> int:
     """
@@ -109,19 +171,46 @@ def parse_UTC(utc_str: str) -> int:
 
     return offset
 
+def load_timezones(path: str = TIMEZONES_PATH) -> typing.Dict[str, str]:
+    """
+    Returns the timezone table, parsing the file only when it changed since the last call.
+    Raises FileNotFoundError if the file is missing.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    if mtime != _timezones["mtime"]:
+        with open(path, "r") as f:
+            raw = json.load(f)
+        _timezones["raw"] = raw
+        _timezones["offsets"] = {timezone: parse_UTC(utc) for timezone, utc in raw.items()}
+        _timezones["mtime"] = mtime
+    return _timezones["raw"]
+
+def timezones_version() -> typing.Optional[int]:
+    """
+    Returns the mtime of the currently loaded timezone table, to key caches built from it
+    """
+    load_timezones()
+    return _timezones["mtime"]
+
 def get_timezone_offset_str(timezone: str) -> str:
     """
     Returns the UTC offset for a given timezone.
     """
     timezone = timezone.upper()
-    with open("data/timezones_info.json", "r") as f:
-        timezones_info = json.load(f)
+    timezones_info = load_timezones()
     if timezone in timezones_info:
         utc = timezones_info[timezone]
     else:
         raise ValueError(f"Unknown timezone: {timezone}.\nPlease provide a valid UTC offset (e.g. ±X:XX) or timezone (e.g. GMT, MDT, EST, etc.)")
     return utc
 
+def get_timezone_offset_minutes(timezone: str) -> int:
+    """
+    Returns the UTC offset for a given timezone in minutes.
+    """
+    get_timezone_offset_str(timezone)
+    return _timezones["offsets"][timezone.upper()]
+
 async def time2unix(datetime_str: str) -> int:
     """
     Converts a datetime string to a Unix timestamp
@@ -132,15 +221,15 @@ async def time2unix(datetime_str: str) -> int:
 
 async def get_mentions(mentions : str, guild : dc.Guild) -> typing.List[dc.User | dc.Role]:
     """
-    Parses mentions from a string
+    Parses mentions from a string. User mentions are kept only if the user is a member of the guild
     """
     mention_ids = re.findall(r'<@!?(\d+)>|<@&(\d+)>', mentions)
+    members = await mention_cache.resolve(guild, [int(user_id) for user_id, _ in mention_ids if user_id])
     mention_strs = []
     for user_id, role_id in mention_ids:
         if user_id:
-            member = await guild.fetch_member(int(user_id))
-            if member:
-                mention_strs.append(member.mention)
+            if int(user_id) in members:
+                mention_strs.append(f"<@{int(user_id)}>")
         elif role_id:
             role = guild.get_role(int(role_id))
             if role:
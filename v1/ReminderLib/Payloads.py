@@ -0,0 +1,95 @@
+"""
+Payload module for the Reminder Bot
+===
+This module renders a reminder into the content and embed it is sent with, and keeps the
+rendered payloads in a bounded LRU cache so a repeating reminder is not rebuilt on every fire.
+Payloads are compiled when a reminder is created or edited and dropped when it is deleted.
+A cached payload is only reused while the fields it was rendered from are unchanged.
+"""
+import typing
+import discord as dc
+
+from collections import OrderedDict
+
+EMBED_COLOR = 0x00ff00
+
+Payload = typing.Tuple[typing.Optional[str], dc.Embed]
+
+def render_payload(reminder: typing.Dict) -> Payload:
+    """
+    Returns (content, embed) for a reminder: the mentions, and one field per subtitle
+    """
+    mentions = reminder.get("mentions")
+    content = " ".join(mentions) if mentions else None
+
+    embed = dc.Embed(title=reminder.get("title", ""), color=EMBED_COLOR)
+    subtitles = str(reminder.get("subtitles", "")).split("\\n")
+    messages = str(reminder.get("message", "")).split("\\n")
+
+    # Pair up subtitles and messages safely
+    for i, subtitle in enumerate(subtitles):
+        embed.add_field(name=subtitle, value=messages[i] if i < len(messages) else "", inline=False)
+    return content, embed
+
+def _signature(reminder: typing.Dict) -> tuple:
+    """
+    The fields a payload is rendered from
+    """
+    mentions = reminder.get("mentions")
+    return (
+        reminder.get("title", ""),
+        reminder.get("subtitles", ""),
+        reminder.get("message", ""),
+        tuple(mentions) if mentions else (),
+    )
+
+class PayloadCache:
+    """
+    (guild_id, reminder_id) -> rendered payload, least recently used first out past max_entries
+    """
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[typing.Tuple[int, str], typing.Tuple[tuple, Payload]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def compile(self, guild_id: int, reminder: typing.Dict) -> Payload:
+        """
+        Renders the reminder and caches the result, replacing any earlier payload
+        """
+        payload = render_payload(reminder)
+        key = (guild_id, reminder["reminder_id"])
+        self._entries[key] = (_signature(reminder), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return payload
+
+    def get(self, guild_id: int, reminder: typing.Dict) -> Payload:
+        """
+        Returns the cached payload, compiling it if it is missing or stale
+        """
+        key = (guild_id, reminder["reminder_id"])
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == _signature(reminder):
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        return self.compile(guild_id, reminder)
+
+    def invalidate(self, guild_id: int, reminder_id: typing.Optional[str] = None):
+        """
+        Drops one reminder's payload, or every payload of the guild
+        """
+        if reminder_id is not None:
+            self._entries.pop((guild_id, reminder_id), None)
+            return
+        for key in [key for key in self._entries if key[0] == guild_id]:
+            del self._entries[key]
+
+    def stats(self) -> str:
+        return f"entries={len(self._entries)} hits={self.hits} misses={self.misses}"
@@ -0,0 +1,152 @@
+"""
+Profiler module for the Reminder Bot
+===
+This module profiles the scheduler on demand, for the owner-only profile command.
+A session runs cProfile and tracemalloc either across the next N scheduler ticks or for a
+fixed time window, then renders a plain-text report: the top functions by cumulative time
+and the top allocation sites (memory allocated during the session, by source line).
+
+Nothing is hooked while no session is active; the scheduler only checks the active flag.
+cProfile sees everything the event loop runs while it is enabled, so other coroutines that
+interleave with a tick's awaits show up in the report too.
+"""
+import io
+import time
+import pstats
+import asyncio
+import cProfile
+import tracemalloc
+import typing
+
+from datetime import datetime
+
+class TickProfiler:
+    """
+    One profiling session at a time, armed by start() and fed by the scheduler through
+    tick_started()/tick_finished() while active is set
+    """
+    def __init__(self):
+        self.active = False
+        self._profile: typing.Optional[cProfile.Profile] = None
+        self._baseline: typing.Optional[tracemalloc.Snapshot] = None
+        self._owns_tracemalloc = False
+        self._ticks_left: typing.Optional[int] = None
+        self._running_ticks = 0
+        self._window: typing.Optional[asyncio.TimerHandle] = None
+        self._done: typing.Optional[asyncio.Future] = None
+        self._top = 25
+        self._started = 0.0
+        self.ticks = 0
+
+    def start(
+        self,
+        ticks: typing.Optional[int] = None,
+        seconds: typing.Optional[float] = None,
+        top: int = 25,
+        max_seconds: float = 900.0,
+    ) -> asyncio.Future:
+        """
+        Profiles the next ticks scheduler ticks (ending early after max_seconds), or everything
+        for seconds. Returns a future resolving to the report
+        """
+        if self.active:
+            raise RuntimeError("a profiling session is already running")
+        loop = asyncio.get_running_loop()
+        self.active = True
+        self._done = loop.create_future()
+        self._top = top
+        self._started = time.perf_counter()
+        self.ticks = 0
+        self._profile = cProfile.Profile()
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        self._baseline = tracemalloc.take_snapshot()
+
+        if ticks is None:
+            # Time window: profile the whole loop, not just ticks
+            self._ticks_left = None
+            self._profile.enable()
+            self._window = loop.call_later(min(seconds or 10.0, max_seconds), self.stop)
+        else:
+            self._ticks_left = max(1, ticks)
+            self._window = loop.call_later(max_seconds, self.stop)
+        return self._done
+
+    def tick_started(self):
+        if not self.active or self._ticks_left is None:
+            return
+        # Shards tick concurrently in poll mode; profile from the first start to the last finish
+        if self._running_ticks == 0:
+            self._profile.enable()
+        self._running_ticks += 1
+
+    def tick_finished(self):
+        if not self.active:
+            return # The session ended mid-tick
+        self.ticks += 1
+        if self._ticks_left is None:
+            return
+        self._running_ticks -= 1
+        if self._running_ticks == 0:
+            self._profile.disable()
+        self._ticks_left -= 1
+        if self._ticks_left <= 0 and self._running_ticks == 0:
+            self.stop()
+
+    def stop(self):
+        """
+        Ends the session now and resolves its future with the report
+        """
+        if not self.active:
+            return
+        self.active = False
+        if self._window is not None:
+            self._window.cancel()
+            self._window = None
+        self._profile.disable()
+        self._running_ticks = 0
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        report = self._report(snapshot)
+        self._profile = None
+        self._baseline = None
+        if not self._done.done():
+            self._done.set_result(report)
+
+    def _report(self, snapshot: tracemalloc.Snapshot) -> str:
+        out = io.StringIO()
+        elapsed = time.perf_counter() - self._started
+        out.write(f"Remi profile - {datetime.now().isoformat(timespec='seconds')}\n")
+        out.write(f"Window: {elapsed:.1f}s, scheduler ticks: {self.ticks}\n\n")
+
+        out.write(f"=== Top {self._top} functions by cumulative time ===\n")
+        try:
+            stats = pstats.Stats(self._profile, stream=out)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top)
+        except TypeError:
+            # pstats refuses a profile that recorded nothing
+            out.write("No calls were recorded.\n")
+
+        out.write(f"\n=== Top {self._top} allocation sites during the window ===\n")
+        ignore = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+        current = snapshot.filter_traces(ignore)
+        baseline = self._baseline.filter_traces(ignore)
+        diffs = current.compare_to(baseline, "lineno")
+        grown = [diff for diff in diffs if diff.size_diff > 0]
+        for diff in grown[:self._top]:
+            frame = diff.traceback[0]
+            out.write(
+                f"{frame.filename}:{frame.lineno}: +{diff.size_diff / 1024:.1f} KiB "
+                f"({diff.count_diff:+d} blocks, {diff.size / 1024:.1f} KiB live)\n"
+            )
+        total = sum(diff.size_diff for diff in grown)
+        out.write(f"Total growth: {total / 1024:.1f} KiB\n")
+        return out.getvalue()
@@ -0,0 +1,235 @@
+"""
+Record module for the Reminder Bot
+===
+This module provides ReminderRecord, the compact in-memory form of a stored reminder kept by
+the guild store cache in place of the dict parsed from JSON:
+- fields live in __slots__ instead of a per-row dict repeating every key
+- guild and channel IDs are ints shared between records, and mentions are one shared tuple
+  of ints (roles negated) instead of a list of "<@123>" strings per row
+- title, subtitles and message are packed into one UTF-8 blob, shared between records with
+  the same text and only decoded when read
+
+Records are read-only and read like the dict they came from (record["time"], record.get(...),
+dict(record)), so code written against dict rows keeps working. replace() returns an updated
+copy and to_dict() the plain row to persist. Values that do not fit the packed form (legacy
+string times, other mention formats, unknown keys) are kept as they are.
+"""
+import re
+import sys
+import typing
+
+from collections.abc import Mapping
+
+# Key order of rows created by the bot, kept by to_dict()
+FIELDS = (
+    "issuer_id", "guild_id", "channel_id", "reminder_id", "time",
+    "title", "subtitles", "message", "mentions", "repeat", "catch_up",
+)
+TEXT_FIELDS = ("title", "subtitles", "message")
+# Fields stored as they are in a slot of the same name
+_PLAIN_FIELDS = frozenset(("issuer_id", "guild_id", "channel_id", "reminder_id", "time", "repeat", "catch_up"))
+
+_MISSING = object()
+_MENTION = re.compile(r"<@(&?)(\d+)>")
+# Separates the text fields inside the blob; text containing it is kept unpacked
+_SEPARATOR = "\x00"
+# Rough size of a record without its text, for the store cache's memory ceiling
+_BASE_BYTES = 160
+
+class Interner:
+    """
+    Shared canonical copies of equal values, each dropped once the last record using it is freed
+    """
+    def __init__(self):
+        # value -> [canonical value, records using it]
+        self._entries: typing.Dict[typing.Hashable, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, value: typing.Hashable) -> typing.Hashable:
+        entry = self._entries.get(value)
+        if entry is None:
+            entry = self._entries[value] = [value, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, value: typing.Hashable):
+        entry = self._entries.get(value)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[value]
+
+ids = Interner()
+mentions = Interner()
+texts = Interner()
+
+def pack_mentions(values: typing.Any) -> typing.Optional[typing.Tuple[int, ...]]:
+    """
+    ["<@1>", "<@&2>"] -> (1, -2), or None if any mention has another form
+    """
+    if not isinstance(values, list):
+        return None
+    packed = []
+    for value in values:
+        match = _MENTION.fullmatch(value) if isinstance(value, str) else None
+        if match is None:
+            return None
+        packed.append(-int(match[2]) if match[1] else int(match[2]))
+    return tuple(packed)
+
+def unpack_mentions(packed: typing.Tuple[int, ...]) -> typing.List[str]:
+    return [f"<@&{-value}>" if value < 0 else f"<@{value}>" for value in packed]
+
+class ReminderRecord(Mapping):
+    """
+    Read-only reminder row with packed fields, built from a reminder dict
+    """
+    __slots__ = (
+        "reminder_id", "issuer_id", "guild_id", "channel_id", "time", "repeat", "catch_up",
+        "_mentions", "_text", "_extra",
+    )
+
+    def __init__(self, row: typing.Mapping):
+        extra = {key: value for key, value in row.items() if key not in FIELDS}
+        for name in ("reminder_id", "issuer_id", "time", "repeat"):
+            setattr(self, name, row.get(name, _MISSING))
+
+        catch_up = row.get("catch_up", _MISSING)
+        self.catch_up = sys.intern(catch_up) if type(catch_up) is str else catch_up
+
+        for name in ("guild_id", "channel_id"):
+            value = row.get(name, _MISSING)
+            if value is not _MISSING and type(value) is not int:
+                extra[name] = value
+                value = _MISSING
+            setattr(self, name, value)
+
+        self._mentions = None
+        if "mentions" in row:
+            self._mentions = pack_mentions(row["mentions"])
+            if self._mentions is None:
+                extra["mentions"] = row["mentions"]
+
+        self._text = None
+        text = [row.get(name) for name in TEXT_FIELDS]
+        if all(type(value) is str and _SEPARATOR not in value for value in text):
+            self._text = _SEPARATOR.join(text).encode("utf-8")
+        else:
+            extra.update((name, row[name]) for name in TEXT_FIELDS if name in row)
+
+        self._extra = extra or None
+        self._acquire()
+
+    def _acquire(self):
+        if self.guild_id is not _MISSING:
+            self.guild_id = ids.get(self.guild_id)
+        if self.channel_id is not _MISSING:
+            self.channel_id = ids.get(self.channel_id)
+        if self._mentions is not None:
+            self._mentions = mentions.get(self._mentions)
+        if self._text is not None:
+            self._text = texts.get(self._text)
+
+    def __del__(self):
+        try:
+            if self.guild_id is not _MISSING:
+                ids.release(self.guild_id)
+            if self.channel_id is not _MISSING:
+                ids.release(self.channel_id)
+            if self._mentions is not None:
+                mentions.release(self._mentions)
+            if self._text is not None:
+                texts.release(self._text)
+        except AttributeError:
+            pass # __init__ failed before every slot was set
+
+    def _texts(self) -> typing.List[str]:
+        return self._text.decode("utf-8").split(_SEPARATOR)
+
+    def _has(self, key: str) -> bool:
+        if key in TEXT_FIELDS:
+            return self._text is not None
+        if key == "mentions":
+            return self._mentions is not None
+        return key in _PLAIN_FIELDS and getattr(self, key) is not _MISSING
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in _PLAIN_FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif key in TEXT_FIELDS:
+            if self._text is not None:
+                return self._texts()[TEXT_FIELDS.index(key)]
+        elif key == "mentions":
+            if self._mentions is not None:
+                return unpack_mentions(self._mentions)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: typing.Any) -> bool:
+        return (isinstance(key, str) and self._has(key)) or (self._extra is not None and key in self._extra)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for key in FIELDS:
+            if self._has(key):
+                yield key
+        if self._extra is not None:
+            for key in self._extra:
+                if not self._has(key):
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ReminderRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> typing.Dict:
+        """
+        The plain reminder row, e.g. to serialize
+        """
+        # Runs for every row on each full write of a guild, so this avoids the per-key lookups
+        row = {}
+        for name in ("issuer_id", "guild_id", "channel_id", "reminder_id", "time"):
+            value = getattr(self, name)
+            if value is not _MISSING:
+                row[name] = value
+        if self._text is not None:
+            row.update(zip(TEXT_FIELDS, self._texts()))
+        if self._mentions is not None:
+            row["mentions"] = unpack_mentions(self._mentions)
+        if self.repeat is not _MISSING:
+            row["repeat"] = self.repeat
+        if self.catch_up is not _MISSING:
+            row["catch_up"] = self.catch_up
+        if self._extra is not None:
+            row.update(self._extra)
+        return row
+
+    def replace(self, fields: typing.Mapping) -> "ReminderRecord":
+        """
+        A copy with fields changed
+        """
+        if not fields.keys() <= {"time", "repeat"}:
+            return ReminderRecord({**self.to_dict(), **fields})
+        # Rescheduling on every fire: copy the packed slots instead of repacking the row
+        record = object.__new__(ReminderRecord)
+        for name in ReminderRecord.__slots__:
+            setattr(record, name, getattr(self, name))
+        for name, value in fields.items():
+            setattr(record, name, value)
+        record._acquire()
+        return record
+
+    def footprint(self) -> int:
+        """
+        Rough bytes held by the record, counting shared text as its own
+        """
+        size = _BASE_BYTES + (len(self._text) if self._text is not None else 0)
+        if self._extra is not None:
+            size += sum(64 + len(str(value)) for value in self._extra.values())
+        return size
@@ -0,0 +1,287 @@
+"""
+Scheduler module for the Reminder Bot
+===
+This module provides an in-memory due index for reminders, keyed by next fire time.
+The reminder loop pops only the reminders that are actually due instead of reading
+and parsing every reminder of every guild on each tick. When the bot is sharded, each
+owned shard has its own index and scheduler.
+"""
+import heapq
+import typing
+
+def reminder_fire_ts(reminder: typing.Dict) -> typing.Optional[int]:
+    """
+    Returns the next fire time of a stored reminder (Unix epoch seconds), or None if malformed
+    """
+    fire_ts = reminder.get("time")
+    return fire_ts if type(fire_ts) is int else None
+
+def next_fire_after(fire_ts: int, repeat: int, now_ts: float) -> int:
+    """
+    Advances a repeating fire time by as many repeats as needed to land after now_ts
+    (exactly one for an on-time fire)
+    """
+    return fire_ts + (int(now_ts - fire_ts) // repeat + 1) * repeat
+
+class DueQueue:
+    """
+    Min-heap of (fire_ts, guild_id, reminder_id) with lazy invalidation.
+
+    Rescheduling or removing a reminder does not search the heap; the stale heap entry
+    is simply skipped when it reaches the top. Indexed reminder IDs are also kept per guild,
+    so dropping a guild costs O(its reminders).
+    """
+    def __init__(self, on_earlier: typing.Optional[typing.Callable[[], None]] = None):
+        self._heap: typing.List[typing.Tuple[float, int, str]] = []
+        self._entries: typing.Dict[typing.Tuple[int, str], float] = {}
+        self._by_guild: typing.Dict[int, typing.Set[str]] = {}
+        # Called whenever the earliest pending fire time may have changed, so a sleeping
+        # scheduler can re-arm its timer
+        self.on_earlier = on_earlier
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: typing.Tuple[int, str]) -> bool:
+        return key in self._entries
+
+    def schedule(self, guild_id: int, reminder: typing.Dict):
+        """
+        Insert or move a reminder to its current next fire time
+        """
+        fire_ts = reminder_fire_ts(reminder)
+        if fire_ts is None:
+            self.remove(guild_id, reminder.get("reminder_id"))
+            return
+
+        self.schedule_at(guild_id, reminder["reminder_id"], fire_ts)
+
+    def schedule_at(self, guild_id: int, reminder_id: str, fire_ts: float):
+        """
+        Index a reminder at an explicit fire time, e.g. to retry a failed send
+        """
+        key = (guild_id, reminder_id)
+        if self._entries.get(key) == fire_ts:
+            return
+
+        head = self.next_fire()
+        self._entries[key] = fire_ts
+        self._by_guild.setdefault(guild_id, set()).add(reminder_id)
+        heapq.heappush(self._heap, (fire_ts, guild_id, reminder_id))
+        self._maybe_compact()
+        if head is None or fire_ts < head:
+            self._notify()
+
+    def remove(self, guild_id: int, reminder_id: str):
+        """
+        Drop a reminder from the index
+        """
+        if self._entries.pop((guild_id, reminder_id), None) is not None:
+            self._unindex(guild_id, reminder_id)
+            self._notify()
+
+    def load_guild(self, guild_id: int, reminders: typing.Iterable[typing.Dict]):
+        """
+        Replace every indexed reminder of a guild with the given rows
+        """
+        self.clear_guild(guild_id)
+        for reminder in reminders:
+            self.schedule(guild_id, reminder)
+
+    def clear_guild(self, guild_id: int):
+        """
+        Drop every indexed reminder of a guild
+        """
+        for reminder_id in self._by_guild.pop(guild_id, ()):
+            del self._entries[(guild_id, reminder_id)]
+
+    def pop_due(self, now_ts: float) -> typing.List[typing.Tuple[int, str, float]]:
+        """
+        Remove and return every (guild_id, reminder_id, fire_ts) due at or before now_ts
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now_ts:
+            fire_ts, guild_id, reminder_id = heapq.heappop(self._heap)
+            key = (guild_id, reminder_id)
+            if self._entries.get(key) != fire_ts:
+                continue # stale entry left behind by a reschedule or removal
+            del self._entries[key]
+            self._unindex(guild_id, reminder_id)
+            due.append((guild_id, reminder_id, fire_ts))
+        return due
+
+    def next_fire(self) -> typing.Optional[float]:
+        """
+        Returns the earliest pending fire time, or None if nothing is scheduled
+        """
+        while self._heap:
+            fire_ts, guild_id, reminder_id = self._heap[0]
+            if self._entries.get((guild_id, reminder_id)) == fire_ts:
+                return fire_ts
+            heapq.heappop(self._heap)
+        return None
+
+    def overdue(self, now_ts: float) -> int:
+        """
+        Counts pending reminders due at or before now_ts, visiting only those heap nodes
+        """
+        count = 0
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            if i >= len(self._heap) or self._heap[i][0] > now_ts:
+                continue
+            fire_ts, guild_id, reminder_id = self._heap[i]
+            if self._entries.get((guild_id, reminder_id)) == fire_ts:
+                count += 1
+            stack.extend((2 * i + 1, 2 * i + 2))
+        return count
+
+    def _unindex(self, guild_id: int, reminder_id: str):
+        reminder_ids = self._by_guild[guild_id]
+        reminder_ids.discard(reminder_id)
+        if not reminder_ids:
+            del self._by_guild[guild_id]
+
+    def _notify(self):
+        if self.on_earlier is not None:
+            self.on_earlier()
+
+    def _maybe_compact(self):
+        # Rebuild once stale entries dominate the heap, so memory stays proportional to live reminders
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [(ts, g, r) for (g, r), ts in self._entries.items()]
+            heapq.heapify(self._heap)
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """
+    The shard a guild belongs to, as Discord assigns it
+    """
+    return (guild_id >> 22) % shard_count
+
+class ShardedDueQueue:
+    """
+    One DueQueue per shard owned by this process, with the same interface as DueQueue.
+    Reminders of guilds on shards owned by another process are ignored. on_earlier(shard_id)
+    is called when a shard's earliest fire time may have changed.
+    """
+    def __init__(
+        self,
+        shard_ids: typing.Iterable[int] = (0,),
+        shard_count: int = 1,
+        on_earlier: typing.Optional[typing.Callable[[int], None]] = None,
+    ):
+        self.shard_count = shard_count
+        self.shards: typing.Dict[int, DueQueue] = {
+            shard_id: DueQueue(on_earlier=(lambda s=shard_id: on_earlier(s)) if on_earlier else None)
+            for shard_id in shard_ids
+        }
+
+    @property
+    def shard_ids(self) -> typing.List[int]:
+        return list(self.shards)
+
+    def shard_of(self, guild_id: int) -> int:
+        return shard_for(guild_id, self.shard_count)
+
+    def _queue(self, guild_id: int) -> typing.Optional[DueQueue]:
+        return self.shards.get(shard_for(guild_id, self.shard_count))
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.shards.values())
+
+    def __contains__(self, key: typing.Tuple[int, str]) -> bool:
+        queue = self._queue(key[0])
+        return queue is not None and key in queue
+
+    def schedule(self, guild_id: int, reminder: typing.Dict):
+        queue = self._queue(guild_id)
+        if queue is not None:
+            queue.schedule(guild_id, reminder)
+
+    def schedule_at(self, guild_id: int, reminder_id: str, fire_ts: float):
+        queue = self._queue(guild_id)
+        if queue is not None:
+            queue.schedule_at(guild_id, reminder_id, fire_ts)
+
+    def remove(self, guild_id: int, reminder_id: str):
+        queue = self._queue(guild_id)
+        if queue is not None:
+            queue.remove(guild_id, reminder_id)
+
+    def load_guild(self, guild_id: int, reminders: typing.Iterable[typing.Dict]):
+        queue = self._queue(guild_id)
+        if queue is not None:
+            queue.load_guild(guild_id, reminders)
+
+    def clear_guild(self, guild_id: int):
+        queue = self._queue(guild_id)
+        if queue is not None:
+            queue.clear_guild(guild_id)
+
+    def pop_due(self, now_ts: float, shard_id: typing.Optional[int] = None) -> typing.List[typing.Tuple[int, str, float]]:
+        """
+        pop_due of one shard, or of every owned shard
+        """
+        if shard_id is not None:
+            return self.shards[shard_id].pop_due(now_ts)
+        return [entry for queue in self.shards.values() for entry in queue.pop_due(now_ts)]
+
+    def next_fire(self, shard_id: typing.Optional[int] = None) -> typing.Optional[float]:
+        if shard_id is not None:
+            return self.shards[shard_id].next_fire()
+        fires = [ts for ts in (queue.next_fire() for queue in self.shards.values()) if ts is not None]
+        return min(fires) if fires else None
+
+    def overdue(self, now_ts: float) -> int:
+        return sum(queue.overdue(now_ts) for queue in self.shards.values())
+
+class TickStats:
+    """
+    Per-shard scheduler tick counters: ticks run, reminders fired and tick durations
+    """
+    def __init__(self):
+        self.ticks = 0
+        self.fired = 0
+        self.last_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def record(self, fired: int, seconds: float):
+        self.ticks += 1
+        self.fired += fired
+        self.last_seconds = seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.total_seconds += seconds
+
+    def as_dict(self) -> typing.Dict[str, float]:
+        return {
+            "ticks": self.ticks,
+            "fired": self.fired,
+            "last_tick_ms": self.last_seconds * 1000,
+            "max_tick_ms": self.max_seconds * 1000,
+            "mean_tick_ms": self.total_seconds / self.ticks * 1000 if self.ticks else 0.0,
+        }
+
+class FireSkew:
+    """
+    Running statistics of actual minus scheduled fire time, in seconds
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, skew: float):
+        self.count += 1
+        self.total += skew
+        self.max = max(self.max, skew)
+        self.last = skew
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> str:
+        return f"fired={self.count} last={self.last:+.3f}s mean={self.mean:+.3f}s max={self.max:+.3f}s"
@@ -0,0 +1,449 @@
+"""
+Storage module for the Reminder Bot
+===
+This module defines the storage interface behind the reminder helpers and its backends:
+- JSONStorage keeps one JSON file per guild, served through the in-memory GuildStoreCache
+- SQLiteStorage keeps every guild in one SQLite database (WAL mode), indexed on next fire time
+
+The due index is rebuilt from due(), which for SQLite is one range query over the next-fire
+index returning only IDs and fire times, so no stored reminder is parsed to build it.
+
+Listings page through a guild's reminders in next-fire order with a keyset cursor: the
+page_key of the last reminder already shown.
+"""
+import os
+import json
+import heapq
+import sqlite3
+import typing
+
+from ReminderLib.Scheduler import reminder_fire_ts
+from ReminderLib.StoreCache import GuildStoreCache
+from ReminderLib.Migrate import migrate_reminder
+
+# Reminders without a valid fire time sort after every scheduled one
+UNSCHEDULED = 2**63 - 1
+
+Cursor = typing.Tuple[int, str]
+
+def page_key(reminder: typing.Dict) -> Cursor:
+    """
+    Listing order: next fire time, then reminder ID
+    """
+    fire_ts = reminder_fire_ts(reminder)
+    return (fire_ts if fire_ts is not None else UNSCHEDULED, reminder["reminder_id"])
+
+def _matches(reminder: typing.Dict, issuer_id: typing.Optional[int], channel_id: typing.Optional[int]) -> bool:
+    return (issuer_id is None or reminder.get("issuer_id") == issuer_id) and \
+        (channel_id is None or reminder.get("channel_id") == channel_id)
+
+class BatchResult:
+    """
+    Outcome of a committed batch: rows changed and bytes written to disk
+    """
+    def __init__(self, rows_changed: int = 0, bytes_written: int = 0):
+        self.rows_changed = rows_changed
+        self.bytes_written = bytes_written
+
+    def __add__(self, other: "BatchResult") -> "BatchResult":
+        return BatchResult(self.rows_changed + other.rows_changed, self.bytes_written + other.bytes_written)
+
+    def __repr__(self) -> str:
+        return f"BatchResult(rows_changed={self.rows_changed}, bytes_written={self.bytes_written})"
+
+class StorageBatch:
+    """
+    Collects the mutations of one guild and commits them in a single write
+    """
+    def __init__(self, storage: "ReminderStorage", guild_id: int):
+        self.storage = storage
+        self.guild_id = guild_id
+        self.ops: typing.List[typing.Tuple[str, typing.Any, typing.Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def upsert(self, reminder: typing.Dict):
+        self.ops.append(("upsert", reminder["reminder_id"], reminder))
+
+    def update(self, reminder_id: str, fields: typing.Dict):
+        self.ops.append(("update", reminder_id, fields))
+
+    def delete(self, reminder_id: str):
+        self.ops.append(("delete", reminder_id, None))
+
+    def commit(self) -> BatchResult:
+        if not self.ops:
+            return BatchResult()
+        result = self.storage.apply_batch(self.guild_id, self.ops)
+        self.ops = []
+        return result
+
+class ReminderStorage:
+    """
+    Interface implemented by every reminder storage backend
+    """
+    def get_all(self, guild_id: int) -> typing.List[typing.Dict]:
+        raise NotImplementedError
+
+    def get(self, guild_id: int, reminder_id: str) -> typing.Optional[typing.Dict]:
+        raise NotImplementedError
+
+    def upsert(self, guild_id: int, reminder: typing.Dict):
+        raise NotImplementedError
+
+    def update(self, guild_id: int, reminder_id: str, fields: typing.Dict) -> int:
+        raise NotImplementedError
+
+    def delete(self, guild_id: int, reminder_id: str) -> int:
+        raise NotImplementedError
+
+    def replace(self, guild_id: int, reminders: typing.List[typing.Dict]):
+        raise NotImplementedError
+
+    def batch(self, guild_id: int) -> StorageBatch:
+        """
+        Start a batch of mutations for a guild, applied together by StorageBatch.commit()
+        """
+        return StorageBatch(self, guild_id)
+
+    def apply_batch(self, guild_id: int, ops: typing.List[typing.Tuple[str, typing.Any, typing.Any]]) -> BatchResult:
+        raise NotImplementedError
+
+    def pending(self, guild_ids: typing.Iterable[int]) -> typing.Iterator[typing.Tuple[int, typing.Dict]]:
+        """
+        Yields (guild_id, reminder) for every reminder of the given guilds
+        """
+        for guild_id in guild_ids:
+            for reminder in self.get_all(guild_id):
+                yield guild_id, reminder
+
+    def page(
+        self,
+        guild_id: int,
+        limit: int,
+        after: typing.Optional[Cursor] = None,
+        issuer_id: typing.Optional[int] = None,
+        channel_id: typing.Optional[int] = None,
+    ) -> typing.List[typing.Dict]:
+        """
+        Returns up to limit reminders in page_key order, starting after the cursor, optionally
+        only those of one issuer and/or channel
+        """
+        rows = (
+            reminder for reminder in self.get_all(guild_id)
+            if _matches(reminder, issuer_id, channel_id) and (after is None or page_key(reminder) > after)
+        )
+        return heapq.nsmallest(limit, rows, key=page_key)
+
+    def count(self, guild_id: int, issuer_id: typing.Optional[int] = None, channel_id: typing.Optional[int] = None) -> int:
+        return sum(1 for reminder in self.get_all(guild_id) if _matches(reminder, issuer_id, channel_id))
+
+    def due(
+        self,
+        until_ts: typing.Optional[float] = None,
+        guild_ids: typing.Optional[typing.Iterable[int]] = None,
+    ) -> typing.Iterator[typing.Tuple[int, str, int]]:
+        """
+        Yields (guild_id, reminder_id, fire_ts) for every reminder due at or before until_ts
+        (every scheduled reminder if None), of the given guilds or of every guild
+        """
+        raise NotImplementedError
+
+    def flush(self, guild_id: typing.Optional[int] = None) -> int:
+        """
+        Persist pending changes, of one guild or of every guild. Returns the number of bytes
+        written (0 when nothing was pending or the backend writes through)
+        """
+        return 0
+
+    def drop(self, guild_id: int):
+        """
+        Forget anything cached for a guild, so the next read sees changes made by other processes
+        """
+
+    async def compact(self) -> int:
+        """
+        Run background compaction where the backend needs it. Returns the number of guilds compacted
+        """
+        return 0
+
+    def stats(self) -> str:
+        return ""
+
+    def close(self):
+        self.flush()
+
+class JSONStorage(ReminderStorage):
+    """
+    One JSON file per guild, opened through opener(guild_id) and cached in memory
+    """
+    def __init__(self, opener: typing.Callable[[int], typing.Any], max_guilds: int = 1000, max_bytes: int = 256 * 1024 * 1024):
+        self.cache = GuildStoreCache(opener, max_guilds=max_guilds, max_bytes=max_bytes)
+
+    def get_all(self, guild_id: int) -> typing.List[typing.Dict]:
+        return self.cache.get(guild_id).get_all()
+
+    def get(self, guild_id: int, reminder_id: str) -> typing.Optional[typing.Dict]:
+        return self.cache.get(guild_id).get(reminder_id)
+
+    def upsert(self, guild_id: int, reminder: typing.Dict):
+        self.cache.get(guild_id).upsert(reminder)
+
+    def update(self, guild_id: int, reminder_id: str, fields: typing.Dict) -> int:
+        return self.cache.get(guild_id).update(reminder_id, fields)
+
+    def delete(self, guild_id: int, reminder_id: str) -> int:
+        return self.cache.get(guild_id).delete(reminder_id)
+
+    def replace(self, guild_id: int, reminders: typing.List[typing.Dict]):
+        self.cache.get(guild_id).replace(reminders)
+
+    def page(
+        self,
+        guild_id: int,
+        limit: int,
+        after: typing.Optional[Cursor] = None,
+        issuer_id: typing.Optional[int] = None,
+        channel_id: typing.Optional[int] = None,
+    ) -> typing.List[typing.Dict]:
+        rows = self.cache.get(guild_id).find(issuer_id, channel_id)
+        if after is not None:
+            rows = (reminder for reminder in rows if page_key(reminder) > after)
+        return heapq.nsmallest(limit, rows, key=page_key)
+
+    def count(self, guild_id: int, issuer_id: typing.Optional[int] = None, channel_id: typing.Optional[int] = None) -> int:
+        return self.cache.get(guild_id).count(issuer_id, channel_id)
+
+    def apply_batch(self, guild_id: int, ops: typing.List[typing.Tuple[str, typing.Any, typing.Any]]) -> BatchResult:
+        store = self.cache.get(guild_id)
+        changed = 0
+        for op, reminder_id, value in ops:
+            if op == "upsert":
+                store.upsert(value)
+                changed += 1
+            elif op == "update":
+                changed += store.update(reminder_id, value)
+            elif op == "delete":
+                changed += store.delete(reminder_id)
+        return BatchResult(changed, store.flush())
+
+    def due(
+        self,
+        until_ts: typing.Optional[float] = None,
+        guild_ids: typing.Optional[typing.Iterable[int]] = None,
+    ) -> typing.Iterator[typing.Tuple[int, str, int]]:
+        # Every guild means every cached guild; files of guilds never loaded are not read
+        guild_ids = list(guild_ids) if guild_ids is not None else list(self.cache._stores)
+        for guild_id, reminder in self.pending(guild_ids):
+            fire_ts = reminder_fire_ts(reminder)
+            if fire_ts is not None and (until_ts is None or fire_ts <= until_ts):
+                yield guild_id, reminder["reminder_id"], fire_ts
+
+    def flush(self, guild_id: typing.Optional[int] = None) -> int:
+        if guild_id is None:
+            return self.cache.flush()
+        return self.cache.get(guild_id).flush()
+
+    def drop(self, guild_id: int):
+        self.cache.drop(guild_id)
+
+    async def compact(self) -> int:
+        return await self.cache.compact()
+
+    def stats(self) -> str:
+        return self.cache.stats()
+
+class SQLiteStorage(ReminderStorage):
+    """
+    All guilds in one SQLite database. Rows keep the full reminder as JSON next to the
+    indexed columns, so the reminder dict format is unchanged for callers.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reminders (
+            guild_id INTEGER NOT NULL,
+            reminder_id TEXT NOT NULL,
+            issuer_id INTEGER,
+            channel_id INTEGER,
+            next_fire INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (guild_id, reminder_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_reminders_next_fire ON reminders (next_fire);
+        CREATE INDEX IF NOT EXISTS idx_reminders_guild_page ON reminders (guild_id, COALESCE(next_fire, 9223372036854775807), reminder_id);
+        CREATE INDEX IF NOT EXISTS idx_reminders_guild_issuer ON reminders (guild_id, issuer_id, COALESCE(next_fire, 9223372036854775807), reminder_id);
+        CREATE INDEX IF NOT EXISTS idx_reminders_guild_channel ON reminders (guild_id, channel_id, COALESCE(next_fire, 9223372036854775807), reminder_id);
+        DROP INDEX IF EXISTS idx_reminders_issuer;
+    """
+    # Same expression as the listing indexes, so pages are read from them in order
+    PAGE_KEY = "COALESCE(next_fire, 9223372036854775807)"
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.migrated = self._migrate()
+
+    def _migrate(self) -> int:
+        """
+        Upgrades rows still in the legacy schema (string time) in place
+        """
+        rows = self.conn.execute(
+            "SELECT guild_id, data FROM reminders WHERE next_fire IS NULL OR typeof(next_fire) != 'integer'"
+        ).fetchall()
+        upgraded = []
+        for guild_id, data in rows:
+            reminder = json.loads(data)
+            if migrate_reminder(reminder):
+                upgraded.append(self._columns(guild_id, reminder))
+        if upgraded:
+            with self.conn:
+                self.conn.execute("BEGIN")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO reminders (guild_id, reminder_id, issuer_id, channel_id, next_fire, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    upgraded,
+                )
+        return len(upgraded)
+
+    @staticmethod
+    def _columns(guild_id: int, reminder: typing.Dict) -> tuple:
+        return (
+            guild_id,
+            reminder["reminder_id"],
+            reminder.get("issuer_id"),
+            reminder.get("channel_id"),
+            reminder_fire_ts(reminder),
+            json.dumps(reminder),
+        )
+
+    @staticmethod
+    def _filters(guild_id: int, issuer_id: typing.Optional[int], channel_id: typing.Optional[int]) -> typing.Tuple[str, list]:
+        where, params = ["guild_id = ?"], [guild_id]
+        if issuer_id is not None:
+            where.append("issuer_id = ?")
+            params.append(issuer_id)
+        if channel_id is not None:
+            where.append("channel_id = ?")
+            params.append(channel_id)
+        return " AND ".join(where), params
+
+    def count(self, guild_id: int, issuer_id: typing.Optional[int] = None, channel_id: typing.Optional[int] = None) -> int:
+        where, params = self._filters(guild_id, issuer_id, channel_id)
+        return self.conn.execute(f"SELECT COUNT(*) FROM reminders WHERE {where}", params).fetchone()[0]
+
+    def page(
+        self,
+        guild_id: int,
+        limit: int,
+        after: typing.Optional[Cursor] = None,
+        issuer_id: typing.Optional[int] = None,
+        channel_id: typing.Optional[int] = None,
+    ) -> typing.List[typing.Dict]:
+        where, params = self._filters(guild_id, issuer_id, channel_id)
+        if after is not None:
+            where += f" AND ({self.PAGE_KEY}, reminder_id) > (?, ?)"
+            params += list(after)
+        rows = self.conn.execute(
+            f"SELECT data FROM reminders WHERE {where} ORDER BY {self.PAGE_KEY}, reminder_id LIMIT ?", params + [limit]
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def get_all(self, guild_id: int) -> typing.List[typing.Dict]:
+        rows = self.conn.execute("SELECT data FROM reminders WHERE guild_id = ?", (guild_id,))
+        return [json.loads(data) for (data,) in rows]
+
+    def get(self, guild_id: int, reminder_id: str) -> typing.Optional[typing.Dict]:
+        row = self.conn.execute(
+            "SELECT data FROM reminders WHERE guild_id = ? AND reminder_id = ?", (guild_id, reminder_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert(self, guild_id: int, reminder: typing.Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO reminders (guild_id, reminder_id, issuer_id, channel_id, next_fire, data) VALUES (?, ?, ?, ?, ?, ?)",
+            self._columns(guild_id, reminder),
+        )
+
+    def update(self, guild_id: int, reminder_id: str, fields: typing.Dict) -> int:
+        reminder = self.get(guild_id, reminder_id)
+        if reminder is None:
+            return 0
+        reminder.update(fields)
+        self.upsert(guild_id, reminder)
+        return 1
+
+    def delete(self, guild_id: int, reminder_id: str) -> int:
+        cur = self.conn.execute("DELETE FROM reminders WHERE guild_id = ? AND reminder_id = ?", (guild_id, reminder_id))
+        return cur.rowcount
+
+    def replace(self, guild_id: int, reminders: typing.List[typing.Dict]):
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM reminders WHERE guild_id = ?", (guild_id,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO reminders (guild_id, reminder_id, issuer_id, channel_id, next_fire, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [self._columns(guild_id, reminder) for reminder in reminders],
+            )
+
+    def apply_batch(self, guild_id: int, ops: typing.List[typing.Tuple[str, typing.Any, typing.Any]]) -> BatchResult:
+        result = BatchResult()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            for op, reminder_id, value in ops:
+                if op == "delete":
+                    result.rows_changed += self.delete(guild_id, reminder_id)
+                    continue
+                if op == "update":
+                    reminder = self.get(guild_id, reminder_id)
+                    if reminder is None:
+                        continue
+                    reminder.update(value)
+                    value = reminder
+                columns = self._columns(guild_id, value)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO reminders (guild_id, reminder_id, issuer_id, channel_id, next_fire, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    columns,
+                )
+                result.rows_changed += 1
+                result.bytes_written += len(columns[-1])
+        return result
+
+    def pending(self, guild_ids: typing.Iterable[int]) -> typing.Iterator[typing.Tuple[int, typing.Dict]]:
+        guild_ids = list(guild_ids)
+        for start in range(0, len(guild_ids), 500):
+            chunk = guild_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT guild_id, data FROM reminders WHERE guild_id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for guild_id, data in rows:
+                yield guild_id, json.loads(data)
+
+    def due(
+        self,
+        until_ts: typing.Optional[float] = None,
+        guild_ids: typing.Optional[typing.Iterable[int]] = None,
+    ) -> typing.Iterator[typing.Tuple[int, str, int]]:
+        bound, params = ("next_fire <= ?", [until_ts]) if until_ts is not None else ("next_fire IS NOT NULL", [])
+        wanted = set(guild_ids) if guild_ids is not None else None
+        if wanted is not None and len(wanted) <= 500:
+            # A few guilds (a reload or shard takeover): read them through the per-guild index
+            yield from self.conn.execute(
+                f"SELECT guild_id, reminder_id, next_fire FROM reminders WHERE guild_id IN ({','.join('?' * len(wanted))}) AND {bound}",
+                [*wanted, *params],
+            )
+            return
+        # One range scan of the next_fire index across every guild
+        rows = self.conn.execute(f"SELECT guild_id, reminder_id, next_fire FROM reminders WHERE {bound} ORDER BY next_fire", params)
+        for row in rows:
+            if wanted is None or row[0] in wanted:
+                yield row
+
+    def stats(self) -> str:
+        total = self.conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+        return f"sqlite={self.path} rows={total}"
+
+    def close(self):
+        self.conn.close()
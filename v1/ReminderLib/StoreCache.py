@@ -0,0 +1,297 @@
+"""
+Store cache module for the Reminder Bot
+===
+This module keeps the parsed reminders of recently used guilds in memory.
+Reads are served from memory, mutations mark the guild dirty and are written back
+to the underlying per-guild DB on flush, and inactive guilds are evicted LRU-first
+once the cache exceeds its guild count or memory ceiling.
+
+Each store keeps its rows keyed by reminder_id plus secondary indexes on issuer_id and
+channel_id, maintained on every mutation, so per-user and per-channel lookups cost
+O(matches) instead of a scan of the guild. Rows are held as compact ReminderRecords.
+"""
+import os
+import typing
+
+from collections import OrderedDict
+
+from ReminderLib.Migrate import migrate_rows
+from ReminderLib.Record import ReminderRecord
+
+def _row_size(row: ReminderRecord) -> int:
+    """
+    Rough in-memory footprint of a reminder row in bytes
+    """
+    return row.footprint()
+
+def _plain(row: typing.Mapping) -> typing.Dict:
+    """
+    A row as a JSON-serializable dict
+    """
+    return row.to_dict() if isinstance(row, ReminderRecord) else row
+
+class GuildStore:
+    """
+    In-memory copy of one guild's reminders, backed by a DB exposing get_all() and _save(rows).
+    If the DB also exposes append(records) (a JournaledDB), flushing appends only the changes.
+    on_resize(delta), if set, is called with the change in size after every mutation.
+    """
+    def __init__(self, guild_id: int, db, on_resize: typing.Optional[typing.Callable[[int], None]] = None):
+        self.guild_id = guild_id
+        self.db = db
+        self.on_resize = on_resize
+        self.rows: typing.Dict[str, ReminderRecord] = {}
+        self.by_issuer: typing.Dict[typing.Any, typing.Set[str]] = {}
+        self.by_channel: typing.Dict[typing.Any, typing.Set[str]] = {}
+        self.dirty = False
+        self.journaled = hasattr(db, "append")
+        self.ops: typing.List[typing.Dict] = []
+
+        # Online schema migration: upgraded rows are written back on the next flush
+        migrated = []
+        for row in db.get_all():
+            if migrate_rows([row]):
+                migrated.append(row)
+            record = ReminderRecord(row)
+            self.rows[record.get("reminder_id")] = record
+            self._index(record)
+        self.size = sum(_row_size(row) for row in self.rows.values())
+        for row in migrated:
+            self._record({"op": "upsert", "row": row})
+        self.migrated = len(migrated)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get_all(self) -> typing.List[ReminderRecord]:
+        """
+        Returns every reminder of the guild, as read-only records shared with the cache
+        """
+        return list(self.rows.values())
+
+    def get(self, reminder_id: str) -> typing.Optional[ReminderRecord]:
+        return self.rows.get(reminder_id)
+
+    def find(self, issuer_id: typing.Optional[int] = None, channel_id: typing.Optional[int] = None) -> typing.List[ReminderRecord]:
+        """
+        Returns the reminders matching every given filter, from the secondary indexes
+        """
+        return [self.rows[reminder_id] for reminder_id in self._matching_ids(issuer_id, channel_id)]
+
+    def count(self, issuer_id: typing.Optional[int] = None, channel_id: typing.Optional[int] = None) -> int:
+        if issuer_id is None and channel_id is None:
+            return len(self.rows)
+        return len(self._matching_ids(issuer_id, channel_id))
+
+    def _matching_ids(self, issuer_id: typing.Optional[int], channel_id: typing.Optional[int]) -> typing.Collection[str]:
+        sets = []
+        if issuer_id is not None:
+            sets.append(self.by_issuer.get(issuer_id, set()))
+        if channel_id is not None:
+            sets.append(self.by_channel.get(channel_id, set()))
+        if not sets:
+            return self.rows.keys()
+        if len(sets) == 1:
+            return sets[0]
+        small, large = sorted(sets, key=len)
+        return {reminder_id for reminder_id in small if reminder_id in large}
+
+    def _index(self, row: ReminderRecord):
+        reminder_id = row.get("reminder_id")
+        self.by_issuer.setdefault(row.get("issuer_id"), set()).add(reminder_id)
+        self.by_channel.setdefault(row.get("channel_id"), set()).add(reminder_id)
+
+    def _unindex(self, row: ReminderRecord):
+        reminder_id = row.get("reminder_id")
+        for index, key in ((self.by_issuer, row.get("issuer_id")), (self.by_channel, row.get("channel_id"))):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(reminder_id)
+                if not ids:
+                    del index[key]
+
+    def upsert(self, reminder: typing.Mapping):
+        """
+        Insert a reminder, or replace the one with the same reminder_id
+        """
+        delta = 0
+        old = self.rows.get(reminder["reminder_id"])
+        if old is not None:
+            delta -= _row_size(old)
+            self._unindex(old)
+        record = reminder if isinstance(reminder, ReminderRecord) else ReminderRecord(reminder)
+        self.rows[record["reminder_id"]] = record
+        self._index(record)
+        delta += _row_size(record)
+        self._record({"op": "upsert", "row": _plain(reminder)})
+        self._resize(delta)
+
+    def update(self, reminder_id: str, fields: typing.Dict) -> int:
+        """
+        Update fields of a reminder (records are replaced, not mutated). Returns the number of rows changed
+        """
+        row = self.rows.get(reminder_id)
+        if row is None:
+            return 0
+        delta = -_row_size(row)
+        reindex = "issuer_id" in fields or "channel_id" in fields
+        if reindex:
+            self._unindex(row)
+        row = self.rows[reminder_id] = row.replace(fields)
+        if reindex:
+            self._index(row)
+        delta += _row_size(row)
+        self._record({"op": "update", "id": reminder_id, "fields": fields})
+        self._resize(delta)
+        return 1
+
+    def delete(self, reminder_id: str) -> int:
+        """
+        Delete a reminder. Returns the number of rows removed
+        """
+        row = self.rows.pop(reminder_id, None)
+        if row is None:
+            return 0
+        self._unindex(row)
+        self._record({"op": "delete", "id": reminder_id})
+        self._resize(-_row_size(row))
+        return 1
+
+    def replace(self, reminders: typing.List[typing.Mapping]):
+        """
+        Replace every reminder of the guild
+        """
+        records = (row if isinstance(row, ReminderRecord) else ReminderRecord(row) for row in reminders)
+        self.rows = {row.get("reminder_id"): row for row in records}
+        self.by_issuer, self.by_channel = {}, {}
+        for row in self.rows.values():
+            self._index(row)
+        self._record({"op": "replace", "rows": [_plain(row) for row in reminders]})
+        self._resize(sum(_row_size(row) for row in self.rows.values()) - self.size)
+
+    def _resize(self, delta: int):
+        self.size += delta
+        if delta and self.on_resize is not None:
+            self.on_resize(delta)
+
+    def _record(self, op: typing.Dict):
+        self.dirty = True
+        if self.journaled:
+            self.ops.append(op)
+
+    def flush(self) -> int:
+        """
+        Write the rows back to disk if they changed. Returns the number of bytes written
+        """
+        if not self.dirty:
+            return 0
+        if self.journaled:
+            written = self.db.append(self.ops)
+            self.ops = []
+        else:
+            self.db._save([row.to_dict() for row in self.rows.values()])
+            path = getattr(self.db, "path", None)
+            written = os.path.getsize(path) if path and os.path.exists(path) else self.size
+        self.dirty = False
+        return written
+
+    async def compact(self) -> bool:
+        """
+        Fold a journaled store's log into a new snapshot once it passes its threshold
+        """
+        if not self.journaled or not self.db.needs_compaction():
+            return False
+        self.flush()
+        await self.db.compact([row.to_dict() for row in self.rows.values()])
+        return True
+
+class GuildStoreCache:
+    """
+    LRU cache of open guild stores with a guild count and memory ceiling
+    """
+    def __init__(self, opener: typing.Callable[[int], typing.Any], max_guilds: int = 1000, max_bytes: int = 256 * 1024 * 1024):
+        self.opener = opener
+        self.max_guilds = max_guilds
+        self.max_bytes = max_bytes
+        self._stores: "OrderedDict[int, GuildStore]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Sum of the cached stores' sizes, kept up to date by their on_resize callbacks
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._stores
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _resized(self, delta: int):
+        self._size += delta
+        if delta > 0 and self._size > self.max_bytes:
+            # A store grew past the ceiling; it is the most recently used one, so it stays
+            self._evict()
+
+    def get(self, guild_id: int) -> GuildStore:
+        """
+        Returns the store of a guild, loading it from disk on a miss
+        """
+        store = self._stores.get(guild_id)
+        if store is not None:
+            self.hits += 1
+            self._stores.move_to_end(guild_id)
+            return store
+
+        self.misses += 1
+        store = GuildStore(guild_id, self.opener(guild_id), on_resize=self._resized)
+        self._stores[guild_id] = store
+        self._size += store.size
+        self._evict()
+        return store
+
+    def flush(self) -> int:
+        """
+        Write back every dirty store. Returns the number of bytes written
+        """
+        written = 0
+        for store in list(self._stores.values()):
+            if store.dirty:
+                written += store.flush()
+        return written
+
+    async def compact(self) -> int:
+        """
+        Compact every cached journaled store past its threshold. Returns the number compacted
+        """
+        compacted = 0
+        for store in list(self._stores.values()):
+            if await store.compact():
+                compacted += 1
+        return compacted
+
+    def drop(self, guild_id: int):
+        """
+        Flush and forget a guild store
+        """
+        store = self._stores.pop(guild_id, None)
+        if store is not None:
+            self._forget(store)
+
+    def _forget(self, store: GuildStore):
+        store.flush()
+        store.on_resize = None
+        self._size -= store.size
+
+    def _evict(self):
+        # Never evicts the most recently used store, which is the one just requested or changed
+        while len(self._stores) > 1 and (len(self._stores) > self.max_guilds or self._size > self.max_bytes):
+            _, store = self._stores.popitem(last=False)
+            self._forget(store)
+            self.evictions += 1
+
+    def stats(self) -> str:
+        return f"guilds={len(self._stores)} bytes~{self.size} hits={self.hits} misses={self.misses} evictions={self.evictions}"
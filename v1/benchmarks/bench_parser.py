@@ -0,0 +1,112 @@
+"""
+Parser benchmark for the Reminder Bot
+===
+Compares parse_flexible_time against the previous strptime fall-through implementation
+on valid and invalid inputs, and checks that both agree on every input.
+
+Usage: python v1/benchmarks/bench_parser.py [--number N]
+"""
+import os
+import sys
+import timeit
+import argparse
+
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ReminderLib.Parser import parse_flexible_time, _parse_time_parts
+
+def legacy_parse_flexible_time(time_str: str) -> datetime:
+    """
+    The strptime-based implementation parse_flexible_time replaced, kept for comparison
+    """
+    now = datetime.now()
+
+    formats = [
+        ("%y-%m-%d-%H:%M", time_str),
+        ("%Y-%m-%d-%H:%M", time_str),
+        ("%Y-%m-%d-%H:%M", f"{now.year}-{time_str}"),
+        ("%Y-%m-%d-%H:%M", f"{now.year}-{now.month:02d}-{time_str}"),
+        ("%Y-%m-%d-%H:%M", f"{now.year}-{now.month:02d}-{now.day:02d}-{time_str}")
+    ]
+
+    for seconds in ("", ":%S"):
+        for fmt, time_candidate in formats:
+            try:
+                return datetime.strptime(time_candidate, fmt + seconds)
+            except ValueError:
+                continue
+
+    raise ValueError(f"Time format not recognized: '{time_str}'")
+
+VALID = [
+    "26-05-17-10:30",
+    "2026-05-17-10:30",
+    "05-17-10:30",
+    "17-10:30",
+    "10:30",
+    "9:05",
+    "10:30:15",
+    "2026-05-17-10:30:15",
+]
+
+INVALID = [
+    "",
+    "tomorrow",
+    "25:00",
+    "10:60",
+    "2026-13-01-10:00",
+    "2026-02-30-10:00",
+    "123-10:00",
+    "10-30",
+]
+
+def outcome(func, time_str: str):
+    try:
+        return func(time_str)
+    except ValueError:
+        return "ValueError"
+
+def check_equivalence():
+    mismatches = []
+    for time_str in VALID + INVALID:
+        new, old = outcome(parse_flexible_time, time_str), outcome(legacy_parse_flexible_time, time_str)
+        if new != old:
+            mismatches.append((time_str, new, old))
+    return mismatches
+
+def bench(func, inputs, number: int, clear_cache: bool = False) -> float:
+    """
+    Returns microseconds per call over the given inputs
+    """
+    def run():
+        if clear_cache:
+            _parse_time_parts.cache_clear()
+        for time_str in inputs:
+            outcome(func, time_str)
+
+    seconds = timeit.timeit(run, number=number)
+    return seconds / (number * len(inputs)) * 1e6
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--number", type=int, default=2000, help="Repetitions of each input set")
+    args = arg_parser.parse_args()
+
+    mismatches = check_equivalence()
+    for time_str, new, old in mismatches:
+        print(f"[BNCH] MISMATCH {time_str!r}: new={new} legacy={old}")
+
+    print(f"[BNCH] parse_flexible_time, {args.number} runs per input set (us/call)")
+    print(f"{'inputs':<10}{'legacy':>10}{'uncached':>10}{'cached':>10}")
+    for name, inputs in (("valid", VALID), ("invalid", INVALID)):
+        legacy = bench(legacy_parse_flexible_time, inputs, args.number)
+        uncached = bench(parse_flexible_time, inputs, args.number, clear_cache=True)
+        cached = bench(parse_flexible_time, inputs, args.number)
+        print(f"{name:<10}{legacy:>10.2f}{uncached:>10.2f}{cached:>10.2f}")
+
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
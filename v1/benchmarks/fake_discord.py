@@ -0,0 +1,495 @@
+"""
+Local Discord stand-in for load tests
+===
+An aiohttp server that speaks just enough of the Discord gateway and REST API for discord.py
+to log in, receive its guilds and answer slash commands, so the bot can be driven end to end
+without touching real Discord:
+- gateway: HELLO, heartbeat ACK, IDENTIFY -> READY + GUILD_CREATE (filtered by shard),
+  REQUEST_GUILD_MEMBERS -> GUILD_MEMBERS_CHUNK, and INTERACTION_CREATE pushed by the driver
+- REST: login, application info, channel message sends, interaction callbacks, followups
+  and member fetches
+- rate limits: channel sends share a per-channel bucket; going over it returns a 429 that
+  discord.py treats as a real rate limit and retries
+
+Point the bot at it with DISCORD_API_BASE=<url>/api/v10 and DISCORD_GATEWAY_URL=<ws url>.
+Used by load_driver.py; every channel send and interaction response is recorded with its
+wall-clock time.
+"""
+import time
+import json
+import asyncio
+import random
+import typing
+import itertools
+
+from aiohttp import web, WSMsgType
+
+DISCORD_EPOCH_MS = 1420070400000
+APP_ID = 1000
+BOT_USER = {
+    "id": str(APP_ID),
+    "username": "remi",
+    "discriminator": "0",
+    "global_name": None,
+    "avatar": None,
+    "bot": True,
+}
+
+OP_DISPATCH = 0
+OP_HEARTBEAT = 1
+OP_IDENTIFY = 2
+OP_RESUME = 6
+OP_REQUEST_MEMBERS = 8
+OP_HELLO = 10
+OP_HEARTBEAT_ACK = 11
+
+def iso_now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+
+def user_payload(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+    }
+
+def member_payload(user: dict, permissions: str = "0") -> dict:
+    return {
+        "user": user,
+        "roles": [],
+        "joined_at": iso_now(),
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+        "nick": None,
+        "avatar": None,
+        "premium_since": None,
+        "pending": False,
+        "communication_disabled_until": None,
+        "permissions": permissions,
+    }
+
+def channel_payload(guild_id: int, channel_id: int, position: int = 0) -> dict:
+    return {
+        "id": str(channel_id),
+        "type": 0,
+        "guild_id": str(guild_id),
+        "name": f"channel-{channel_id}",
+        "position": position,
+        "permission_overwrites": [],
+        "nsfw": False,
+        "parent_id": None,
+        "topic": None,
+        "last_message_id": None,
+        "rate_limit_per_user": 0,
+    }
+
+def guild_payload(guild_id: int, channel_ids: typing.List[int], owner_id: int) -> dict:
+    return {
+        "id": str(guild_id),
+        "name": f"guild-{guild_id}",
+        "owner_id": str(owner_id),
+        "unavailable": False,
+        "member_count": 2,
+        "large": False,
+        "joined_at": iso_now(),
+        "roles": [{
+            "id": str(guild_id),
+            "name": "@everyone",
+            "permissions": "0",
+            "position": 0,
+            "color": 0,
+            "hoist": False,
+            "managed": False,
+            "mentionable": False,
+            "flags": 0,
+        }],
+        "channels": [channel_payload(guild_id, c, i) for i, c in enumerate(channel_ids)],
+        "members": [member_payload(BOT_USER)],
+        "threads": [],
+        "voice_states": [],
+        "presences": [],
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+        "soundboard_sounds": [],
+        "premium_tier": 0,
+        "mfa_level": 0,
+        "nsfw_level": 0,
+        "verification_level": 0,
+        "explicit_content_filter": 0,
+        "default_message_notifications": 0,
+        "system_channel_flags": 0,
+        "preferred_locale": "en-US",
+        "afk_timeout": 300,
+    }
+
+def json_response(data, status: int = 200, headers: typing.Optional[dict] = None) -> web.Response:
+    """
+    discord.py only decodes bodies whose content type is exactly application/json, without the
+    charset aiohttp's json_response appends
+    """
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers={**(headers or {}), "Content-Type": "application/json"},
+    )
+
+class RateBucket:
+    """
+    Fixed-window bucket: limit requests per window seconds
+    """
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.reset_at = 0.0
+        self.remaining = limit
+
+    def take(self, now: float) -> typing.Optional[float]:
+        """
+        Takes one request. Returns None if allowed, else the seconds until the bucket resets
+        """
+        if now >= self.reset_at:
+            self.reset_at = now + self.window
+            self.remaining = self.limit
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+class GatewaySession:
+    def __init__(self, ws: web.WebSocketResponse, shard_id: int, shard_count: int):
+        self.ws = ws
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.seq = 0
+        self.lock = asyncio.Lock()
+
+    async def send(self, op: int, data, event: typing.Optional[str] = None):
+        async with self.lock:
+            payload = {"op": op, "d": data, "s": None, "t": event}
+            if op == OP_DISPATCH:
+                self.seq += 1
+                payload["s"] = self.seq
+            await self.ws.send_str(json.dumps(payload))
+
+class FakeDiscord:
+    """
+    guilds maps guild_id -> channel ids. rate_limit sends per rate_window seconds are allowed
+    per channel (0 disables rate limiting). With advertise_limits off the bucket headers are
+    left out, so discord.py cannot pace itself and runs into 429s instead. latency is added to
+    every REST response.
+    """
+    def __init__(
+        self,
+        guilds: typing.Dict[int, typing.List[int]],
+        owner_id: int = 1,
+        rate_limit: int = 5,
+        rate_window: float = 5.0,
+        advertise_limits: bool = True,
+        latency: float = 0.0,
+        heartbeat_interval: int = 41250,
+    ):
+        self.guilds = guilds
+        self.owner_id = owner_id
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.advertise_limits = advertise_limits
+        self.latency = latency
+        self.heartbeat_interval = heartbeat_interval
+        self.url = None
+        self.sessions: typing.List[GatewaySession] = []
+        self.buckets: typing.Dict[int, RateBucket] = {}
+        self.ids = itertools.count()
+        # Records
+        self.messages: typing.List[typing.Tuple[float, int, dict]] = []
+        self.rate_limited = 0
+        self.unknown_routes: typing.Dict[str, int] = {}
+        self.on_message: typing.Optional[typing.Callable[[float, int, dict], None]] = None
+        self._pending: typing.Dict[str, asyncio.Future] = {}
+        self._ready = asyncio.Event()
+        self._runner: typing.Optional[web.AppRunner] = None
+
+    # Helpers
+    def snowflake(self) -> int:
+        return ((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (next(self.ids) & 0x3FFFFF)
+
+    def shard_for(self, guild_id: int) -> typing.Optional[GatewaySession]:
+        # With several connections on a shard (standby replicas), any of them may get the event
+        sessions = [s for s in self.sessions if (guild_id >> 22) % s.shard_count == s.shard_id]
+        return random.choice(sessions) if sessions else None
+
+    def message_payload(self, channel_id: int, body: dict, author: dict = BOT_USER) -> dict:
+        return {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "author": author,
+            "content": body.get("content") or "",
+            "timestamp": iso_now(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": body.get("embeds") or [],
+            "components": [],
+            "pinned": False,
+            "type": 0,
+            "flags": body.get("flags") or 0,
+        }
+
+    async def read_body(self, request: web.Request) -> dict:
+        if request.content_type == "multipart/form-data":
+            form = await request.post()
+            return json.loads(form.get("payload_json", "{}"))
+        if request.can_read_body:
+            return await request.json()
+        return {}
+
+    async def wait_ready(self, timeout: float = 60.0):
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    # Gateway
+    async def gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"op": OP_HELLO, "d": {"heartbeat_interval": self.heartbeat_interval}}))
+
+        session = None
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            frame = json.loads(msg.data)
+            op, data = frame.get("op"), frame.get("d")
+            if op == OP_HEARTBEAT:
+                await ws.send_str(json.dumps({"op": OP_HEARTBEAT_ACK, "d": None}))
+            elif op == OP_IDENTIFY:
+                shard_id, shard_count = data.get("shard") or [0, 1]
+                session = GatewaySession(ws, shard_id, shard_count)
+                self.sessions.append(session)
+                await self.identify(session)
+            elif op == OP_RESUME:
+                # Session ids carry the shard, so a resumed connection keeps its guilds
+                _, shard_id, shard_count, _ = data["session_id"].split("-")
+                session = GatewaySession(ws, int(shard_id), int(shard_count))
+                self.sessions.append(session)
+                await session.send(OP_DISPATCH, {}, "RESUMED")
+            elif op == OP_REQUEST_MEMBERS and session is not None:
+                await session.send(OP_DISPATCH, {
+                    "guild_id": data["guild_id"],
+                    "members": [member_payload(user_payload(int(u))) for u in data.get("user_ids") or []],
+                    "chunk_index": 0,
+                    "chunk_count": 1,
+                    "nonce": data.get("nonce"),
+                }, "GUILD_MEMBERS_CHUNK")
+
+        if session is not None:
+            self.sessions.remove(session)
+        return ws
+
+    async def identify(self, session: GatewaySession):
+        owned = [g for g in self.guilds if (g >> 22) % session.shard_count == session.shard_id]
+        await session.send(OP_DISPATCH, {
+            "v": 10,
+            "user": BOT_USER,
+            "guilds": [{"id": str(g), "unavailable": True} for g in owned],
+            "session_id": f"session-{session.shard_id}-{session.shard_count}-{self.snowflake()}",
+            "resume_gateway_url": self.gateway_url,
+            "shard": [session.shard_id, session.shard_count],
+            "application": {"id": str(APP_ID), "flags": 0},
+        }, "READY")
+        for guild_id in owned:
+            await session.send(OP_DISPATCH, guild_payload(guild_id, self.guilds[guild_id], self.owner_id), "GUILD_CREATE")
+        self._ready.set()
+
+    async def interact(
+        self,
+        guild_id: int,
+        channel_id: int,
+        user_id: int,
+        name: str,
+        options: typing.Dict[str, str],
+        timeout: float = 30.0,
+    ) -> dict:
+        """
+        Dispatches a slash command and waits for the bot's interaction callback. Returns the
+        callback body; the time it arrived is under "_received"
+        """
+        session = self.shard_for(guild_id)
+        if session is None:
+            raise RuntimeError(f"no gateway session owns guild {guild_id}")
+
+        interaction_id = str(self.snowflake())
+        token = f"token-{interaction_id}"
+        future = self._pending[interaction_id] = asyncio.get_running_loop().create_future()
+        try:
+            await session.send(OP_DISPATCH, {
+                "id": interaction_id,
+                "application_id": str(APP_ID),
+                "type": 2,
+                "token": token,
+                "version": 1,
+                "guild_id": str(guild_id),
+                "channel_id": str(channel_id),
+                "channel": channel_payload(guild_id, channel_id),
+                "member": member_payload(user_payload(user_id)),
+                "app_permissions": "2147483647",
+                "attachment_size_limit": 8388608,
+                "locale": "en-US",
+                "guild_locale": "en-US",
+                "entitlements": [],
+                "authorizing_integration_owners": {},
+                "context": 0,
+                "data": {
+                    "id": str(APP_ID + 1),
+                    "name": name,
+                    "type": 1,
+                    "options": [{"name": k, "type": 3, "value": v} for k, v in options.items()],
+                },
+            }, "INTERACTION_CREATE")
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(interaction_id, None)
+
+    # REST
+    async def get_gateway(self, request: web.Request) -> web.Response:
+        return json_response({
+            "url": self.gateway_url,
+            "shards": 1,
+            "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 16},
+        })
+
+    async def get_me(self, request: web.Request) -> web.Response:
+        return json_response(BOT_USER)
+
+    async def get_application(self, request: web.Request) -> web.Response:
+        return json_response({
+            "id": str(APP_ID),
+            "name": "remi",
+            "description": "",
+            "icon": None,
+            "bot_public": False,
+            "bot_require_code_grant": False,
+            "owner": user_payload(self.owner_id),
+            "verify_key": "",
+            "flags": 0,
+        })
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        channel_id = int(request.match_info["channel_id"])
+        now = time.time()
+        if self.rate_limit:
+            bucket = self.buckets.get(channel_id)
+            if bucket is None:
+                bucket = self.buckets[channel_id] = RateBucket(self.rate_limit, self.rate_window)
+            retry_after = bucket.take(now)
+            if retry_after is not None:
+                self.rate_limited += 1
+                return json_response(
+                    {"message": "You are being rate limited.", "retry_after": retry_after, "global": False},
+                    status=429,
+                    # discord.py only trusts a 429 that came through Discord's proxy
+                    headers={"Via": "1.1 google", "X-RateLimit-Scope": "user", "Retry-After": str(retry_after)},
+                )
+            headers = {} if not self.advertise_limits else {
+                "X-RateLimit-Limit": str(bucket.limit),
+                "X-RateLimit-Remaining": str(bucket.remaining),
+                "X-RateLimit-Reset-After": f"{bucket.reset_at - now:.3f}",
+                "X-RateLimit-Bucket": f"channel-{channel_id}",
+            }
+        else:
+            headers = {}
+
+        body = await self.read_body(request)
+        self.messages.append((now, channel_id, body))
+        if self.on_message is not None:
+            self.on_message(now, channel_id, body)
+        return json_response(self.message_payload(channel_id, body), headers=headers)
+
+    async def interaction_callback(self, request: web.Request) -> web.Response:
+        body = await self.read_body(request)
+        body["_received"] = time.time()
+        interaction_id = request.match_info["interaction_id"]
+        future = self._pending.get(interaction_id)
+        if future is not None and not future.done():
+            future.set_result(body)
+
+        data = body.get("data") or {}
+        return json_response({
+            "interaction": {
+                "id": interaction_id,
+                "type": 2,
+                "response_message_id": str(self.snowflake()),
+                "response_message_loading": body.get("type") == 5,
+                "response_message_ephemeral": bool((data.get("flags") or 0) & 64),
+            },
+            "resource": {
+                "type": body.get("type", 4),
+                "message": self.message_payload(0, data),
+            },
+        })
+
+    async def webhook_message(self, request: web.Request) -> web.Response:
+        if request.method == "DELETE":
+            return web.Response(status=204)
+        body = await self.read_body(request) if request.method != "GET" else {}
+        return json_response(self.message_payload(0, body))
+
+    async def get_member(self, request: web.Request) -> web.Response:
+        return json_response(member_payload(user_payload(int(request.match_info["user_id"]))))
+
+    async def fallback(self, request: web.Request) -> web.Response:
+        route = f"{request.method} {request.match_info['tail']}"
+        self.unknown_routes[route] = self.unknown_routes.get(route, 0) + 1
+        return json_response({"message": "Unknown route", "code": 0}, status=404)
+
+    @web.middleware
+    async def add_latency(self, request: web.Request, handler):
+        if self.latency and request.path.startswith("/api"):
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.add_latency])
+        api = "/api/v10"
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_get(f"{api}/gateway", self.get_gateway)
+        app.router.add_get(f"{api}/gateway/bot", self.get_gateway)
+        app.router.add_get(f"{api}/users/@me", self.get_me)
+        app.router.add_get(f"{api}/oauth2/applications/@me", self.get_application)
+        app.router.add_get(f"{api}/applications/@me", self.get_application)
+        app.router.add_post(f"{api}/channels/{{channel_id}}/messages", self.create_message)
+        app.router.add_post(f"{api}/interactions/{{interaction_id}}/{{token}}/callback", self.interaction_callback)
+        app.router.add_route("*", f"{api}/webhooks/{{app_id}}/{{token}}", self.webhook_message)
+        app.router.add_route("*", f"{api}/webhooks/{{app_id}}/{{token}}/messages/{{message_id}}", self.webhook_message)
+        app.router.add_get(f"{api}/guilds/{{guild_id}}/members/{{user_id}}", self.get_member)
+        app.router.add_route("*", f"{api}/{{tail:.*}}", self.fallback)
+        return app
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.url}/api/v10"
+
+    @property
+    def gateway_url(self) -> str:
+        return self.url.replace("http://", "ws://", 1) + "/gateway"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self):
+        for session in list(self.sessions):
+            await session.ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,86 @@
+"""
+Fake Discord layer for benchmarks
+===
+Minimal stand-ins for the parts of discord.py the scheduler touches: the bot's guild and
+channel lookups and channel.send. Sends are recorded with their wall-clock time so fire skew
+can be measured, and can be given an artificial latency.
+"""
+import time
+import asyncio
+import typing
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", content: typing.Optional[str], embed):
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild: "FakeGuild", latency: float = 0.0):
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+        self.guild = guild
+        self.latency = latency
+        self.sent: typing.List[typing.Tuple[float, typing.Optional[str]]] = []
+
+    async def send(self, content: typing.Optional[str] = None, embed=None, **kwargs) -> FakeMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append((time.time(), content))
+        return FakeMessage(self, content, embed)
+
+class FakeGuild:
+    def __init__(self, guild_id: int, owner_id: int = 0):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.owner_id = owner_id
+        self.channels: typing.Dict[int, FakeChannel] = {}
+
+    def add_channel(self, channel_id: int, latency: float = 0.0) -> FakeChannel:
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = FakeChannel(channel_id, self, latency)
+        return channel
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str = "remi"):
+        self.id = user_id
+        self.name = name
+
+class FakeBot:
+    def __init__(self, latency: float = 0.05):
+        self.user = FakeUser(1)
+        self.latency = latency
+        self.shard_count = None
+        self._guilds: typing.Dict[int, FakeGuild] = {}
+        self._channels: typing.Dict[int, FakeChannel] = {}
+
+    @property
+    def guilds(self) -> typing.List[FakeGuild]:
+        return list(self._guilds.values())
+
+    def add_guild(self, guild_id: int) -> FakeGuild:
+        guild = self._guilds.get(guild_id)
+        if guild is None:
+            guild = self._guilds[guild_id] = FakeGuild(guild_id)
+        return guild
+
+    def add_channel(self, guild_id: int, channel_id: int, latency: float = 0.0) -> FakeChannel:
+        channel = self.add_guild(guild_id).add_channel(channel_id, latency)
+        self._channels[channel_id] = channel
+        return channel
+
+    def get_guild(self, guild_id: int) -> typing.Optional[FakeGuild]:
+        return self._guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int) -> typing.Optional[FakeChannel]:
+        return self._channels.get(channel_id)
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def is_owner(self, user) -> bool:
+        return False
+
+    def sent_messages(self) -> typing.List[typing.Tuple[float, typing.Optional[str]]]:
+        return [sent for channel in self._channels.values() for sent in channel.sent]
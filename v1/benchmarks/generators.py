@@ -0,0 +1,81 @@
+"""
+Synthetic reminder generators for benchmarks
+===
+Builds N guilds x M reminders in the current storage schema (integer epoch time, repeat in
+seconds), with optionally skewed guild sizes and fire-time distributions:
+- uniform: fire times spread evenly over the span
+- hourly: most reminders land on the top of an hour, the rest spread evenly
+- burst: every reminder is due in the first minute
+"""
+import random
+import typing
+
+DISTRIBUTIONS = ("uniform", "hourly", "burst")
+REPEATS = (None, None, 3600, 86400, 604800)
+
+def guild_sizes(n_guilds: int, per_guild: int, skew: float = 0.0) -> typing.List[int]:
+    """
+    Splits n_guilds * per_guild reminders across guilds. skew=0 is even; larger values follow
+    a Zipf-like curve where a few guilds hold most reminders.
+    """
+    total = n_guilds * per_guild
+    if skew <= 0:
+        return [per_guild] * n_guilds
+    weights = [1 / (rank ** skew) for rank in range(1, n_guilds + 1)]
+    scale = total / sum(weights)
+    sizes = [max(1, int(weight * scale)) for weight in weights]
+    sizes[0] += total - sum(sizes)
+    return sizes
+
+def fire_times(count: int, start_ts: int, span: int, distribution: str, rng: random.Random) -> typing.List[int]:
+    """
+    Minute-aligned fire times in [start_ts, start_ts + span)
+    """
+    minutes = max(1, span // 60)
+    if distribution == "burst":
+        return [start_ts] * count
+    if distribution == "hourly":
+        hours = [m for m in range(minutes) if (start_ts // 60 + m) % 60 == 0] or [0]
+        return [
+            start_ts + 60 * (rng.choice(hours) if rng.random() < 0.8 else rng.randrange(minutes))
+            for _ in range(count)
+        ]
+    return [start_ts + 60 * rng.randrange(minutes) for _ in range(count)]
+
+def generate(
+    n_guilds: int,
+    per_guild: int,
+    start_ts: int,
+    span: int = 3600,
+    distribution: str = "uniform",
+    skew: float = 0.0,
+    channels_per_guild: int = 3,
+    seed: int = 0,
+) -> typing.Dict[int, typing.List[typing.Dict]]:
+    """
+    Returns {guild_id: [reminder rows]}
+    """
+    rng = random.Random(seed)
+    start_ts -= start_ts % 60
+    guilds = {}
+    for index, size in enumerate(guild_sizes(n_guilds, per_guild, skew)):
+        # Snowflake-shaped IDs that spread evenly across shards ((guild_id >> 22) % shards)
+        guild_id = (10**6 + index) << 22
+        channels = [guild_id * 10 + c for c in range(channels_per_guild)]
+        rows = []
+        for fire_ts in fire_times(size, start_ts, span, distribution, rng):
+            issuer_id = 10**17 + rng.randrange(10**6)
+            rows.append({
+                "issuer_id": issuer_id,
+                "guild_id": guild_id,
+                "channel_id": rng.choice(channels),
+                "reminder_id": "%022x" % rng.getrandbits(88),
+                "time": fire_ts,
+                "title": rng.choice(("Standup", "Raid night", "Water the plants", "Deploy window")),
+                "subtitles": "When\\nWhere",
+                "message": "Now\\nUsual place",
+                "mentions": [f"<@{issuer_id}>"],
+                "repeat": rng.choice(REPEATS),
+            })
+        guilds[guild_id] = rows
+    return guilds
@@ -0,0 +1,410 @@
+"""
+End-to-end load driver for the Reminder Bot
+===
+Starts the local Discord stand-in (fake_discord.py), runs the real bot against it in a
+subprocess, and simulates many guilds issuing /remind, /reminders and /delete_reminder while
+the reminders they create come due. Reports command throughput and latency percentiles, fire
+skew (actual send time minus the time asked for) and the rate limits hit along the way.
+
+Usage (from the repository root):
+    python v1/benchmarks/load_driver.py --guilds 2000 --rate 200 --duration 60 --out load.json
+    python v1/benchmarks/load_driver.py --scheduler poll --storage sqlite --rate-limit 0
+
+    python v1/benchmarks/load_driver.py --shards 4 --processes 2
+    python v1/benchmarks/load_driver.py --replicas 2 --storage sqlite --kill-after 20 --scheduler event
+
+The bot runs with its data directory in a temporary folder; each process logs to bot-N.log there.
+The run exits non-zero if any reminder still expected never fired or fired more than once.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import itertools
+import typing
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_discord import FakeDiscord
+from run_benchmarks import BOT_PATH, percentiles
+
+COMMANDS = ("remind", "reminders", "delete_reminder")
+FIELD_ID = re.compile(r"`ID`: (\S+)")
+FIELD_TITLE = re.compile(r"`Title`: (\S+)")
+FIELD_ISSUER = re.compile(r"`Issuer`: <@(\d+)>")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def make_guilds(n_guilds: int, channels_per_guild: int) -> dict:
+    """
+    Guild IDs spread over the snowflake timestamp bits, so they split evenly across shards
+    """
+    guilds = {}
+    for index in range(n_guilds):
+        guild_id = (10**6 + index) << 22
+        guilds[guild_id] = [guild_id + c + 1 for c in range(channels_per_guild)]
+    return guilds
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in COMMANDS:
+            raise argparse.ArgumentTypeError(f"unknown command {name!r} in --mix")
+        weights[name] = float(weight or 1)
+    return weights
+
+class LoadDriver:
+    def __init__(self, fake: FakeDiscord, guilds: dict, args):
+        self.fake = fake
+        self.guilds = guilds
+        self.guild_ids = list(guilds)
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.mix = parse_mix(args.mix)
+        self.counter = itertools.count()
+        self.semaphore = asyncio.Semaphore(args.max_in_flight)
+
+        self.latencies = {name: [] for name in COMMANDS}
+        self.timeouts = {name: 0 for name in COMMANDS}
+        self.errors = {name: 0 for name in COMMANDS}
+        # title -> due epoch seconds, title -> skew seconds
+        self.expected: dict = {}
+        self.fired: dict = {}
+        self.duplicates = 0
+        # guild_id -> {reminder_id: (title, issuer_id)}, learned from /reminders replies
+        self.known: dict = {}
+        fake.on_message = self.record_fire
+
+    def record_fire(self, now: float, channel_id: int, body: dict):
+        for embed in body.get("embeds") or []:
+            title = embed.get("title")
+            due = self.expected.get(title)
+            if due is None:
+                continue
+            if title in self.fired:
+                self.duplicates += 1
+            else:
+                self.fired[title] = now - due
+
+    async def command(self, name: str):
+        guild_id = self.rng.choice(self.guild_ids)
+        channel_id = self.rng.choice(self.guilds[guild_id])
+        user_id = 10**17 + self.rng.randrange(self.args.users)
+        options, title, target = {}, None, None
+
+        if name == "remind":
+            title = f"load-{next(self.counter)}"
+            due = int(time.time() + self.rng.uniform(self.args.fire_min, self.args.fire_max))
+            if self.args.scheduler != "event":
+                due -= due % 60 # the poll scheduler fires on the minute
+            options = {
+                "time": time.strftime("%Y-%m-%d-%H:%M:%S", time.localtime(due)),
+                "title": title,
+                "subtitles": "When",
+                "messages": "Now",
+            }
+            self.expected[title] = due
+        elif name == "delete_reminder":
+            known = self.known.get(guild_id)
+            if known:
+                target = self.rng.choice(list(known))
+                user_id = known[target][1]
+            options = {"reminder_id": target or "missing"}
+
+        async with self.semaphore:
+            start = time.time()
+            try:
+                body = await self.fake.interact(guild_id, channel_id, user_id, name, options, timeout=self.args.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts[name] += 1
+                self.expected.pop(title, None)
+                return
+            except Exception:
+                self.errors[name] += 1
+                self.expected.pop(title, None)
+                return
+        self.latencies[name].append(body["_received"] - start)
+
+        data = body.get("data") or {}
+        if name == "reminders":
+            found = {}
+            for embed in data.get("embeds") or []:
+                for field in embed.get("fields") or []:
+                    value = field.get("value", "")
+                    rid, rtitle, issuer = FIELD_ID.search(value), FIELD_TITLE.search(value), FIELD_ISSUER.search(value)
+                    if rid and rtitle and issuer:
+                        found[rid.group(1)] = (rtitle.group(1), int(issuer.group(1)))
+            self.known[guild_id] = found
+        elif name == "delete_reminder" and target and data.get("content") == "Reminder deleted!":
+            deleted_title, _ = self.known[guild_id].pop(target, (None, None))
+            self.expected.pop(deleted_title, None)
+
+    async def run(self) -> dict:
+        names, weights = list(self.mix), list(self.mix.values())
+        tasks = set()
+        start = time.time()
+        issued = 0
+        while (elapsed := time.time() - start) < self.args.duration:
+            # Open loop: issue whatever the target rate says is owed so far
+            for _ in range(int(elapsed * self.args.rate) - issued):
+                task = asyncio.create_task(self.command(self.rng.choices(names, weights)[0]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                issued += 1
+            await asyncio.sleep(0.005)
+        if tasks:
+            await asyncio.wait(tasks)
+        commands_seconds = time.time() - start
+
+        # Let the outstanding reminders come due
+        deadline = max(self.expected.values(), default=time.time()) + self.args.drain
+        while any(title not in self.fired for title in self.expected) and time.time() < deadline:
+            await asyncio.sleep(0.5)
+
+        all_latencies = [l for samples in self.latencies.values() for l in samples]
+        # A reminder can fire and then be deleted; only count the ones still expected
+        skews = [self.fired[title] for title in self.expected if title in self.fired]
+        return {
+            "commands": {
+                "issued": issued,
+                "completed": len(all_latencies),
+                "timeouts": sum(self.timeouts.values()),
+                "errors": sum(self.errors.values()),
+                "seconds": commands_seconds,
+                "throughput_per_sec": len(all_latencies) / commands_seconds,
+                "latency_seconds": percentiles(all_latencies),
+                "by_command": {
+                    name: {
+                        "latency_seconds": percentiles(self.latencies[name]),
+                        "timeouts": self.timeouts[name],
+                        "errors": self.errors[name],
+                    }
+                    for name in COMMANDS
+                },
+            },
+            "fires": {
+                "expected": len(self.expected),
+                "fired": len(skews),
+                "missing": len(self.expected) - len(skews),
+                "duplicates": self.duplicates,
+                "skew_seconds": percentiles(skews),
+            },
+            "rest": {
+                "channel_sends": len(self.fake.messages),
+                "rate_limited": self.fake.rate_limited,
+                "unknown_routes": self.fake.unknown_routes,
+            },
+        }
+
+async def wait_ready(port: int, process: asyncio.subprocess.Process, timeout: float):
+    """
+    Polls the bot's /readyz until it reports ready
+    """
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.time() < deadline:
+            if process.returncode is not None:
+                raise RuntimeError(f"bot exited with {process.returncode} before becoming ready")
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/readyz") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"bot not ready after {timeout}s")
+
+async def stop_bot(process: asyncio.subprocess.Process):
+    if process.returncode is not None:
+        return
+    process.send_signal(signal.SIGINT)
+    try:
+        await asyncio.wait_for(process.wait(), 15)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+async def run(args) -> dict:
+    guilds = make_guilds(args.guilds, args.channels)
+    fake = FakeDiscord(
+        guilds,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        advertise_limits=not args.hide_limits,
+        latency=args.rest_latency,
+    )
+    await fake.start()
+
+    workdir = tempfile.mkdtemp(prefix="remi-load-")
+    env = dict(
+        os.environ,
+        TEST_ENV="TRUE",
+        TEST_TOKEN="load-test-token",
+        DISCORD_API_BASE=fake.api_base,
+        DISCORD_GATEWAY_URL=fake.gateway_url,
+        SCHEDULER_MODE=args.scheduler,
+        REMINDER_STORAGE=args.storage,
+        HEARTBEAT_UUID="",
+        PYTHONUNBUFFERED="1",
+    )
+    print(f"[LOAD] Stand-in at {fake.url}, bot workdir {workdir}")
+
+    # Each process owns a contiguous range of the shards; all of them share the data directory.
+    # With --replicas, every range runs that many times and the copies elect a holder by lease
+    processes, ports = [], []
+    shards = list(range(max(1, args.shards)))
+    per_process = -(-len(shards) // args.processes)
+    if args.replicas > 1:
+        env.update(INSTANCE_LEASES="TRUE", LEASE_TTL_SECONDS=str(args.lease_ttl))
+    try:
+        for index in range(args.processes * args.replicas):
+            owned = shards[index % args.processes * per_process:(index % args.processes + 1) * per_process]
+            if not owned:
+                continue
+            port = free_port()
+            process_env = dict(env, HEALTH_PORT=str(port))
+            if args.shards > 1:
+                process_env.update(SHARD_COUNT=str(args.shards), SHARD_IDS=",".join(map(str, owned)))
+            with open(os.path.join(workdir, f"bot-{index}.log"), "w") as log:
+                processes.append(await asyncio.create_subprocess_exec(
+                    sys.executable, BOT_PATH, cwd=workdir, env=process_env, stdout=log, stderr=asyncio.subprocess.STDOUT,
+                ))
+            ports.append(port)
+
+        ready_start = time.time()
+        await asyncio.gather(*(wait_ready(port, process, args.ready_timeout) for port, process in zip(ports, processes)))
+        ready_seconds = time.time() - ready_start
+        print(f"[LOAD] {len(processes)} bot process(es) ready with {len(guilds)} guilds in {ready_seconds:.1f}s")
+        if args.kill_after:
+            asyncio.create_task(kill_after(processes[0], args.kill_after))
+        results = await LoadDriver(fake, guilds, args).run()
+        results["ready_seconds"] = ready_seconds
+        results["shards"] = await shard_metrics(ports)
+        results["leases"] = await lease_metrics(ports)
+        await save_metrics(ports, workdir)
+    finally:
+        for process in processes:
+            await stop_bot(process)
+        await fake.stop()
+    return results
+
+async def kill_after(process: asyncio.subprocess.Process, seconds: float):
+    """
+    Kills a bot without letting it release its leases, to exercise failover
+    """
+    await asyncio.sleep(seconds)
+    print(f"[LOAD] Killing bot process {process.pid}")
+    process.kill()
+
+async def health_reports(ports: typing.List[int]) -> typing.List[dict]:
+    """
+    /healthz bodies of the bots still running
+    """
+    reports = []
+    async with aiohttp.ClientSession() as session:
+        for port in ports:
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/healthz") as response:
+                    reports.append(await response.json())
+            except aiohttp.ClientError:
+                pass
+    return reports
+
+async def shard_metrics(ports: typing.List[int]) -> dict:
+    """
+    Per-shard tick metrics from each bot's health endpoint (from the lease holder, if replicated)
+    """
+    shards = {}
+    for report in await health_reports(ports):
+        owned = (report.get("leases") or {}).get("owned")
+        for shard_id, status in report.get("shards", {}).items():
+            if owned is None or int(shard_id) in owned:
+                shards[shard_id] = status
+    return shards
+
+async def save_metrics(ports: typing.List[int], workdir: str):
+    """
+    Saves each bot's /metrics scrape next to its log, as metrics-N.prom
+    """
+    async with aiohttp.ClientSession() as session:
+        for index, port in enumerate(ports):
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    text = await response.text()
+            except aiohttp.ClientError:
+                continue
+            with open(os.path.join(workdir, f"metrics-{index}.prom"), "w") as f:
+                f.write(text)
+    print(f"[LOAD] Saved Prometheus metrics to {workdir}")
+
+async def lease_metrics(ports: typing.List[int]) -> list:
+    return [report["leases"] for report in await health_reports(ports) if report.get("leases")]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--guilds", type=int, default=2000)
+    arg_parser.add_argument("--channels", type=int, default=2, help="Channels per guild")
+    arg_parser.add_argument("--users", type=int, default=5000, help="Distinct users issuing commands")
+    arg_parser.add_argument("--rate", type=float, default=100, help="Commands per second")
+    arg_parser.add_argument("--duration", type=float, default=30, help="Seconds to issue commands for")
+    arg_parser.add_argument("--mix", default="remind=6,reminders=3,delete_reminder=1", help="Command weights")
+    arg_parser.add_argument("--fire-min", type=float, default=5, help="Earliest reminder due time, seconds ahead")
+    arg_parser.add_argument("--fire-max", type=float, default=60, help="Latest reminder due time, seconds ahead")
+    arg_parser.add_argument("--drain", type=float, default=30, help="Seconds to wait for fires after the last is due")
+    arg_parser.add_argument("--max-in-flight", type=int, default=500)
+    arg_parser.add_argument("--timeout", type=float, default=15, help="Seconds to wait for a command response")
+    arg_parser.add_argument("--shards", type=int, default=1, help="Shard count (more than 1 runs AutoShardedBot)")
+    arg_parser.add_argument("--processes", type=int, default=1, help="Bot processes splitting the shards between them")
+    arg_parser.add_argument("--replicas", type=int, default=1, help="Copies of each process, sharing shards by lease")
+    arg_parser.add_argument("--lease-ttl", type=float, default=6.0, help="Lease TTL in seconds when replicated")
+    arg_parser.add_argument("--kill-after", type=float, default=0, help="SIGKILL the first bot process after this many seconds")
+    arg_parser.add_argument("--scheduler", choices=("event", "poll"), default="event")
+    arg_parser.add_argument("--storage", choices=("json", "sqlite"), default="json")
+    arg_parser.add_argument("--rate-limit", type=int, default=5, help="Sends per channel per window (0 = unlimited)")
+    arg_parser.add_argument("--rate-window", type=float, default=5.0)
+    arg_parser.add_argument("--hide-limits", action="store_true", help="Omit rate limit headers so sends hit 429s")
+    arg_parser.add_argument("--rest-latency", type=float, default=0.0, help="Seconds added to every REST call")
+    arg_parser.add_argument("--ready-timeout", type=float, default=120)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--out", help="Write results as JSON to this file")
+    args = arg_parser.parse_args()
+    if args.replicas > 1 and args.storage != "sqlite":
+        arg_parser.error("--replicas needs --storage sqlite; replicas would overwrite each other's JSON files")
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "time": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=4))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=4)
+
+    fires = results["fires"]
+    print(f"[LOAD] Fired {fires['fired']}/{fires['expected']} reminders: {fires['missing']} missing, {fires['duplicates']} duplicates")
+    if fires["missing"] or fires["duplicates"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Benchmark suite for the Reminder Bot
+===
+Measures the scheduler tick, the storage helpers, the parser utilities and the memory held per
+reminder against synthetic data and a fake Discord layer, and saves the results as JSON so runs
+can be compared.
+
+Usage (from the repository root):
+    python v1/benchmarks/run_benchmarks.py --guilds 100 --reminders 50 --out bench.json
+    python v1/benchmarks/run_benchmarks.py --storage sqlite --distribution hourly --compare bench.json
+
+The bot module is imported with its storage pointed at a temporary directory; nothing touches
+real Discord or the real data directory.
+"""
+import io
+import gc
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import argparse
+import platform
+import contextlib
+import statistics
+import tracemalloc
+import importlib.util
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+V1_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, V1_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import FakeBot
+from ReminderLib.Scheduler import ShardedDueQueue
+from generators import generate, DISTRIBUTIONS
+from ReminderLib.Storage import BatchResult
+from ReminderLib.Record import ReminderRecord
+from bench_parser import VALID, INVALID
+
+BOT_PATH = os.path.join(V1_DIR, "Remi-1.2.0.py")
+
+def load_bot(workdir: str, env: dict):
+    """
+    Imports the bot module with its relative data paths inside workdir
+    """
+    os.environ.update(env)
+    os.chdir(workdir)
+    spec = importlib.util.spec_from_file_location("remi", BOT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+def throughput(func, inputs: list, min_seconds: float = 0.2) -> float:
+    """
+    Calls func over inputs until min_seconds elapse. Returns calls per second
+    """
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        for value in inputs:
+            func(value)
+        calls += len(inputs)
+    return calls / (time.perf_counter() - start)
+
+async def bench_ticks(remi, bot: FakeBot, data: dict, start_ts: int, ticks: int) -> dict:
+    """
+    Runs one scheduler tick per simulated minute and measures latency, fires and writes
+    """
+    for guild_id, rows in data.items():
+        remi.storage.replace(guild_id, rows)
+        for row in rows:
+            bot.add_channel(guild_id, row["channel_id"])
+    remi.storage.flush()
+
+    remi.due_queue = ShardedDueQueue(remi.SHARD_IDS, remi.SHARD_COUNT)
+    build_start = time.perf_counter()
+    for guild_id, reminder in remi.storage.pending(data):
+        remi.due_queue.schedule(guild_id, reminder)
+    index_build = time.perf_counter() - build_start
+
+    latencies, fired, rows_written, bytes_written = [], [], 0, 0
+    for tick in range(ticks):
+        now_ts = start_ts + tick * 60 + 59
+        before = len(bot.sent_messages())
+        tick_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            written = BatchResult()
+            for shard_id in remi.due_queue.shard_ids:
+                written += await remi.fire_due_reminders(now_ts, shard_id)
+        latencies.append(time.perf_counter() - tick_start)
+        fired.append(len(bot.sent_messages()) - before)
+        rows_written += written.rows_changed
+        bytes_written += written.bytes_written
+
+    return {
+        "index_build_seconds": index_build,
+        "tick_seconds": percentiles(latencies),
+        "fired_per_tick": percentiles(fired),
+        "fired_total": sum(fired),
+        "rows_written": rows_written,
+        "bytes_written": bytes_written,
+        "bytes_per_fire": bytes_written / sum(fired) if sum(fired) else 0,
+        "shards": {str(shard_id): stats.as_dict() for shard_id, stats in remi.tick_stats.items()},
+    }
+
+async def bench_catch_up(remi, bot: FakeBot, data: dict, now_ts: int) -> dict:
+    """
+    Reruns the stored reminders after an outage ending at now_ts: one tick finds them all late,
+    then times how fast the catch-up queue drains them
+    """
+    remi.due_queue = ShardedDueQueue(remi.SHARD_IDS, remi.SHARD_COUNT)
+    for guild_id, reminder in remi.storage.pending(data):
+        remi.due_queue.schedule(guild_id, reminder)
+    late = remi.due_queue.overdue(now_ts - remi.LATE_AFTER_SECONDS)
+
+    before = len(bot.sent_messages())
+    tick_start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for shard_id in remi.due_queue.shard_ids:
+            await remi.fire_due_reminders(now_ts, shard_id)
+        tick_seconds = time.perf_counter() - tick_start
+        sent_in_tick = len(bot.sent_messages()) - before
+        queued = len(remi.catch_up)
+
+        drain_start = time.perf_counter()
+        while len(remi.catch_up) or remi.dispatcher.depth or remi.dispatcher.in_flight:
+            await asyncio.sleep(0.01)
+        drain_seconds = time.perf_counter() - drain_start
+
+    delivered = len(bot.sent_messages()) - before - sent_in_tick
+    return {
+        "late_reminders": late,
+        "tick_seconds": tick_seconds,
+        "sent_in_tick": sent_in_tick,
+        "queued": queued,
+        "delivered": delivered,
+        "drain_seconds": drain_seconds,
+        "drain_per_sec": delivered / drain_seconds if drain_seconds else 0,
+    }
+
+async def bench_storage(remi, data: dict, samples: int) -> dict:
+    """
+    Times load_reminders (cached) and single-row upserts committed one write at a time
+    """
+    rng = random.Random(1)
+    guild_ids = list(data)
+    load_times, upsert_times, upsert_bytes = [], [], []
+    for _ in range(samples):
+        guild_id = rng.choice(guild_ids)
+        start = time.perf_counter()
+        reminders = await remi.load_reminders(guild_id)
+        load_times.append(time.perf_counter() - start)
+
+        if not reminders:
+            continue
+        row = dict(rng.choice(reminders))
+        row["time"] += 60
+        start = time.perf_counter()
+        batch = remi.storage.batch(guild_id)
+        batch.upsert(row)
+        result = batch.commit()
+        upsert_times.append(time.perf_counter() - start)
+        upsert_bytes.append(result.bytes_written)
+
+    return {
+        "load_seconds": percentiles(load_times),
+        "upsert_seconds": percentiles(upsert_times),
+        "upsert_bytes": percentiles(upsert_bytes),
+    }
+
+def bench_memory(data: dict) -> dict:
+    """
+    Bytes per reminder held in memory (tracemalloc): rows as parsed from JSON vs ReminderRecords
+    """
+    encoded = [json.dumps(rows) for rows in data.values()]
+    count = sum(len(rows) for rows in data.values()) or 1
+
+    def traced(build) -> float:
+        gc.collect()
+        tracemalloc.start()
+        held = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        return size / count
+
+    dict_bytes = traced(lambda: [json.loads(text) for text in encoded])
+    record_bytes = traced(lambda: [[ReminderRecord(row) for row in json.loads(text)] for text in encoded])
+    return {
+        "dict_bytes_per_reminder": dict_bytes,
+        "record_bytes_per_reminder": record_bytes,
+        "saved_percent": (1 - record_bytes / dict_bytes) * 100 if dict_bytes else 0,
+    }
+
+def run_sync(coro):
+    """
+    Runs a coroutine that never suspends, without an event loop round-trip
+    """
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("coroutine suspended")
+
+async def bench_parser(remi) -> dict:
+    def parse(time_str):
+        try:
+            remi.parse_flexible_time(time_str)
+        except ValueError:
+            pass
+
+    durations = ["1w 2d 3h 4m 5s", "15m", "1d", "2h 30m"]
+    seconds = [59, 3600, 93784, 31556952 + 86400]
+    return {
+        "parse_flexible_time_valid_per_sec": throughput(parse, VALID),
+        "parse_flexible_time_invalid_per_sec": throughput(parse, INVALID),
+        "time2seconds_per_sec": throughput(lambda d: run_sync(remi.time2seconds(None, d)), durations),
+        "seconds2time_per_sec": throughput(lambda s: run_sync(remi.seconds2time(s)), seconds),
+        "uuid_base62_per_sec": throughput(lambda _: remi.uuid_base62(), [None] * 16),
+    }
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path, "r") as f:
+        baseline = flatten(json.load(f)["results"])
+    print(f"[BNCH] Compared with {baseline_path}")
+    for name, value in flatten(current).items():
+        if name in baseline and baseline[name]:
+            change = (value - baseline[name]) / baseline[name] * 100
+            print(f"\t{name:<55}{baseline[name]:>14.6g} -> {value:<14.6g}{change:+8.1f}%")
+
+async def run(args) -> dict:
+    start_ts = int(time.time()) // 3600 * 3600 + 3600
+    data = generate(
+        args.guilds, args.reminders, start_ts,
+        span=args.ticks * 60, distribution=args.distribution, skew=args.skew, seed=args.seed,
+    )
+
+    # Before the bot loads anything, so no records are already sharing the interned values
+    memory = bench_memory(data)
+
+    workdir = tempfile.mkdtemp(prefix="remi-bench-")
+    remi = load_bot(workdir, {
+        "REMINDER_STORAGE": args.storage,
+        "REMINDER_SQLITE_PATH": os.path.join(workdir, "data", "reminders.db"),
+        "STORE_JOURNAL": "TRUE" if args.journal else "FALSE",
+        "STORE_FLUSH_SECONDS": "0",
+        "SHARD_COUNT": str(args.shards) if args.shards > 1 else "0",
+        "LOG_CONSOLE": "FALSE",
+        "CATCH_UP_RATE": str(args.catch_up_rate),
+        "CATCH_UP_BURST": str(args.catch_up_rate),
+    })
+    bot = FakeBot()
+    remi.bot = bot
+
+    results = {
+        "ticks": await bench_ticks(remi, bot, data, start_ts, args.ticks),
+        "catch_up": await bench_catch_up(remi, bot, data, start_ts + (args.ticks + args.outage) * 60),
+        "storage": await bench_storage(remi, data, args.samples),
+        "parser": await bench_parser(remi),
+        "memory": memory,
+    }
+    remi.dispatcher.stop()
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--guilds", type=int, default=100)
+    arg_parser.add_argument("--reminders", type=int, default=50, help="Reminders per guild (on average when skewed)")
+    arg_parser.add_argument("--ticks", type=int, default=60, help="Simulated minutes")
+    arg_parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    arg_parser.add_argument("--skew", type=float, default=0.0, help="Zipf exponent for guild sizes (0 = even)")
+    arg_parser.add_argument("--storage", choices=("json", "sqlite"), default="json")
+    arg_parser.add_argument("--journal", action="store_true", help="Use the journaled JSON store")
+    arg_parser.add_argument("--shards", type=int, default=1, help="Shards to split the guilds across")
+    arg_parser.add_argument("--outage", type=int, default=120, help="Minutes of downtime simulated after the ticks")
+    arg_parser.add_argument("--catch-up-rate", type=float, default=500, help="Catch-up deliveries per second")
+    arg_parser.add_argument("--samples", type=int, default=500, help="Storage operations to time")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--out", help="Write results as JSON to this file")
+    arg_parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    args = arg_parser.parse_args()
+
+    cwd = os.getcwd()
+    results = asyncio.run(run(args))
+    os.chdir(cwd)
+
+    report = {
+        "meta": {
+            "time": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=4))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=4)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Shared setup for the v1 tests: ReminderLib and the benchmark fakes on sys.path, the bot module
+loaded against a fake Discord layer, and storage backends in a temporary directory.
+"""
+import os
+import sys
+import asyncio
+
+import pytest
+
+V1_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BENCH_DIR = os.path.join(V1_DIR, "benchmarks")
+sys.path.insert(0, V1_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from ReminderLib.Journal import JournaledDB
+from ReminderLib.Storage import JSONStorage, SQLiteStorage
+
+GUILD_ID, CHANNEL_ID = 7, 70
+
+def make_reminder(reminder_id: str, fire_ts: int, **fields) -> dict:
+    """
+    A reminder row as /remind stores it, in GUILD_ID and CHANNEL_ID unless fields say otherwise
+    """
+    return {
+        "issuer_id": 1, "guild_id": GUILD_ID, "channel_id": CHANNEL_ID, "reminder_id": reminder_id,
+        "time": fire_ts, "title": "t", "subtitles": "s", "message": "m", "mentions": [],
+        **fields,
+    }
+
+async def wait_for(condition, timeout: float = 5.0):
+    """
+    Polls condition() on the running loop until it holds
+    """
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError("condition not met")
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "reminders.db"))
+    yield storage
+    storage.close()
+
+@pytest.fixture
+def json_storage(tmp_path):
+    """
+    The JSON backend over journaled guild files, which need no PyStoreJSONDB
+    """
+    return JSONStorage(lambda guild_id: JournaledDB(str(tmp_path / f"guild_{guild_id}"), fsync=False))
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request):
+    return request.getfixturevalue(f"{request.param}_storage")
+
+@pytest.fixture
+def load_remi(tmp_path, monkeypatch):
+    """
+    Imports the bot with its data in tmp_path and a FakeBot holding GUILD_ID/CHANNEL_ID.
+    Settings are passed as environment variables, e.g. load_remi(SCHEDULER_MODE="event")
+    """
+    from run_benchmarks import load_bot
+    from fakes import FakeBot
+
+    loaded = []
+
+    def load(**env):
+        monkeypatch.chdir(tmp_path)
+        settings = {
+            "REMINDER_STORAGE": "sqlite",
+            "REMINDER_SQLITE_PATH": str(tmp_path / "reminders.db"),
+            "INSTANCE_LEASES": "FALSE",
+            "SHARD_COUNT": "0",
+            "LOG_FILE": "",
+            "LOG_CONSOLE": "FALSE",
+            "CATCH_UP_RATE": "100",
+            **env,
+        }
+        for name, value in settings.items():
+            monkeypatch.setenv(name, value)
+        module = load_bot(str(tmp_path), {})
+        module.bot = FakeBot()
+        module.bot.add_guild(GUILD_ID)
+        loaded.append(module)
+        return module
+
+    yield load
+    for module in loaded:
+        module.catch_up.stop()
+        module.dispatcher.stop()
+        module.log_listener.stop()
+
+@pytest.fixture
+def remi(load_remi):
+    return load_remi()
@@ -0,0 +1,118 @@
+import time
+import asyncio
+
+from datetime import datetime, timedelta
+
+from conftest import GUILD_ID, CHANNEL_ID, make_reminder, wait_for
+from ReminderLib.CatchUp import CatchUpQueue
+
+async def drain(queue: CatchUpQueue, key):
+    await wait_for(lambda: not len(queue) and key not in queue)
+
+def test_failed_delivery_is_not_counted_and_reported():
+    done = []
+
+    async def deliver(guild_id, reminder, missed):
+        if reminder["reminder_id"] == "boom":
+            raise RuntimeError("send failed")
+        return reminder["reminder_id"] == "ok"
+
+    async def run():
+        queue = CatchUpQueue(deliver, rate=100, burst=10, on_done=lambda *args: done.append(args))
+        for reminder_id in ("ok", "fail", "boom"):
+            queue.add(GUILD_ID, {"reminder_id": reminder_id}, 1)
+        await drain(queue, (GUILD_ID, "boom"))
+        queue.stop()
+        return queue
+    queue = asyncio.run(run())
+
+    assert (queue.delivered, queue.failed) == (1, 2)
+    assert [(reminder["reminder_id"], sent) for _, reminder, sent in done] == [("ok", True), ("fail", False), ("boom", False)]
+
+def test_every_policy_settles_once_after_its_last_delivery():
+    done, sent = [], []
+
+    async def deliver(guild_id, reminder, missed):
+        sent.append(missed)
+        return True
+
+    async def run():
+        queue = CatchUpQueue(deliver, rate=100, burst=10, on_done=lambda *args: done.append(args))
+        queue.add(GUILD_ID, {"reminder_id": "r", "catch_up": "all"}, 3)
+        await drain(queue, (GUILD_ID, "r"))
+        queue.stop()
+    asyncio.run(run())
+
+    assert sent == [1, 1, 1]
+    assert len(done) == 1
+
+def test_catch_up_send_failure_keeps_the_reminder(remi):
+    now = time.time()
+    remi.storage.upsert(GUILD_ID, make_reminder("late", int(now) - 3600))
+
+    async def run():
+        for guild_id, reminder in remi.storage.pending([GUILD_ID]):
+            remi.due_queue.schedule(guild_id, reminder)
+        # No channel to send to yet, so the catch-up send fails
+        await remi.fire_due_reminders(now)
+        await drain(remi.catch_up, (GUILD_ID, "late"))
+
+        assert remi.catch_up.delivered == 0
+        assert remi.storage.get(GUILD_ID, "late") is not None
+        assert remi.send_attempts[(GUILD_ID, "late")] == 1
+
+        # The retry goes out through the scheduler and only then removes the one-shot reminder
+        remi.bot.add_channel(GUILD_ID, CHANNEL_ID)
+        await remi.fire_due_reminders(now + remi.SEND_RETRY_SECONDS + 1)
+    asyncio.run(run())
+
+    assert len(remi.bot.sent_messages()) == 1
+    assert remi.storage.get(GUILD_ID, "late") is None
+
+def test_catch_up_deletes_the_reminder_only_once_sent(remi):
+    now = time.time()
+    remi.bot.add_channel(GUILD_ID, CHANNEL_ID)
+    remi.storage.upsert(GUILD_ID, make_reminder("late", int(now) - 3600))
+
+    async def run():
+        for guild_id, reminder in remi.storage.pending([GUILD_ID]):
+            remi.due_queue.schedule(guild_id, reminder)
+        await remi.fire_due_reminders(now)
+        assert remi.storage.get(GUILD_ID, "late") is not None
+        await drain(remi.catch_up, (GUILD_ID, "late"))
+    asyncio.run(run())
+
+    assert remi.catch_up.delivered == 1
+    assert len(remi.bot.sent_messages()) == 1
+    assert remi.storage.get(GUILD_ID, "late") is None
+
+def test_poll_tick_does_not_treat_this_minutes_reminder_as_late(load_remi):
+    remi = load_remi(SCHEDULER_MODE="poll")
+    remi.bot.add_channel(GUILD_ID, CHANNEL_ID)
+    # /remind with no time is due at the start of the current minute; the tick of that minute
+    # may already have run, so it fires on the next one
+    minute = datetime(2030, 1, 1, 12, 0)
+    remi.storage.upsert(GUILD_ID, make_reminder("now", int(minute.timestamp())))
+
+    async def run():
+        for guild_id, reminder in remi.storage.pending([GUILD_ID]):
+            remi.due_queue.schedule(guild_id, reminder)
+        await remi.fire_due_reminders(remi.poll_tick_ts(minute + timedelta(minutes=1, seconds=2)))
+    asyncio.run(run())
+
+    assert remi.catch_up.queued == 0
+    assert len(remi.bot.sent_messages()) == 1
+    assert remi.storage.get(GUILD_ID, "now") is None
+
+def test_poll_tick_after_a_missed_minute_is_late(load_remi):
+    remi = load_remi(SCHEDULER_MODE="poll")
+    minute = datetime(2030, 1, 1, 12, 0)
+    remi.storage.upsert(GUILD_ID, make_reminder("missed", int(minute.timestamp())))
+
+    async def run():
+        for guild_id, reminder in remi.storage.pending([GUILD_ID]):
+            remi.due_queue.schedule(guild_id, reminder)
+        await remi.fire_due_reminders(remi.poll_tick_ts(minute + timedelta(minutes=2)))
+    asyncio.run(run())
+
+    assert remi.catch_up.queued == 1
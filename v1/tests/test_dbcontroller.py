@@ -0,0 +1,46 @@
+import json
+import asyncio
+
+from ReminderLib import DBController
+from ReminderLib.DBController import load_reminders, save_reminders
+
+def test_save_is_not_affected_by_later_changes_to_the_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reminders = [{"reminder_id": "a", "mentions": ["<@1>"]}]
+
+    async def run():
+        saving = asyncio.create_task(save_reminders(1, reminders))
+        await asyncio.sleep(0)
+        reminders[0]["mentions"].append("<@2>") # while the write is queued
+        assert await load_reminders(1) == [{"reminder_id": "a", "mentions": ["<@1>"]}]
+        await saving
+    asyncio.run(run())
+
+    with open(tmp_path / "data" / "1" / "reminders.json") as f:
+        assert json.load(f) == [{"reminder_id": "a", "mentions": ["<@1>"]}]
+
+def test_replace_waits_for_an_open_read(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    replaced_while_locked = []
+    replace = DBController.os.replace
+    def checked_replace(src, dst):
+        replaced_while_locked.append(DBController._file_lock(1).locked())
+        replace(src, dst)
+    monkeypatch.setattr(DBController.os, "replace", checked_replace)
+
+    async def run():
+        await save_reminders(1, [{"reminder_id": "a"}])
+        with DBController._file_lock(1): # a read holding the file open
+            saving = asyncio.create_task(save_reminders(1, [{"reminder_id": "b"}]))
+            await asyncio.sleep(0.1)
+            assert not saving.done()
+        await saving
+        assert await load_reminders(1) == [{"reminder_id": "b"}]
+    asyncio.run(run())
+
+    assert replaced_while_locked == [True, True]
+
+def test_star_import_exposes_only_the_api():
+    namespace = {}
+    exec("from ReminderLib.DBController import *", namespace)
+    assert sorted(name for name in namespace if not name.startswith("__")) == ["load_reminders", "save_reminders"]
@@ -0,0 +1,56 @@
+import time
+import random
+import asyncio
+
+from conftest import GUILD_ID, CHANNEL_ID, make_reminder, wait_for
+from ReminderLib.Dispatcher import Dispatcher
+
+def test_each_lane_keeps_its_order_while_lanes_run_concurrently():
+    sent = {lane: [] for lane in range(4)}
+    running = []
+    overlap = []
+
+    async def send(lane, n):
+        running.append(lane)
+        overlap.append(len(running))
+        await asyncio.sleep(random.uniform(0, 0.005))
+        running.remove(lane)
+        sent[lane].append(n)
+        return True
+
+    async def producer(dispatcher, lane):
+        futures = []
+        for n in range(20):
+            futures.append(await dispatcher.submit(lane, send, lane, n))
+            await asyncio.sleep(0)
+        return await asyncio.gather(*futures)
+
+    async def run():
+        dispatcher = Dispatcher(workers=4)
+        results = await asyncio.gather(*(producer(dispatcher, lane) for lane in sent))
+        dispatcher.stop()
+        return results
+    results = asyncio.run(run())
+
+    assert all(result == [True] * 20 for result in results)
+    assert all(numbers == list(range(20)) for numbers in sent.values())
+    assert max(overlap) > 1
+
+def test_storage_is_updated_only_after_the_send_succeeds(remi):
+    channel = remi.bot.add_channel(GUILD_ID, CHANNEL_ID, latency=0.2)
+    now = time.time()
+    for n in range(3):
+        remi.storage.upsert(GUILD_ID, make_reminder(f"r{n}", int(now) - 10 + n, mentions=[f"<@{n}>"]))
+
+    async def run():
+        for guild_id, reminder in remi.storage.pending([GUILD_ID]):
+            remi.due_queue.schedule(guild_id, reminder)
+        tick = asyncio.create_task(remi.fire_due_reminders(now))
+        await wait_for(lambda: remi.dispatcher.in_flight)
+        # The first send is on the wire: nothing has been removed yet
+        assert all(remi.storage.get(GUILD_ID, f"r{n}") is not None for n in range(3))
+        await tick
+    asyncio.run(run())
+
+    assert [content for _, content in channel.sent] == ["<@0>", "<@1>", "<@2>"]
+    assert remi.storage.get_all(GUILD_ID) == []
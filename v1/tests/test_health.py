@@ -0,0 +1,52 @@
+import socket
+import asyncio
+
+import aiohttp
+
+from ReminderLib.Health import HealthServer
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_endpoints_report_liveness_readiness_and_metrics():
+    status = {"ready": False, "loop_lag": 0.1}
+    server = HealthServer(lambda: dict(status), port=free_port(), max_loop_lag=1.0, metrics=lambda: "remi_up 1\n")
+    base = f"http://127.0.0.1:{server.port}"
+
+    async def run():
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                live = await session.get(base + "/healthz")
+                body = await live.json()
+                assert (live.status, body["ok"], body["ready"]) == (200, True, False)
+                assert (await session.get(base + "/readyz")).status == 503
+
+                status.update(ready=True, loop_lag=2.0)
+                ready = await session.get(base + "/readyz")
+                assert (ready.status, (await ready.json())["ok"]) == (200, True)
+                assert (await session.get(base + "/healthz")).status == 503
+
+                metrics = await session.get(base + "/metrics")
+                assert metrics.status == 200
+                assert metrics.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert await metrics.text() == "remi_up 1\n"
+        finally:
+            await server.stop()
+        assert not server.running
+    asyncio.run(run())
+
+def test_metrics_endpoint_is_absent_without_a_registry():
+    server = HealthServer(lambda: {"ready": True, "loop_lag": 0.0}, port=free_port())
+
+    async def run():
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                response = await session.get(f"http://127.0.0.1:{server.port}/metrics")
+                assert response.status == 404
+        finally:
+            await server.stop()
+    asyncio.run(run())
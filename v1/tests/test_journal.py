@@ -0,0 +1,92 @@
+import time
+import asyncio
+import threading
+
+from conftest import wait_for
+from ReminderLib.Journal import JournaledDB
+from ReminderLib.StoreCache import GuildStoreCache
+
+def upsert(reminder_id):
+    return {"op": "upsert", "row": {"reminder_id": reminder_id}}
+
+def ids(db):
+    return sorted(row["reminder_id"] for row in db.get_all())
+
+def test_torn_tail_is_cut_before_the_next_append(tmp_path):
+    base = str(tmp_path / "guild")
+    db = JournaledDB(base, fsync=False)
+    db.append([upsert("a")])
+    with open(db.journal_path, "ab") as f:
+        f.write(b'{"seq":2,"op":"upsert","row":{"remin') # crash mid-append
+
+    db = JournaledDB(base, fsync=False)
+    assert ids(db) == ["a"]
+    db.append([upsert("b")])
+    db.append([upsert("c")])
+
+    assert ids(JournaledDB(base, fsync=False)) == ["a", "b", "c"]
+
+def test_compaction_keeps_records_appended_after_it_started(tmp_path):
+    base = str(tmp_path / "guild")
+    db = JournaledDB(base, fsync=False)
+    db.append([upsert(str(i)) for i in range(3)])
+    rows = [{"reminder_id": str(i)} for i in range(3)]
+
+    async def run():
+        compaction = asyncio.create_task(db.compact(rows))
+        await asyncio.sleep(0)
+        db.append([upsert("late")])
+        await compaction
+    asyncio.run(run())
+
+    assert db.journal_records == 1
+    assert ids(JournaledDB(base, fsync=False)) == ["0", "1", "2", "late"]
+
+def test_store_evicted_and_reopened_during_compaction_keeps_its_appends(tmp_path, monkeypatch):
+    cache = GuildStoreCache(lambda guild_id: JournaledDB(str(tmp_path / f"guild_{guild_id}"), fsync=False), max_guilds=1)
+    store = cache.get(1)
+    for i in range(70):
+        store.upsert({"reminder_id": str(i)})
+    store.flush()
+    assert store.db.needs_compaction()
+
+    # Hold the compaction between reading the journal and swapping in the trimmed copy
+    in_window = threading.Event()
+    calls = []
+    newer_lines = JournaledDB._newer_lines
+    def slow_newer_lines(f, seq):
+        lines = newer_lines(f, seq)
+        calls.append(seq)
+        if len(calls) == 2:
+            in_window.set()
+            time.sleep(0.3)
+        return lines
+    monkeypatch.setattr(JournaledDB, "_newer_lines", staticmethod(slow_newer_lines))
+
+    async def run():
+        compaction = asyncio.create_task(cache.compact())
+        await wait_for(in_window.is_set)
+        cache.get(2) # evicts guild 1 mid-compaction
+        assert 1 not in cache
+        reopened = cache.get(1)
+        reopened.upsert({"reminder_id": "after"})
+        reopened.flush()
+        await compaction
+    asyncio.run(run())
+
+    rows = JournaledDB(str(tmp_path / "guild_1"), fsync=False).get_all()
+    assert sorted(row["reminder_id"] for row in rows) == sorted([str(i) for i in range(70)] + ["after"])
+
+def test_older_handle_does_not_compact_over_a_newer_snapshot(tmp_path):
+    base = str(tmp_path / "guild")
+    old = JournaledDB(base, fsync=False)
+    old.append([upsert("a")])
+    new = JournaledDB(base, fsync=False)
+    new.append([upsert("b")])
+
+    async def run():
+        await new.compact([{"reminder_id": "a"}, {"reminder_id": "b"}])
+        await old.compact([{"reminder_id": "a"}])
+    asyncio.run(run())
+
+    assert ids(JournaledDB(base, fsync=False)) == ["a", "b"]
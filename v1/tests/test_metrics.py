@@ -0,0 +1,46 @@
+import pytest
+
+from ReminderLib.Metrics import Registry
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    sends = registry.counter("remi_sends_total", "Reminder sends", ["shard"])
+    registry.gauge("remi_queue_depth", "Jobs waiting", function=lambda: 3)
+    ticks = registry.histogram("remi_tick_seconds", "Tick duration", buckets=(0.1, 1.0))
+    registry.gauge("remi_lanes", "Lanes per shard", ["shard"], function=lambda: {(0,): 2, (1,): None})
+
+    sends.inc(shard=0)
+    sends.inc(2, shard=0)
+    sends.inc(0.5, shard='a"b')
+    for value in (0.05, 0.1, 0.5, 7):
+        ticks.observe(value)
+
+    assert registry.render() == "\n".join([
+        "# HELP remi_sends_total Reminder sends",
+        "# TYPE remi_sends_total counter",
+        'remi_sends_total{shard="0"} 3',
+        'remi_sends_total{shard="a\\"b"} 0.5',
+        "# HELP remi_queue_depth Jobs waiting",
+        "# TYPE remi_queue_depth gauge",
+        "remi_queue_depth 3",
+        "# HELP remi_tick_seconds Tick duration",
+        "# TYPE remi_tick_seconds histogram",
+        'remi_tick_seconds_bucket{le="0.1"} 2',
+        'remi_tick_seconds_bucket{le="1"} 3',
+        'remi_tick_seconds_bucket{le="+Inf"} 4',
+        "remi_tick_seconds_sum 7.65",
+        "remi_tick_seconds_count 4",
+        "# HELP remi_lanes Lanes per shard",
+        "# TYPE remi_lanes gauge",
+        'remi_lanes{shard="0"} 2',
+    ]) + "\n"
+    assert sends.value(shard=0) == 3
+    assert ticks.count() == 4
+
+def test_labels_and_names_are_checked():
+    registry = Registry()
+    sends = registry.counter("remi_sends_total", "Reminder sends", ["shard"])
+    with pytest.raises(ValueError):
+        sends.inc()
+    with pytest.raises(ValueError):
+        registry.counter("remi_sends_total", "Again")
@@ -0,0 +1,30 @@
+import pytest
+
+from ReminderLib.Record import ReminderRecord
+
+ROW = {
+    "issuer_id": 1, "guild_id": 2, "channel_id": 3, "reminder_id": "abc", "time": 1700000000,
+    "title": "Title", "subtitles": "When", "message": "Now", "mentions": ["<@4>", "<@&5>"],
+    "repeat": 3600, "catch_up": "once",
+}
+
+@pytest.mark.parametrize("row", [
+    ROW,
+    {key: value for key, value in ROW.items() if key not in ("repeat", "catch_up")},
+    # Legacy and unexpected values are kept as they are
+    {**ROW, "time": "2024-01-01-12:00:00", "mentions": "@everyone", "guild_id": "2"},
+    {**ROW, "message": "split\x00here", "mentions": []},
+    {**ROW, "extra": {"nested": [1, 2]}},
+])
+def test_round_trip(row):
+    record = ReminderRecord(row)
+    assert record.to_dict() == row
+    assert dict(record) == row
+
+def test_round_trip_keeps_the_key_order_of_bot_rows():
+    assert list(ReminderRecord(ROW).to_dict()) == list(ROW)
+
+def test_replace_keeps_the_other_fields():
+    record = ReminderRecord(ROW).replace({"time": 1700003600})
+    assert record.to_dict() == {**ROW, "time": 1700003600}
+    assert ReminderRecord(ROW).replace({"title": "New"})["title"] == "New"
@@ -0,0 +1,33 @@
+import os
+import sys
+import subprocess
+
+from conftest import GUILD_ID, make_reminder
+from run_benchmarks import BOT_PATH
+from ReminderLib.Storage import SQLiteStorage
+
+def reminder(reminder_id):
+    return make_reminder(reminder_id, 4102444800)
+
+def test_leases_refuse_json_storage(tmp_path):
+    env = dict(os.environ, INSTANCE_LEASES="TRUE", REMINDER_STORAGE="json", TEST_ENV="TRUE", LOG_FILE="")
+    result = subprocess.run(
+        [sys.executable, BOT_PATH], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 1
+    assert "requires REMINDER_STORAGE=sqlite" in result.stdout + result.stderr
+
+def test_two_replicas_writing_one_sqlite_guild(tmp_path):
+    path = str(tmp_path / "reminders.db")
+    holder, standby = SQLiteStorage(path), SQLiteStorage(path)
+    holder.get_all(GUILD_ID)
+    standby.get_all(GUILD_ID)
+
+    holder.upsert(GUILD_ID, reminder("holder"))
+    standby.upsert(GUILD_ID, reminder("standby"))
+    holder.delete(GUILD_ID, "holder")
+    holder.upsert(GUILD_ID, reminder("again"))
+
+    for storage in (holder, standby, SQLiteStorage(path)):
+        assert sorted(row["reminder_id"] for row in storage.get_all(GUILD_ID)) == ["again", "standby"]
@@ -0,0 +1,87 @@
+import time
+import asyncio
+
+from datetime import datetime, timedelta
+
+from conftest import GUILD_ID, CHANNEL_ID, make_reminder, wait_for
+from ReminderLib.Scheduler import DueQueue
+
+def test_clear_guild_drops_only_that_guild():
+    queue = DueQueue()
+    for guild_id in (1, 2):
+        for n in range(3):
+            queue.schedule_at(guild_id, f"r{n}", 100 + n)
+    queue.remove(1, "r0")
+    assert queue.pop_due(100) == [(2, "r0", 100)]
+
+    queue.clear_guild(1)
+    assert len(queue) == 2
+    assert (1, "r1") not in queue
+    assert queue.pop_due(200) == [(2, "r1", 101), (2, "r2", 102)]
+    assert queue._by_guild == {}
+
+def test_poll_tick_fires_this_minutes_reminders_on_time(load_remi):
+    remi = load_remi(SCHEDULER_MODE="poll")
+    remi.bot.add_channel(GUILD_ID, CHANNEL_ID)
+    minute = datetime(2030, 1, 1, 12, 0)
+    remi.storage.upsert(GUILD_ID, make_reminder("now", int(minute.timestamp())))
+    remi.storage.upsert(GUILD_ID, make_reminder("next", int((minute + timedelta(minutes=1)).timestamp())))
+
+    async def run():
+        for guild_id, reminder in remi.storage.pending([GUILD_ID]):
+            remi.due_queue.schedule(guild_id, reminder)
+        await remi.fire_due_reminders(remi.poll_tick_ts(minute + timedelta(seconds=1)))
+    asyncio.run(run())
+
+    assert remi.catch_up.queued == 0
+    assert len(remi.bot.sent_messages()) == 1
+    assert remi.storage.get(GUILD_ID, "now") is None
+    assert remi.storage.get(GUILD_ID, "next") is not None
+
+def test_event_scheduler_fires_on_time_and_rearms_for_a_sooner_reminder(load_remi):
+    remi = load_remi(SCHEDULER_MODE="event")
+    remi.bot.add_channel(GUILD_ID, CHANNEL_ID)
+    now = time.time()
+    later = make_reminder("later", int(now) + 3600)
+    sooner = make_reminder("sooner", int(now) + 2)
+    remi.storage.upsert(GUILD_ID, later)
+
+    async def run():
+        remi.due_queue.schedule(GUILD_ID, later)
+        await remi.start_scheduler()
+        try:
+            # Asleep until the later reminder
+            await wait_for(lambda: not remi.scheduler_wakeups[0].is_set())
+            remi.storage.upsert(GUILD_ID, sooner)
+            remi.due_queue.schedule(GUILD_ID, sooner)
+            assert remi.scheduler_wakeups[0].is_set()
+            await wait_for(lambda: remi.bot.sent_messages(), timeout=4.0)
+        finally:
+            remi.stop_scheduler()
+    asyncio.run(run())
+
+    [(sent_at, _)] = remi.bot.sent_messages()
+    assert 0 <= sent_at - sooner["time"] < 1.0
+    assert remi.storage.get(GUILD_ID, "sooner") is None
+    assert remi.storage.get(GUILD_ID, "later") is not None
+    assert remi.due_queue.next_fire(0) == later["time"]
+
+def test_failed_send_is_retried(remi):
+    now = time.time()
+    remi.storage.upsert(GUILD_ID, make_reminder("r", int(now)))
+
+    async def run():
+        remi.due_queue.schedule(GUILD_ID, remi.storage.get(GUILD_ID, "r"))
+        # No channel to send to yet
+        await remi.fire_due_reminders(now)
+        assert remi.send_attempts[(GUILD_ID, "r")] == 1
+        assert remi.storage.get(GUILD_ID, "r") is not None
+        assert remi.due_queue.next_fire() >= now + remi.SEND_RETRY_SECONDS
+
+        remi.bot.add_channel(GUILD_ID, CHANNEL_ID)
+        await remi.fire_due_reminders(now + remi.SEND_RETRY_SECONDS + 1)
+    asyncio.run(run())
+
+    assert len(remi.bot.sent_messages()) == 1
+    assert (GUILD_ID, "r") not in remi.send_attempts
+    assert remi.storage.get(GUILD_ID, "r") is None
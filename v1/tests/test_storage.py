@@ -0,0 +1,82 @@
+from conftest import GUILD_ID, CHANNEL_ID, make_reminder
+from ReminderLib.Storage import page_key
+
+OTHER_GUILD_ID = GUILD_ID + 1
+
+def fill(storage):
+    storage.upsert(GUILD_ID, make_reminder("early", 100))
+    storage.upsert(GUILD_ID, make_reminder("late", 300))
+    storage.upsert(GUILD_ID, make_reminder("broken", "not a time"))
+    storage.upsert(OTHER_GUILD_ID, make_reminder("other", 200, guild_id=OTHER_GUILD_ID))
+
+def test_due(storage):
+    fill(storage)
+    guild_ids = [GUILD_ID, OTHER_GUILD_ID]
+    assert sorted(storage.due(200, guild_ids)) == [(GUILD_ID, "early", 100), (OTHER_GUILD_ID, "other", 200)]
+    assert sorted(storage.due(guild_ids=guild_ids)) == [
+        (GUILD_ID, "early", 100), (GUILD_ID, "late", 300), (OTHER_GUILD_ID, "other", 200),
+    ]
+    assert sorted(storage.due(guild_ids=[OTHER_GUILD_ID])) == [(OTHER_GUILD_ID, "other", 200)]
+
+def test_sqlite_due_is_one_range_query_in_fire_order(sqlite_storage):
+    fill(sqlite_storage)
+    assert [row[1] for row in sqlite_storage.due()] == ["early", "other", "late"]
+    assert [row[1] for row in sqlite_storage.due(250)] == ["early", "other"]
+
+    plan = " ".join(row[-1] for row in sqlite_storage.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT guild_id, reminder_id, next_fire FROM reminders WHERE next_fire <= ? ORDER BY next_fire", (0,)
+    ))
+    assert "idx_reminders_next_fire" in plan
+    # Many guilds (startup) take the same range scan, filtered to the guilds asked for
+    assert [row[1] for row in sqlite_storage.due(guild_ids=range(OTHER_GUILD_ID, OTHER_GUILD_ID + 600))] == ["other"]
+
+def test_batch_commits_in_one_write_and_reports_what_it_wrote(storage):
+    fill(storage)
+    batch = storage.batch(GUILD_ID)
+    batch.upsert(make_reminder("new", 400))
+    batch.update("early", {"time": 160})
+    batch.update("missing", {"time": 160})
+    batch.delete("late")
+    batch.delete("missing")
+    assert len(batch) == 5
+    assert storage.get(GUILD_ID, "new") is None # nothing applied before commit
+
+    result = batch.commit()
+    assert result.rows_changed == 3
+    assert result.bytes_written > 0
+    assert len(batch) == 0
+    assert storage.get(GUILD_ID, "early")["time"] == 160
+    assert storage.get(GUILD_ID, "late") is None
+    assert storage.get(GUILD_ID, "new")["time"] == 400
+
+def test_batch_that_changes_nothing_writes_nothing(storage):
+    fill(storage)
+    storage.flush(GUILD_ID)
+    assert repr(storage.batch(GUILD_ID).commit()) == "BatchResult(rows_changed=0, bytes_written=0)"
+
+    batch = storage.batch(GUILD_ID)
+    batch.delete("missing")
+    result = batch.commit()
+    assert (result.rows_changed, result.bytes_written) == (0, 0)
+
+def test_issuer_and_channel_filters_follow_every_change(storage):
+    for n in range(6):
+        storage.upsert(GUILD_ID, make_reminder(f"r{n}", 100 + n, issuer_id=1 + n % 2, channel_id=CHANNEL_ID + n % 3))
+    storage.upsert(GUILD_ID, make_reminder("r0", 100, issuer_id=2, channel_id=CHANNEL_ID + 1)) # moved
+    storage.delete(GUILD_ID, "r5")
+
+    def ids(**filters):
+        return [row["reminder_id"] for row in storage.page(GUILD_ID, 10, **filters)]
+
+    assert ids(issuer_id=1) == ["r2", "r4"]
+    assert ids(issuer_id=2) == ["r0", "r1", "r3"]
+    assert ids(channel_id=CHANNEL_ID + 1) == ["r0", "r1", "r4"]
+    assert ids(issuer_id=2, channel_id=CHANNEL_ID + 1) == ["r0", "r1"]
+    assert ids(issuer_id=3) == []
+    assert storage.count(GUILD_ID, issuer_id=2) == 3
+    assert storage.count(GUILD_ID, issuer_id=2, channel_id=CHANNEL_ID) == 1
+    assert storage.count(GUILD_ID) == 5
+
+    first = storage.page(GUILD_ID, 2, issuer_id=2)
+    rest = storage.page(GUILD_ID, 2, after=page_key(first[-1]), issuer_id=2)
+    assert [row["reminder_id"] for row in first + rest] == ["r0", "r1", "r3"]